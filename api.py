@@ -0,0 +1,186 @@
+# api.py
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator
+
+from flask import Blueprint, current_app, request
+
+from models import Order, OrderLineItem, Payment, Ticket, Trip, booking_queue, booking_service, seat_holds
+
+# Versioned JSON API for kiosks and mobile clients, mounted at /api/v1.
+# Listings are streamed as a chunked JSON array, one record at a time, straight
+# from Query.iterRecords; every body is compact (no indentation or spaces).
+
+apiV1 = Blueprint('api_v1', __name__, url_prefix='/api/v1')
+
+MAX_PAGE_SIZE = 1000
+
+BOOKING_STATUS = {'booked': 201, 'sold_out': 409, 'seat_unavailable': 409, 'hold_expired': 410,
+                  'payment_failed': 402, 'seat_failure': 409}
+REFUND_STATUS = {'refunded': 200, 'partially_refunded': 200, 'already_refunded': 200, 'nothing_to_refund': 409,
+                 'not_found': 404, 'forbidden': 403, 'not_eligible': 409, 'payment_missing': 409}
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, separators=(',', ':'))
+
+def _json(data: Any, status: int = 200):
+    return current_app.response_class(_dumps(data), status=status, mimetype='application/json')
+
+def _error(message: str, status: int):
+    return _json({"error": message}, status)
+
+def _streamArray(records: Iterable[Dict[str, Any]]):
+    """Streams records as a JSON array. No Content-Length is set, so the server sends it chunked."""
+    def generate() -> Iterator[str]:
+        yield '['
+        first = True
+        for record in records:
+            yield _dumps(record) if first else ',' + _dumps(record)
+            first = False
+        yield ']'
+    return current_app.response_class(generate(), mimetype='application/json')
+
+def _currentUserID() -> str:
+    return current_app.config['MOCK_USER_ID'] # Same mock identity as the HTML pages
+
+def _page() -> tuple:
+    """(limit, offset) from the query string, or raises ValueError with a client-facing message."""
+    try:
+        limit = int(request.args.get('limit', MAX_PAGE_SIZE))
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        raise ValueError("limit and offset must be integers.")
+    if limit < 1 or offset < 0:
+        raise ValueError("limit must be positive and offset must not be negative.")
+    return min(limit, MAX_PAGE_SIZE), offset
+
+def _publicTrip(record: Dict[str, Any]) -> Dict[str, Any]:
+    """A trip record without its seat holds, whose IDs let the holder book or release them."""
+    return {field: value for field, value in record.items() if field != 'seatHolds'}
+
+def _seatRequest(body: Dict[str, Any]) -> tuple:
+    """(quantity, preferred seat numbers or None) from a booking or hold body. Raises ValueError."""
+    quantity = body.get('quantity', 1)
+    if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 1:
+        raise ValueError("quantity must be a positive integer.")
+    seats = body.get('seats')
+    if seats is not None:
+        if not isinstance(seats, list) or len(seats) != quantity or not all(isinstance(seat, (str, int)) for seat in seats):
+            raise ValueError("seats must list one seat number per ticket.")
+        seats = [str(seat) for seat in seats]
+    return quantity, seats
+
+def _orderTotal(orderID: str) -> float:
+    lineItems = OrderLineItem.query().where('orderID', '==', orderID).records()
+    return sum((item.get('quantity') or 0) * (item.get('unitPrice') or 0) for item in lineItems)
+
+@apiV1.route('/trips', methods=['GET'])
+def searchTrips():
+    origin = request.args.get('origin', '').strip()
+    destination = request.args.get('destination', '').strip()
+    date = request.args.get('date', '').strip()
+    if origin.isdigit() or destination.isdigit():
+        return _error("Origin and destination cannot be just numbers.", 400)
+    if date:
+        try:
+            datetime.strptime(date, "%Y-%m-%d")
+        except ValueError:
+            return _error("Invalid date format. Please use YYYY-MM-DD.", 400)
+    try:
+        limit, offset = _page()
+    except ValueError as e:
+        return _error(str(e), 400)
+    query = Trip.searchQuery(origin or None, destination or None, date or None).limit(limit, offset)
+    return _streamArray(_publicTrip(record) for record in query.iterRecords())
+
+@apiV1.route('/trips/<tripID>', methods=['GET'])
+def tripDetail(tripID):
+    trip = Trip.findByID(tripID)
+    if not trip:
+        return _error("Trip not found.", 404)
+    return _json(_publicTrip(trip.to_dict()))
+
+@apiV1.route('/trips/<tripID>/bookings', methods=['POST'])
+def bookTrip(tripID):
+    trip = Trip.findByID(tripID)
+    if not trip:
+        return _error("Trip not found.", 404)
+    body = request.get_json(silent=True) or {}
+    try:
+        quantity, seats = _seatRequest(body)
+    except ValueError as e:
+        return _error(str(e), 400)
+    holdID = body.get('holdID')
+    if holdID is not None and not isinstance(holdID, str):
+        return _error("holdID must be a string.", 400)
+
+    if holdID is None: # A held checkout already has its seats; only new bookings queue
+        try:
+            result = booking_queue.bookTrip(_currentUserID(), trip, numTicketsToBook=quantity, preferredSeats=seats)
+        except booking_queue.QueueFull as e:
+            response = _error("Too many bookings for this trip right now. Please retry later.", 429)
+            response.headers['Retry-After'] = str(e.retryAfter)
+            return response
+    else:
+        result = booking_service.bookTrip(_currentUserID(), trip, numTicketsToBook=quantity,
+                                          preferredSeats=seats, holdID=holdID)
+    payload: Dict[str, Any] = {"outcome": result.outcome, "message": result.message}
+    if result.order:
+        payload["order"] = result.order.to_dict()
+    if result.payment:
+        payload["payment"] = result.payment.to_dict()
+    if result.tickets:
+        payload["tickets"] = [ticket.to_dict() for ticket in result.tickets]
+    return _json(payload, BOOKING_STATUS[result.outcome])
+
+@apiV1.route('/trips/<tripID>/holds', methods=['POST'])
+def holdSeats(tripID):
+    if not Trip.findByID(tripID):
+        return _error("Trip not found.", 404)
+    try:
+        quantity, seats = _seatRequest(request.get_json(silent=True) or {})
+    except ValueError as e:
+        return _error(str(e), 400)
+    hold = seat_holds.placeHold(tripID, quantity, seats)
+    if hold is None:
+        return _error("Those seats are not available.", 409)
+    return _json(hold.to_dict(), 201)
+
+@apiV1.route('/trips/<tripID>/holds/<holdID>', methods=['DELETE'])
+def releaseHold(tripID, holdID):
+    if not seat_holds.releaseHold(tripID, holdID):
+        return _error("Hold not found or already expired.", 404)
+    return current_app.response_class(status=204)
+
+@apiV1.route('/orders', methods=['GET'])
+def listOrders():
+    try:
+        limit, offset = _page()
+    except ValueError as e:
+        return _error(str(e), 400)
+    query = Order.query().where('userID', '==', _currentUserID()).limit(limit, offset)
+    return _streamArray({**record, "totalAmount": _orderTotal(record['orderID'])} for record in query.iterRecords())
+
+@apiV1.route('/orders/<orderID>', methods=['GET'])
+def orderDetail(orderID):
+    order = Order.findByID(orderID)
+    if not order or order.userID != _currentUserID():
+        return _error("Order not found.", 404)
+    payment = Payment.findByOrderID(orderID)
+    return _json({
+        **order.to_dict(),
+        "totalAmount": _orderTotal(orderID),
+        "lineItems": OrderLineItem.query().where('orderID', '==', orderID).records(),
+        "payment": payment.to_dict() if payment else None,
+        "tickets": Ticket.query().where('orderID', '==', orderID).includeArchived().records(),
+    })
+
+@apiV1.route('/orders/<orderID>/refund', methods=['POST'])
+def refundOrder(orderID):
+    result = booking_service.refundOrder(_currentUserID(), orderID)
+    payload: Dict[str, Any] = {"outcome": result.outcome, "message": result.message}
+    if result.order and result.outcome != 'forbidden':
+        payload["order"] = result.order.to_dict()
+    if result.refunds:
+        payload["refunds"] = [refund.to_dict() for refund in result.refunds]
+    return _json(payload, REFUND_STATUS[result.outcome])
@@ -1,18 +1,171 @@
 # app.py
-from flask import Flask, render_template, request, redirect, url_for, flash
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+import click
+from markupsafe import Markup
+from flask import Flask, render_template, request, redirect, url_for, flash, g, session, make_response
 from datetime import datetime # For date validation in searchTripsRoute
 
 # Import models from the models package - class names are still PascalCase
 from models import (
     User, Admin, Trip, Ticket, Order, Payment, Refund,
-    Stop, Route, Feedback, Response, Notification, OrderLineItem # Location removed earlier
+    Stop, Route, Feedback, Response, Notification, OrderLineItem, Location
 )
+from models import aggregates, archive, archiver, booking_queue, booking_service, bulk_loader, columnar, consistency, fare_engine, metrics, seat_holds, sharding, snapshot
+from models.async_storage import runAll
+from models.fragment_cache import FragmentCache
+from api import apiV1
 
 app = Flask(__name__)
 app.secret_key = 'your_very_secret_dev_key_123!'
+# Requests slower than this, or reading/writing more storage bytes than this, are logged. Unset = off.
+app.config['SLOW_REQUEST_MS'] = float(os.environ.get('ART_SLOW_REQUEST_MS', 0)) or None
+app.config['SLOW_REQUEST_IO_BYTES'] = int(os.environ.get('ART_SLOW_REQUEST_IO_BYTES', 0)) or None
+# JSONL file that incoming requests are appended to, for replay with tools.replay. Unset = off.
+app.config['CAPTURE_REQUESTS_PATH'] = os.environ.get('ART_CAPTURE_REQUESTS') or None
 
 mockUserID = "mock_user_001"
 mock_adminID = "admin_user_001"
+app.config['MOCK_USER_ID'] = mockUserID # Identity used by the JSON API
+app.register_blueprint(apiV1)
+
+# --- Request instrumentation ---
+@app.before_request
+def beginRequestMetrics():
+    g.metricsToken = metrics.beginRequest(request.endpoint or 'unmatched')
+
+@app.before_request
+def startDynamicFares():
+    # Serving processes only, so flask CLI commands never reprice behind the operator's back.
+    # Does nothing unless ART_DYNAMIC_FARES=1, and only the first call registers.
+    fare_engine.register()
+
+@app.teardown_request
+def endRequestMetrics(error=None):
+    token = g.pop('metricsToken', None)
+    if token is None:
+        return
+    scope = metrics.endRequest(token)
+    slowMs, slowBytes = app.config.get('SLOW_REQUEST_MS'), app.config.get('SLOW_REQUEST_IO_BYTES')
+    elapsedMs, ioBytes = scope.elapsed * 1000, scope.stats.totalBytes()
+    if (slowMs and elapsedMs >= slowMs) or (slowBytes and ioBytes >= slowBytes):
+        stats = scope.stats
+        files = ", ".join(f"{name} {op} x{count} {stats.bytes[(name, op)]}B {stats.seconds[(name, op)] * 1000:.1f}ms"
+                          for (name, op), count in sorted(stats.calls.items()))
+        print(f"Slow request: {request.method} {request.path} ({scope.endpoint}) took {elapsedMs:.1f}ms; "
+              f"{stats.totalCalls('load')} loads, {stats.totalCalls('save')} saves, {ioBytes}B storage I/O, "
+              f"{stats.totalDeserialized()} records deserialized" + (f" [{files}]" if files else ""))
+
+captureLock = threading.Lock()
+CAPTURE_SKIPPED_ENDPOINTS = {'static', 'adminMetricsRoute'}
+
+@app.after_request
+def captureRequest(response):
+    capturePath = app.config.get('CAPTURE_REQUESTS_PATH')
+    if not capturePath or request.endpoint in CAPTURE_SKIPPED_ENDPOINTS:
+        return response
+    scope = metrics.currentRequest()
+    entry = {
+        "ts": time.time(),
+        "method": request.method,
+        "path": request.path,
+        "query": request.args.to_dict(flat=False),
+        "form": request.form.to_dict(flat=False),
+        "endpoint": request.endpoint,
+        "status": response.status_code,
+        "duration_ms": round(scope.elapsed * 1000, 3) if scope else None,
+    }
+    try:
+        with captureLock, open(capturePath, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + "\n")
+    except OSError as e:
+        print(f"Warning: Could not capture request to {capturePath}: {e}")
+    return response
+
+# --- Conditional GET caching ---
+PAGE_CACHE_SIZE = 256 # Rendered bodies kept, least recently used evicted first
+pageCache: "OrderedDict[str, tuple]" = OrderedDict() # full path -> (etag, body, mimetype)
+pageCacheLock = threading.Lock()
+pageCacheCounts = {"not_modified": 0, "hit": 0, "miss": 0, "bypass": 0}
+
+def storesETag(models) -> str:
+    digest = hashlib.sha1()
+    for model in models:
+        version, signature = model._table().validator()
+        digest.update(f"{model.FILE_PATH}:{version}:{signature};".encode())
+    return digest.hexdigest()
+
+def conditionalPage(*models):
+    """Tags a GET page with an ETag built from the stores it reads.
+
+    A matching If-None-Match gets a 304, and an unchanged page for the same URL
+    is served from the rendered-body cache. Requests with pending flash messages
+    bypass both, since the page would render differently.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET' or session.get('_flashes'):
+                pageCacheCounts["bypass"] += 1
+                return view(*args, **kwargs)
+            etag = storesETag(models)
+            if etag in request.if_none_match:
+                pageCacheCounts["not_modified"] += 1
+                response = app.response_class(status=304)
+            else:
+                with pageCacheLock:
+                    cached = pageCache.get(request.full_path)
+                    if cached and cached[0] == etag:
+                        pageCache.move_to_end(request.full_path)
+                if cached and cached[0] == etag:
+                    pageCacheCounts["hit"] += 1
+                    response = app.response_class(cached[1], mimetype=cached[2])
+                else:
+                    pageCacheCounts["miss"] += 1
+                    response = make_response(view(*args, **kwargs))
+                    # Only cache a 200 whose stores did not change while it rendered.
+                    if (response.status_code != 200 or session.get('_flashes')
+                            or storesETag(models) != etag):
+                        return response
+                    with pageCacheLock:
+                        pageCache[request.full_path] = (etag, response.get_data(), response.mimetype)
+                        pageCache.move_to_end(request.full_path)
+                        while len(pageCache) > PAGE_CACHE_SIZE:
+                            pageCache.popitem(last=False)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache' # Always revalidate
+            return response
+        return wrapper
+    return decorator
+
+# --- Fragment caching ---
+fragmentCache = FragmentCache()
+
+@app.template_global('trip_row')
+def renderTripRow(trip):
+    """One search-results row, re-rendered only after that trip is saved."""
+    version, record = Trip._table().versioned(trip.tripID)
+    if record is None: # Deleted since the page's finder ran
+        return Markup(render_template('_trip_row.html', trip=trip))
+    return Markup(fragmentCache.render('trip', (trip.tripID, version),
+                                       lambda: render_template('_trip_row.html', trip=Trip._fromRecord(record))))
+
+@app.template_global('stop_row')
+def renderStopRow(route, stop):
+    """One route-stops row, re-rendered only after that stop or its location is saved."""
+    stopVersion, stopRecord = Stop._table().versioned(stop.stopID)
+    if stopRecord is None:
+        return Markup(render_template('_stop_row.html', route=route, stop=stop, location=stop.getLocation()))
+    locationID = stopRecord.get('locationID')
+    locationVersion, locationRecord = Location._table().versioned(locationID) if locationID else (0, None)
+    key = (route.routeID, stop.stopID, stopVersion, locationID, locationVersion)
+    return Markup(fragmentCache.render('stop', key, lambda: render_template(
+        '_stop_row.html', route=route, stop=Stop._fromRecord(stopRecord), location=Location._fromRecord(locationRecord))))
 
 # --- Basic Routes ---
 @app.route('/')
@@ -21,6 +174,7 @@ def home():
 
 # --- User Facing Routes ---
 @app.route('/search-trips', methods=['GET'])
+@conditionalPage(Trip)
 def searchTripsRoute(): # Route function names are often camelCase or snake_case
     originQuery = request.args.get('origin', '').strip()
     destinationQuery = request.args.get('destination', '').strip()
@@ -74,64 +228,22 @@ def bookTripRoute(tripID): # Route function name
         flash("Trip not found.", "error"); return redirect(url_for('searchTripsRoute'))
 
     if request.method == 'POST':
-        numTicketsToBook = 1 # Local var
-
-        if tripToBook.availableSeats < numTicketsToBook: # Access camelCase attribute
-            flash("Not enough available seats.", "error")
-            return render_template('book_trip_form.html', title=f'Book Trip: {tripToBook.tripID}',
-                                   trip=tripToBook, booking_successful=False)
-        else:
-            newOrder = Order(userID=currentUserID, status="PendingPayment") # Pass camelCase params
-            newOrder.save()
-
-            lineItem = OrderLineItem(
-                orderID=newOrder.orderID, # Access camelCase attribute
-                itemID=tripToBook.tripID,
-                itemType="TripTicket",      # Pass camelCase params
-                quantity=numTicketsToBook,
-                unitPrice=tripToBook.price # Access lowercase attribute (price was not changed)
-            )
-            lineItem.save()
-
-            orderTotalAmount = newOrder.calculateTotalAmount() # Call camelCase method
-
-            mockPaymentSuccessful = True
-            savedPayment = None
-            if mockPaymentSuccessful:
-                newPayment = Payment(orderID=newOrder.orderID, amount=orderTotalAmount, status="Completed") # Pass camelCase params
-                newPayment.save()
-                savedPayment = newPayment
-                newOrder.status = "Completed" # status is lowercase
-                newOrder.save()
-            else:
-                newOrder.status = "PaymentFailed"
-                newOrder.save()
-                flash("Payment failed.", "error")
-                return render_template('book_trip_form.html', title=f'Book Trip: {tripToBook.tripID}',
-                                       trip=tripToBook, booking_successful=False)
-
-            if tripToBook.updateSeats(numTicketsToBook, operation="book"): # Call camelCase method
-                tripToBook.save()
-
-                createdTicketsInfo = [] # Local var
-                for _ in range(numTicketsToBook):
-                    newTicket = Ticket(userID=currentUserID, tripID=tripToBook.tripID,
-                                        orderID=newOrder.orderID, paymentID=savedPayment.paymentID) # Pass camelCase params
-                    newTicket.save()
-                    createdTicketsInfo.append(newTicket)
-
-                flash(f"{numTicketsToBook} Ticket(s) purchased for Order {newOrder.orderID}!", 'success')
-                return render_template('book_trip_form.html', title=f'Booking Confirmed',
-                                       trip=tripToBook, order=newOrder,
-                                       ticket=createdTicketsInfo[0] if createdTicketsInfo else None,
-                                       booking_successful=True)
-            else:
-                flash("Critical error: Payment successful, but failed to secure seats.", "error")
-                if savedPayment:
-                    savedPayment.status = "RequiresRefund"; savedPayment.save()
-                newOrder.status = "SeatBookingFailure"; newOrder.save()
-                return render_template('book_trip_form.html', title=f'Book Trip: {tripToBook.tripID}',
-                                   trip=tripToBook, booking_successful=False)
+        try:
+            result = booking_queue.bookTrip(currentUserID, tripToBook, numTicketsToBook=1)
+        except booking_queue.QueueFull as e:
+            flash(f"This trip is very busy right now. Please try again in {e.retryAfter} seconds.", "warning")
+            response = make_response(render_template('book_trip_form.html', title=f'Book Trip: {tripToBook.tripID}',
+                                                     trip=tripToBook, booking_successful=False), 429)
+            response.headers['Retry-After'] = str(e.retryAfter)
+            return response
+        flash(result.message, result.category)
+        if result.success:
+            return render_template('book_trip_form.html', title=f'Booking Confirmed',
+                                   trip=tripToBook, order=result.order,
+                                   ticket=result.tickets[0] if result.tickets else None,
+                                   booking_successful=True)
+        return render_template('book_trip_form.html', title=f'Book Trip: {tripToBook.tripID}',
+                               trip=tripToBook, booking_successful=False)
 
     return render_template('book_trip_form.html', title=f'Book Trip: {tripToBook.tripID}',
                            trip=tripToBook, booking_successful=False)
@@ -142,85 +254,21 @@ def requestRefundStandaloneRoute(): # Route function name
 
     if request.method == 'POST':
         orderIDToRefund = request.form.get('order_id_to_refund') # Form data is snake_case
-        orderToRefund = Order.findByID(orderIDToRefund) # Call camelCase method
-
-        if not orderToRefund:
-            flash("Order not found.", "error")
-        elif orderToRefund.userID != currentUserID: # Access camelCase attribute
-            flash("This order does not belong to you.", "error")
-        elif orderToRefund.status != "Completed":
-            flash(f"Order (Status: {orderToRefund.status}) not eligible for refund.", "warning")
-        else:
-            paymentForOrder = Payment.findByOrderID(orderToRefund.orderID) # Call camelCase method
-            ticketsForOrder = Ticket.findByOrderID(orderToRefund.orderID) # Call camelCase method
-
-            if not paymentForOrder:
-                flash("Payment for this order not found. Cannot process refund.", "error")
-            elif paymentForOrder.status == "Refunded":
-                flash("This order has already been fully refunded.", "info")
-                if orderToRefund.status != "Refunded":
-                    orderToRefund.status = "Refunded"; orderToRefund.save()
-            else:
-                refundProcessedCount = 0 # Local var
-                for ticket in ticketsForOrder:
-                    if ticket.status == "Active":
-                        tripOfTicket = Trip.findByID(ticket.tripID) # Call camelCase method
-
-                        lineItemsForOrder = OrderLineItem.findByOrderID(orderToRefund.orderID) # Call camelCase method
-                        refundAmountThisTicket = 0 # Local var
-                        if lineItemsForOrder:
-                            numOriginalTicketsInOrder = sum(li.quantity for li in lineItemsForOrder if li.itemType == "TripTicket") # Access camelCase attr
-                            if numOriginalTicketsInOrder > 0:
-                                refundAmountThisTicket = orderToRefund.calculateTotalAmount() / numOriginalTicketsInOrder # Call camelCase method
-                            else:
-                                refundAmountThisTicket = paymentForOrder.amount / len(ticketsForOrder) if ticketsForOrder else 0
-                        else:
-                             refundAmountThisTicket = paymentForOrder.amount / len(ticketsForOrder) if ticketsForOrder else 0
-
-                        newRefund = Refund(paymentID=paymentForOrder.paymentID, # Access camelCase attr
-                                            orderID=orderToRefund.orderID, # Access camelCase attr
-                                            ticketID=ticket.ticketID, # Access camelCase attr
-                                            refundAmount=refundAmountThisTicket) # Pass camelCase param
-                        newRefund.updateStatus("Processed") # Call camelCase method
-                        newRefund.save()
-                        
-                        ticket.status = "Refunded"
-                        ticket.save()
-
-                        if tripOfTicket:
-                            tripOfTicket.updateSeats(1, operation="refund") # Call camelCase method
-                            tripOfTicket.save()
-                        refundProcessedCount += 1
-
-                if refundProcessedCount > 0:
-                    all_tickets_refunded = all(t.status == "Refunded" for t in Ticket.findByOrderID(orderToRefund.orderID)) # Call camelCase method
-                    if all_tickets_refunded:
-                        paymentForOrder.status = "Refunded"
-                        paymentForOrder.save()
-                        orderToRefund.status = "Refunded"
-                        orderToRefund.save()
-                        flash(f"All {refundProcessedCount} ticket(s) in the order refunded successfully. Order status updated.", "success")
-                    else:
-                        flash(f"{refundProcessedCount} ticket(s) in the order refunded. Some tickets may not have been active or already refunded.", "info")
-                else:
-                    flash("No active tickets found in this order to refund.", "info")
-
+        result = booking_service.refundOrder(currentUserID, orderIDToRefund)
+        flash(result.message, result.category)
         return redirect(url_for('requestRefundStandaloneRoute'))
 
-    ordersDataForDisplay = [] # Local var
-    userOrders = Order.findByUserID(currentUserID) # Call camelCase method
-    if userOrders:
-        for order in userOrders:
-            tripInfoForDisplay = "Trip info N/A" # Local var
-            lineItems = order.getLineItems() # Call camelCase method
-            if lineItems:
-                firstTicketLineItem = next((li for li in lineItems if li.itemType == "TripTicket"), None) # Access camelCase attr
-                if firstTicketLineItem:
-                    trip = Trip.findByID(firstTicketLineItem.itemID) # Access camelCase attr
-                    if trip:
-                        tripInfoForDisplay = f"{trip.origin} to {trip.destination}"
-
-            ordersDataForDisplay.append({"order": order, "trip_info": tripInfoForDisplay, "total_amount": order.calculateTotalAmount()}) # Call camelCase method
+    userOrders = Order.findByUserID(currentUserID) or [] # Call camelCase method
+    # Each order's lookups are independent of the other orders', so every stage runs side by side.
+    lineItemsByOrder = runAll(*(order.getLineItems for order in userOrders)) # Call camelCase method
+    firstTicketLineItems = [next((li for li in lineItems if li.itemType == "TripTicket"), None) if lineItems else None # Access camelCase attr
+                            for lineItems in lineItemsByOrder]
+    trips = runAll(*(functools.partial(Trip.findByID, li.itemID) if li else (lambda: None) for li in firstTicketLineItems))
+    totalAmounts = runAll(*(order.calculateTotalAmount for order in userOrders)) # Call camelCase method
+    ordersDataForDisplay = [{"order": order,
+                             "trip_info": f"{trip.origin} to {trip.destination}" if trip else "Trip info N/A",
+                             "total_amount": totalAmount}
+                            for order, trip, totalAmount in zip(userOrders, trips, totalAmounts)] # Local var
 
     if not ordersDataForDisplay:
          flash(f"No orders found for user '{currentUserID}'. Book a trip or ensure mock data exists.", "info")
@@ -238,12 +286,14 @@ def adminRequired(f): # Function name lowercase
 
 @app.route('/admin/manage-routes', methods=['GET'])
 @adminRequired
+@conditionalPage(Route)
 def adminManageRoutesRoute(): # Route function name
     routes = Route.getAll() # Call camelCase method
     return render_template('admin_manage_routes.html', title="Admin: Manage Routes", routes=routes)
 
 @app.route('/admin/route/<routeID>/stops', methods=['GET'])
 @adminRequired
+@conditionalPage(Route, Stop, Location)
 def adminRouteStopsRoute(routeID): # Route function name
     route = Route.findByID(routeID) # Call camelCase method
     if not route:
@@ -254,8 +304,7 @@ def adminRouteStopsRoute(routeID): # Route function name
     for stopID_val in route.stopIDs: # Access camelCase attr
         stop = Stop.findByID(stopID_val) # Call camelCase method
         if stop:
-            location = stop.getLocation() # Call camelCase method
-            stopsOnRouteDetails.append({"stop": stop, "location": location})
+            stopsOnRouteDetails.append({"stop": stop}) # Location is looked up by the cached stop_row
 
     return render_template('admin_route_stops.html',
                            title=f"Admin: Stops for {route.routeName}", # Access camelCase attr
@@ -329,6 +378,7 @@ def adminUpdateStopLocationRoute(routeID, stopID): # Route function name
 
 @app.route('/admin/feedbacks', methods=['GET'])
 @adminRequired
+@conditionalPage(Feedback, User, Response)
 def adminManageFeedbacksRoute(): # Route function name
     statusFilter = request.args.get('status', 'New') # Local var
     allFeedbacks = Feedback.getAll(statusFilter=statusFilter if statusFilter != "All" else None) # Call camelCase method
@@ -385,9 +435,176 @@ def adminRespondToFeedbackRoute(feedbackID): # Route function name
                            title=f"Respond to Feedback ID: {feedbackToRespond.feedbackID}", # Access camelCase attr
                            feedback=feedbackToRespond, submitter_name=submitterName, existing_responses=existingResponses)
 
+@app.route('/admin/reports', methods=['GET'])
+@adminRequired
+def adminReportsRoute(): # Route function name
+    totals = aggregates.getCounter('total', 'all') # Served from maintained counters, no store scans
+    revenue = totals.get('revenue', 0)
+    ticketsIssued = totals.get('ticketsIssued', 0)
+    refundRates = {
+        "amount": totals.get('refunded', 0) / revenue if revenue else 0.0,
+        "tickets": totals.get('ticketsRefunded', 0) / ticketsIssued if ticketsIssued else 0.0,
+    }
+
+    routeDayRows = []
+    for row in sorted(aggregates.getScope('routeDay'), key=lambda r: r['key'], reverse=True):
+        routeName, _, day = row['key'].rpartition(' | ')
+        routeDayRows.append({"route": routeName, "day": day,
+                             "revenue": row.get('revenue', 0), "refunded": row.get('refunded', 0)})
+
+    tripRows = []
+    tripCounters = aggregates.getScope('trip')
+    tripIDs = [row['key'] for row in tripCounters]
+    tripsByID = dict(Trip._table().items(tripIDs)) # Raw records, one lookup for the page
+    missing = [tripID for tripID in tripIDs if tripID not in tripsByID]
+    if missing:
+        tripsByID.update(archive.forModel(Trip).items(missing)) # Departed and archived
+    for row in tripCounters:
+        trip = tripsByID.get(row['key'])
+        seatsSold = row.get('ticketsActive', 0)
+        capacity = seatsSold + int(trip.get('availableSeats') or 0) if trip else 0
+        tripRows.append({"tripID": row['key'], "trip": trip, "seats_sold": seatsSold, "capacity": capacity,
+                         "load_factor": seatsSold / capacity if capacity else 0.0,
+                         "revenue": row.get('revenue', 0), "refunded": row.get('refunded', 0)})
+    tripRows.sort(key=lambda r: r['load_factor'], reverse=True)
+
+    return render_template('admin_reports.html', title="Admin: Reports",
+                           totals=totals, refund_rates=refundRates,
+                           route_day_rows=routeDayRows, trip_rows=tripRows,
+                           route_rows=sorted(aggregates.getScope('route'), key=lambda r: r['key']))
+
+@app.route('/admin/metrics', methods=['GET'])
+@adminRequired
+def adminMetricsRoute(): # Route function name
+    pageCacheSamples = {(("result", result),): count for result, count in pageCacheCounts.items()}
+    fragmentSamples = fragmentCache.metricSamples()
+    with seat_holds.holdCountsLock:
+        holdSamples = {(("event", event),): count for event, count in seat_holds.holdCounts.items()}
+    queueStats = booking_queue.stats()
+    extra = [
+        ('art_page_cache_requests_total', 'counter', 'Conditional GET page lookups, by result.', pageCacheSamples),
+        ('art_fragment_cache_requests_total', 'counter', 'Row fragment lookups, by kind and result.', fragmentSamples['requests']),
+        ('art_fragment_cache_hit_ratio', 'gauge', 'Row fragment hits / lookups since start, by kind.', fragmentSamples['hitRatio']),
+        ('art_fragment_cache_evictions_total', 'counter', 'Row fragments evicted to stay within bounds.', fragmentSamples['evictions']),
+        ('art_fragment_cache_entries', 'gauge', 'Row fragments currently cached.', fragmentSamples['entries']),
+        ('art_fragment_cache_chars', 'gauge', 'Characters of HTML currently cached.', fragmentSamples['chars']),
+        ('art_seat_holds_total', 'counter', 'Seat holds by lifecycle event.', holdSamples),
+        ('art_seat_holds_timed', 'gauge', 'Seat holds awaiting expiry on this process.', {(): seat_holds.activeHolds()}),
+        ('art_booking_queue_requests_total', 'counter', 'Queued booking requests, by result.',
+         {(("result", result),): queueStats[result] for result in ('accepted', 'rejected', 'timedOut')}),
+        ('art_booking_queue_batches_total', 'counter', 'Booking batches written.', {(): queueStats['batches']}),
+        ('art_booking_queue_waiting', 'gauge', 'Booking requests waiting in trip queues.', {(): queueStats['waiting']}),
+    ]
+    return app.response_class(metrics.renderPrometheus(extra), mimetype='text/plain; version=0.0.4')
+
+
+# --- CLI commands ---
+@app.cli.command('rebuild-aggregates')
+def rebuildAggregatesCommand():
+    """Recompute the reporting counters from payments, refunds and tickets."""
+    counterCount = aggregates.rebuild()
+    click.echo(f"Rebuilt {counterCount} reporting counters.")
+
+@app.cli.command('export-columnar')
+@click.argument('out_dir')
+@click.option('--store', 'stores', multiple=True, type=click.Choice(sorted(columnar.SCHEMAS)),
+              help="Store to export (repeatable). Defaults to all.")
+@click.option('--npz', is_flag=True, help="Also write a compressed <store>.npz bundle.")
+def exportColumnarCommand(out_dir, stores, npz):
+    """Export tickets, payments and trips as typed, memory-mappable NumPy columns."""
+    rowCounts = columnar.exportAll(out_dir, bundle=npz, stores=stores or None)
+    for storeName, rowCount in rowCounts.items():
+        click.echo(f"{storeName}: {rowCount} rows -> {out_dir}/{storeName}/")
+
+@app.cli.command('reprice')
+@click.option('--dry-run', is_flag=True, help="Only report how many fares would change.")
+def repriceCommand(dry_run):
+    """Recompute every trip's demand-based fare and save the ones that changed."""
+    tripCount, changedCount = fare_engine.reprice(dryRun=dry_run)
+    verb = "would change" if dry_run else "changed"
+    click.echo(f"Priced {tripCount} trips; {changedCount} fares {verb}.")
+
+@app.cli.command('check-consistency')
+@click.option('--repair', is_flag=True, help="Rewrite mismatched trip seat maps and seat counts from their tickets.")
+@click.option('--samples', type=int, default=20, show_default=True, help="Problems listed per check.")
+def checkConsistencyCommand(repair, samples):
+    """Check references between stores, trip inventory and refund totals."""
+    report = consistency.check(repair=repair, sampleLimit=samples)
+    click.echo("Scanned " + ", ".join(f"{count} {store}" for store, count in report.scanned.items()) + ".")
+    if report.uncheckedTrips:
+        click.echo(f"{report.uncheckedTrips} trips have no seat map yet, so their inventory was not checked "
+                   f"(only for a negative seat count): {', '.join(report.uncheckedSamples)}"
+                   + (", ..." if report.uncheckedTrips > len(report.uncheckedSamples) else ""))
+    for checkName, count in sorted(report.counts.items()):
+        click.echo(f"{checkName}: {count}")
+        for detail in report.samples[checkName]:
+            click.echo(f"  {detail}")
+    if repair:
+        click.echo(f"Repaired the inventory of {report.repairedTrips} trips.")
+        if report.unrepairedTrips:
+            click.echo(f"Left {report.unrepairedTrips} trips unrepaired: fix their bad or duplicate seat tickets first.")
+    if not report.problemCount:
+        click.echo("No problems found.")
+    elif not repair:
+        raise SystemExit(1)
+
+@app.cli.command('bulk-import')
+@click.argument('store', type=click.Choice(sorted(bulk_loader.IMPORTABLE_MODELS)))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(['csv', 'jsonl']),
+              help="Input format. Defaults to the file extension.")
+@click.option('--rejects', 'rejects_path', type=click.Path(dir_okay=False),
+              help="Write rejected rows with their reasons to this JSONL file.")
+@click.option('--dry-run', is_flag=True, help="Validate and count without writing the store.")
+def bulkImportCommand(store, path, file_format, rejects_path, dry_run):
+    """Stream a CSV/JSONL timetable file into a store, upserting by primary key."""
+    report = bulk_loader.importFile(store, path, file_format, dryRun=dry_run)
+    click.echo(report.summary() + (" [dry run, nothing written]" if dry_run else ""))
+    for rejection in report.rejected[:10]:
+        click.echo(f"  line {rejection['line']}: {rejection['reason']}")
+    if len(report.rejected) > 10:
+        click.echo(f"  ... and {len(report.rejected) - 10} more rejected rows")
+    if rejects_path and report.rejected:
+        with open(rejects_path, 'w', encoding='utf-8') as f:
+            for rejection in report.rejected:
+                f.write(json.dumps(rejection) + "\n")
+        click.echo(f"Rejected rows written to {rejects_path}")
+
+@app.cli.command('shard-stores')
+def shardStoresCommand():
+    """Move records still in unsharded store files into their ART_SHARDING shards."""
+    shardedModels = [model for model in (Ticket, Order, Payment, Refund, Trip, Stop, Route, Feedback,
+                                         Response, Notification, OrderLineItem, Location)
+                     if isinstance(model._table(), sharding.ShardedTable)]
+    if not shardedModels:
+        click.echo("No store is sharded. Set ART_SHARDING, e.g. tickets.json=month:issueDatetime.")
+    for model in shardedModels:
+        table = model._table()
+        movedCount = table.migrate()
+        click.echo(f"{model.FILE_PATH}: moved {movedCount} records into {sum(path != table.file_path for path in table.shards)} shard files")
+
+@app.cli.command('archive')
+@click.option('--days', type=int, default=None,
+              help=f"Archive records older than this many days (default {archiver.ARCHIVE_AFTER_DAYS}).")
+@click.option('--store', 'stores', multiple=True, type=click.Choice(list(archiver.RULES)),
+              help="Store to archive (repeatable). Defaults to all.")
+@click.option('--dry-run', is_flag=True, help="Count what would move without writing anything.")
+def archiveCommand(days, stores, dry_run):
+    """Move departed trips, their tickets, settled refunds and old read notifications into archive segments."""
+    movedCounts = archiver.archiveAll(days, stores or None, dryRun=dry_run)
+    for storeName, movedCount in movedCounts.items():
+        click.echo(f"{storeName}: {movedCount} records {'would move' if dry_run else 'archived'}")
+
+@app.cli.command('snapshot')
+def snapshotCommand():
+    """Write the startup snapshot of every parsed store and its indexes."""
+    for storeName, byteCount in snapshot.writeAll().items():
+        click.echo(f"{storeName}: {byteCount} bytes -> {snapshot.SNAPSHOT_DIR}/")
+
 
 # --- Main execution ---
 if __name__ == '__main__':
+    snapshot.warmup() # Load every store (from the snapshot when it is current) before serving
     if not User.findByID(mockUserID): # Call camelCase method
         User(username="mockuser", email="mock@example.com", password="password", userID=mockUserID).save()
     
@@ -19,6 +19,9 @@ from .route import Route
 from .feedback import Feedback
 from .response import Response
 from .notification import Notification
+from . import aggregates
+
+aggregates.register() # Keep reporting counters in step with every save
 
 # This list defines what 'from models import *' will import.
 __all__ = [
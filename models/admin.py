@@ -24,4 +24,12 @@ class Admin(User):
             'permissions': self.permissions,
             'assignedArea': self.assignedArea
         })
-        return data
\ No newline at end of file
+        return data
+
+    @classmethod
+    def _typeFieldsFromDict(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'adminLevel': data.get('adminLevel', 'staff'), # Expect camelCase key
+            'permissions': data.get('permissions'),
+            'assignedArea': data.get('assignedArea')
+        }
\ No newline at end of file
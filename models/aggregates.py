@@ -0,0 +1,197 @@
+# models/aggregates.py
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from . import archive
+from .base_model import BaseModel
+from .constants import AGGREGATE_DATA_FILE
+from .indexes import Change, HashIndex, Table, get_table
+from .order_line_item import OrderLineItem
+from .payment import Payment
+from .refund import Refund
+from .ticket import Ticket
+from .trip import Trip
+
+# Reporting counters, kept in step with payments, refunds and tickets.
+#
+# Each counter row is identified by a scope ('total', 'day', 'route', 'routeDay',
+# 'trip') and a key within that scope. A saved record contributes a fixed set of
+# increments; on every save the old record's contribution is subtracted and the
+# new one's added, so status changes (e.g. a ticket going Active -> Refunded)
+# move counts between fields without ever rescanning the stores.
+#
+# A payment's revenue is split across the trips of its order by line total when
+# it is first counted, and the split is kept in a 'split' row keyed by payment ID
+# (one 'trip:<tripID>' field per trip), counted up and down with the payment.
+# Later saves of the payment, and rebuild(), reuse that split, so editing line
+# items afterwards cannot make the trip and route counters drift.
+
+PAID_PAYMENT_STATUSES = ("Completed", "Refunded", "RequiresRefund")
+PROCESSED_REFUND_STATUS = "Processed"
+
+Delta = Dict[Tuple[str, str], Dict[str, float]]
+SPLIT_FIELD_PREFIX = 'trip:'
+
+def _table() -> Table:
+    return get_table(AGGREGATE_DATA_FILE, 'counterID', {'scope': lambda: HashIndex('scope')})
+
+def _ensureBuilt() -> bool:
+    """Builds the counters from scratch if they have never been written. Returns True if it did."""
+    if os.path.exists(AGGREGATE_DATA_FILE):
+        return False
+    rebuild()
+    return True
+
+def _add(delta: Delta, scope: str, key: str, sign: int, **fields: float) -> None:
+    counters = delta.setdefault((scope, key), {})
+    for field, amount in fields.items():
+        counters[field] = counters.get(field, 0) + sign * amount
+
+def _day(dateStr: Optional[str]) -> Optional[str]:
+    parsed = BaseModel._parse_datetime(dateStr, default_now=False)
+    return parsed.date().isoformat() if parsed else None
+
+def _routeName(tripID: Optional[str]) -> Optional[str]:
+    trip_data = (Trip._table().get(tripID) or archive.forModel(Trip).get(tripID)) if tripID else None
+    if trip_data is None:
+        return None
+    return f"{trip_data.get('origin')} → {trip_data.get('destination')}"
+
+def _tripShares(record: Dict[str, Any], amount: float) -> Dict[str, float]:
+    """The payment's amount by trip: as split when it was first counted, else by its order's line totals now."""
+    stored = _table().get(f"split:{record.get('paymentID')}") or {}
+    shares = {field[len(SPLIT_FIELD_PREFIX):]: value for field, value in stored.items()
+              if field.startswith(SPLIT_FIELD_PREFIX) and value}
+    if shares:
+        recorded = sum(shares.values())
+        if abs(recorded - amount) < 0.005:
+            return shares
+        return {tripID: round(amount * share / recorded, 2) for tripID, share in shares.items()}
+
+    lines = [li for li in OrderLineItem.query().where('orderID', '==', record.get('orderID')).records()
+             if li.get('itemType') == "TripTicket" and li.get('itemID')]
+    lineTotals = [float(li.get('quantity') or 0) * float(li.get('unitPrice') or 0) for li in lines]
+    orderTotal = sum(lineTotals)
+    for li, lineTotal in zip(lines, lineTotals):
+        share = amount * lineTotal / orderTotal if orderTotal else amount / len(lines)
+        shares[li['itemID']] = shares.get(li['itemID'], 0.0) + share
+    return {tripID: round(share, 2) for tripID, share in shares.items()}
+
+def _paymentContribution(record: Dict[str, Any], sign: int, delta: Delta) -> None:
+    if record.get('status') not in PAID_PAYMENT_STATUSES:
+        return
+    amount = float(record.get('amount') or 0)
+    day = _day(record.get('paymentDatetime'))
+    _add(delta, 'total', 'all', sign, revenue=amount, payments=1)
+    if day:
+        _add(delta, 'day', day, sign, revenue=amount, payments=1)
+
+    for tripID, share in _tripShares(record, amount).items():
+        _add(delta, 'split', record.get('paymentID'), sign, **{SPLIT_FIELD_PREFIX + tripID: share})
+        _add(delta, 'trip', tripID, sign, revenue=share)
+        route = _routeName(tripID)
+        if route:
+            _add(delta, 'route', route, sign, revenue=share)
+            if day:
+                _add(delta, 'routeDay', f"{route} | {day}", sign, revenue=share)
+
+def _refundContribution(record: Dict[str, Any], sign: int, delta: Delta) -> None:
+    if record.get('status') != PROCESSED_REFUND_STATUS:
+        return
+    amount = float(record.get('refundAmount') or 0)
+    day = _day(record.get('processedDatetime') or record.get('requestDatetime'))
+    _add(delta, 'total', 'all', sign, refunded=amount, refunds=1)
+    if day:
+        _add(delta, 'day', day, sign, refunded=amount, refunds=1)
+    ticketID = record.get('ticketID')
+    ticket_data = Ticket._table().get(ticketID) or archive.forModel(Ticket).get(ticketID)
+    tripID = ticket_data.get('tripID') if ticket_data else None
+    if tripID:
+        _add(delta, 'trip', tripID, sign, refunded=amount)
+        route = _routeName(tripID)
+        if route:
+            _add(delta, 'route', route, sign, refunded=amount)
+            if day:
+                _add(delta, 'routeDay', f"{route} | {day}", sign, refunded=amount)
+
+def _ticketContribution(record: Dict[str, Any], sign: int, delta: Delta) -> None:
+    tripID = record.get('tripID')
+    status = record.get('status')
+    counts = {'ticketsIssued': 1,
+              'ticketsActive': 1 if status == "Active" else 0,
+              'ticketsRefunded': 1 if status == "Refunded" else 0}
+    _add(delta, 'total', 'all', sign, **counts)
+    if tripID:
+        _add(delta, 'trip', tripID, sign, **counts)
+        route = _routeName(tripID)
+        if route:
+            _add(delta, 'route', route, sign, **counts)
+
+Contribution = Callable[[Dict[str, Any], int, Delta], None]
+
+_CONTRIBUTIONS: List[Tuple[type, Contribution]] = [
+    (Payment, _paymentContribution),
+    (Refund, _refundContribution),
+    (Ticket, _ticketContribution),
+]
+
+def _counterRows(delta: Delta, existing: Callable[[str], Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    rows = []
+    for (scope, key), fields in delta.items():
+        counterID = f"{scope}:{key}"
+        row = dict(existing(counterID) or {'counterID': counterID, 'scope': scope, 'key': key})
+        for field, amount in fields.items():
+            row[field] = round(row.get(field, 0) + amount, 2)
+        rows.append(row)
+    return rows
+
+def _listenerFor(contribution: Contribution) -> Callable[[List[Change]], None]:
+    def onChanges(changes: List[Change]) -> None:
+        if _ensureBuilt():
+            return # The rebuild already counted these changes
+        delta: Delta = {}
+        for _, old, new in changes:
+            if old is not None:
+                contribution(old, -1, delta)
+            if new is not None:
+                contribution(new, 1, delta)
+        if delta:
+            table = _table()
+            with table.transaction():
+                table.upsert_many(_counterRows(delta, table.get))
+    return onChanges
+
+_registeredOn: List[Table] = []
+
+def register() -> None:
+    """Hooks the counters into saves of payments, refunds and tickets. Safe to call again."""
+    for model, contribution in _CONTRIBUTIONS:
+        table = model._table()
+        if table not in _registeredOn:
+            table.listeners.append(_listenerFor(contribution))
+            _registeredOn.append(table)
+
+def rebuild() -> int:
+    """Recomputes every counter from the source stores (and their archives) and replaces the file in one write."""
+    delta: Delta = {}
+    for model, contribution in _CONTRIBUTIONS:
+        hot = model._table().items()
+        hotKeys = {key for key, _ in hot}
+        archived = [record for key, record in archive.forModel(model).items() if key not in hotKeys]
+        for record in [record for _, record in hot] + archived:
+            contribution(record, 1, delta)
+    rows = _counterRows(delta, lambda counterID: None)
+    table = _table()
+    with table.transaction():
+        stale = [(key, None) for key, _ in table.items()]
+        table.apply(stale + [(row['counterID'], row) for row in rows])
+    return len(rows)
+
+def getCounter(scope: str, key: str) -> Dict[str, Any]:
+    _ensureBuilt()
+    return _table().get(f"{scope}:{key}") or {'scope': scope, 'key': key}
+
+def getScope(scope: str) -> List[Dict[str, Any]]:
+    _ensureBuilt()
+    table = _table()
+    with table.lock:
+        return table.get_many(table.index('scope').keys(scope))
@@ -0,0 +1,114 @@
+# models/archive.py
+import gzip
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import metrics
+from .indexes import Index, Table
+
+# Read-only, gzip-compressed segments of records moved out of a hot store.
+#
+# Each archiving run writes one new segment per store and never touches it
+# again:
+#   archive/tickets/tickets-20250801T020000-1a2b3c4d.json.gz   (a JSON list)
+# ArchiveTable presents all of a store's segments as one read-only Table with
+# the model's indexes, so findByID and Query.includeArchived() can fall back to
+# it. A key found in both places is served from the hot store.
+
+ARCHIVE_DIR = os.environ.get('ART_ARCHIVE_DIR', 'archive')
+SEGMENT_SUFFIX = '.json.gz'
+
+def storeDirectory(file_path: str) -> str:
+    return os.path.join(ARCHIVE_DIR, os.path.splitext(os.path.basename(file_path))[0])
+
+def writeSegment(file_path: str, records: List[Dict[str, Any]]) -> str:
+    """Writes records as a new segment for a store and returns its path. Never overwrites."""
+    directory = storeDirectory(file_path)
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+    name = f"{os.path.basename(directory)}-{stamp}-{uuid.uuid4().hex[:8]}{SEGMENT_SUFFIX}"
+    path = os.path.join(directory, name)
+    started = time.perf_counter()
+    payload = json.dumps(records, separators=(',', ':')).encode('utf-8')
+    temp_path = path + '.tmp'
+    with gzip.open(temp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(temp_path, path) # Readers never see a half-written segment
+    metrics.recordIO(path, 'save', os.path.getsize(path), time.perf_counter() - started)
+    return path
+
+def readSegment(path: str) -> List[Dict[str, Any]]:
+    started = time.perf_counter()
+    try:
+        with gzip.open(path, 'rb') as f:
+            payload = f.read()
+        decodeStarted = time.perf_counter()
+        data = json.loads(payload)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read archive segment {path}: {e}. Skipping it.")
+        return []
+    finished = time.perf_counter()
+    metrics.recordIO(path, 'load', os.path.getsize(path), finished - started, finished - decodeStarted)
+    return data if isinstance(data, list) else []
+
+class ArchiveTable(Table):
+    """Every archived record of one store, loaded from its segments. Writes are refused."""
+
+    SHARED_VERSIONS = False # Segments are immutable; a new one shows up in the directory listing
+
+    def __init__(self, file_path: str, pk_field: str,
+                 index_factories: Optional[Dict[str, Callable[[], Index]]] = None):
+        super().__init__(os.path.abspath(storeDirectory(file_path)), pk_field, index_factories)
+
+    def segments(self) -> List[str]:
+        try:
+            names = os.listdir(self.file_path)
+        except OSError:
+            return []
+        return sorted(os.path.join(self.file_path, name) for name in names if name.endswith(SEGMENT_SUFFIX))
+
+    def _current_signature(self) -> Any:
+        return tuple(os.path.basename(path) for path in self.segments())
+
+    def _reload(self) -> None:
+        segments = self.segments()
+        self.records = {}
+        position = 0
+        for path in segments: # Oldest first, so a record archived again later wins
+            for item_data in readSegment(path):
+                if isinstance(item_data, dict):
+                    pk = item_data.get(self.pk_field)
+                    self.records[pk if pk is not None else ('__unkeyed__', position)] = item_data
+                    position += 1
+        self.signature = tuple(os.path.basename(path) for path in segments)
+        self._rebuild_indexes()
+        self.loaded = True
+        self.version += 1
+        self.loadedVersion = self.version
+        self.recordVersions = {}
+
+    def apply(self, changes: Iterable[Tuple[Any, Optional[Dict[str, Any]]]], notify: bool = True) -> int:
+        raise PermissionError(f"Archive {self.file_path} is read-only.")
+
+    def bulk_upsert(self, new_records: Iterable[Dict[str, Any]]) -> int:
+        raise PermissionError(f"Archive {self.file_path} is read-only.")
+
+_archives: Dict[str, ArchiveTable] = {}
+_archivesLock = threading.Lock()
+
+def forModel(model: Any) -> ArchiveTable:
+    """The archive of a model's store (empty if nothing has been archived yet)."""
+    key = os.path.abspath(storeDirectory(model.FILE_PATH)) # Relative to the data directory, like FILE_PATH
+    archive = _archives.get(key)
+    if archive is None:
+        with _archivesLock:
+            archive = _archives.get(key)
+            if archive is None:
+                archive = ArchiveTable(model.FILE_PATH, model.PRIMARY_KEY_FIELD, getattr(model, 'INDEXES', None))
+                _archives[key] = archive
+    return archive
@@ -0,0 +1,73 @@
+# models/archiver.py
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import archive
+from .base_model import BaseModel
+from .notification import Notification
+from .refund import Refund
+from .ticket import Ticket
+from .trip import Trip
+
+# Moves cold records out of the hot stores into archive segments (see archive).
+#
+# A record is cold once it is older than the cutoff and can no longer change:
+#   trips          departed before the cutoff
+#   tickets        for a trip that departed before the cutoff (issued before it, if the trip is gone)
+#   refunds        processed or failed before the cutoff
+#   notifications  read, and sent before the cutoff
+# Archived records stay reachable through findByID and Query.includeArchived(),
+# as read-only instances: save() refuses them, and bookings, holds and refunds
+# treat archived trips and tickets as departed.
+# Removing them does not touch the reporting counters, which still include them.
+
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ART_ARCHIVE_AFTER_DAYS', 90))
+
+def _before(dateStr: Optional[str], cutoff: datetime) -> bool:
+    parsed = BaseModel._parse_datetime(dateStr, default_now=False) if dateStr else None
+    return parsed is not None and parsed < cutoff
+
+def _tripIsCold(record: Dict[str, Any], cutoff: datetime) -> bool:
+    return _before(record.get('departureTime'), cutoff)
+
+def _ticketIsCold(record: Dict[str, Any], cutoff: datetime) -> bool:
+    tripID = record.get('tripID')
+    trip_data = (Trip._table().get(tripID) or archive.forModel(Trip).get(tripID)) if tripID else None
+    if trip_data is not None:
+        return _before(trip_data.get('departureTime'), cutoff)
+    return _before(record.get('issueDatetime'), cutoff)
+
+def _refundIsCold(record: Dict[str, Any], cutoff: datetime) -> bool:
+    if record.get('status') not in ("Processed", "Failed"):
+        return False
+    return _before(record.get('processedDatetime') or record.get('requestDatetime'), cutoff)
+
+def _notificationIsCold(record: Dict[str, Any], cutoff: datetime) -> bool:
+    return bool(record.get('readStatus')) and _before(record.get('sentDatetime'), cutoff)
+
+RULES: Dict[str, Tuple[type, Callable[[Dict[str, Any], datetime], bool]]] = {
+    'tickets': (Ticket, _ticketIsCold), # Before trips, so each ticket can still see its trip in the hot store
+    'trips': (Trip, _tripIsCold),
+    'refunds': (Refund, _refundIsCold),
+    'notifications': (Notification, _notificationIsCold),
+}
+
+def archiveStore(storeName: str, cutoff: datetime, dryRun: bool = False) -> int:
+    """Moves one store's cold records into a new archive segment. Returns how many moved."""
+    model, isCold = RULES[storeName]
+    table = model._table()
+    with table.transaction():
+        cold = [(key, record) for key, record in table.items() if isCold(record, cutoff)]
+        if cold and not dryRun:
+            # Segment first: a crash in between leaves a record in both places (the hot copy wins), never in neither.
+            archive.writeSegment(model.FILE_PATH, [record for _, record in cold])
+            table.apply(((key, None) for key, _ in cold), notify=False)
+    return len(cold)
+
+def archiveAll(days: Optional[int] = None, stores: Optional[List[str]] = None,
+               dryRun: bool = False) -> Dict[str, int]:
+    """Archives every (or the named) store's records older than days. Returns moved counts by store."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=ARCHIVE_AFTER_DAYS if days is None else days)
+    return {storeName: archiveStore(storeName, cutoff, dryRun)
+            for storeName in RULES if not stores or storeName in stores}
@@ -27,4 +27,13 @@ class ArtPassenger(User):
             'preferences': self.preferences,
             'loyaltyPoints': self.loyaltyPoints # Key camelCase
         })
-        return data
\ No newline at end of file
+        return data
+
+    @classmethod
+    def _typeFieldsFromDict(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'paymentMethods': data.get('paymentMethods'), # Expect camelCase key
+            'bookingHistory': data.get('bookingHistory'), # Expect camelCase key
+            'preferences': data.get('preferences'),
+            'loyaltyPoints': data.get('loyaltyPoints', 0) # Expect camelCase key
+        }
\ No newline at end of file
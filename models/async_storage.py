@@ -0,0 +1,58 @@
+# models/async_storage.py
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, List, Optional
+
+# Runs blocking model calls (file loads, saves, finders) on one bounded,
+# process-wide thread pool, so a request can do independent lookups side by side.
+# Synchronous views use runAll; runStorage and gatherStorage are the awaitable
+# forms, for code already running in an event loop. The views stay synchronous:
+# under WSGI an async view would pay for a fresh event loop on every request.
+
+STORAGE_WORKERS = int(os.environ.get('ART_STORAGE_WORKERS', 8))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executorLock = threading.Lock()
+
+def getExecutor() -> ThreadPoolExecutor:
+    global _executor
+    with _executorLock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=STORAGE_WORKERS, thread_name_prefix='art-storage')
+        return _executor
+
+async def runStorage(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Runs fn(*args, **kwargs) on the storage pool and awaits its result.
+
+    The caller's contextvars (e.g. the metrics request scope) are carried over,
+    so I/O done in the pool is still attributed to the request.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(getExecutor(), functools.partial(context.run, fn, *args, **kwargs))
+
+async def gatherStorage(*calls: Awaitable[Any]) -> List[Any]:
+    """Awaits several storage calls concurrently, returning results in order."""
+    return list(await asyncio.gather(*calls))
+
+def runAll(*calls: Callable[[], Any]) -> List[Any]:
+    """gatherStorage for synchronous code: runs zero-argument calls concurrently and returns results in order.
+
+    Calls must not wait on the pool themselves, or a full pool deadlocks.
+    """
+    if len(calls) <= 1:
+        return [call() for call in calls]
+    executor = getExecutor()
+    futures = [executor.submit(contextvars.copy_context().run, call) for call in calls]
+    return [future.result() for future in futures]
+
+def shutdown() -> None:
+    global _executor
+    with _executorLock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
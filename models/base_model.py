@@ -1,13 +1,21 @@
 # models/base_model.py
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional, TypeVar, Type
-from .json_helpers import _load_data, _save_data # Relative import
+from typing import List, Dict, Any, Optional, TypeVar, Type, Callable, Tuple, Union
+from . import archive, metrics, sharding
+from .indexes import Index, Table, get_table
+from .query import Query
 
 T = TypeVar('T', bound='BaseModel') # Bound to BaseModel for type safety
+Predicate = Union[Callable[[Dict[str, Any]], bool], Query] # Tested against raw records
 
 class BaseModel:
     FILE_PATH: str = ""
     PRIMARY_KEY_FIELD: str = ""
+    INDEXES: Dict[str, Callable[[], Index]] = {} # Index name -> factory, maintained on every save
+    SHARDING: Optional[sharding.ShardStrategy] = None # Defaults to the store's ART_SHARDING rule, if any
+    ARCHIVED: bool = False # findByID falls back to the store's archive (see archiver)
+    REQUIRED_FIELDS: Tuple[str, ...] = () # Keys from_dict refuses a record without
+    fromArchive: bool = False # Set on instances loaded from the archive, which save() refuses
 
     def to_dict(self) -> Dict[str, Any]:
         raise NotImplementedError("Subclasses must implement to_dict")
@@ -16,49 +24,92 @@ class BaseModel:
     def from_dict(cls: Type[T], data: Dict[str, Any]) -> Optional[T]:
         raise NotImplementedError("Subclasses must implement from_dict")
 
-    def save(self) -> bool:
-        if not self.FILE_PATH or not self.PRIMARY_KEY_FIELD:
-            raise ValueError("FILE_PATH and PRIMARY_KEY_FIELD must be set in subclass.")
+    @classmethod
+    def _construct(cls: Type[T], data: Dict[str, Any]) -> T:
+        """Builds an instance from a record with every REQUIRED_FIELDS key. Raises ValueError or TypeError
+        on bad values, where from_dict returns None, so importers can report why."""
+        obj = cls.from_dict(data)
+        if obj is None:
+            raise ValueError("Invalid field values")
+        return obj
 
-        all_data = _load_data(self.FILE_PATH)
-        instance_dict = self.to_dict()
-        primary_key_value = getattr(self, self.PRIMARY_KEY_FIELD)
+    @classmethod
+    def _fromRecord(cls: Type[T], record: Optional[Dict[str, Any]]) -> Optional[T]:
+        if record is None:
+            return None
+        metrics.recordDeserialized(cls.__name__, 1)
+        return cls.from_dict(record)
 
-        updated = False
-        for i, item_data in enumerate(all_data):
-            if item_data.get(self.PRIMARY_KEY_FIELD) == primary_key_value:
-                all_data[i] = instance_dict
-                updated = True
-                break
-        if not updated:
-            all_data.append(instance_dict)
+    @classmethod
+    def _fromRecords(cls: Type[T], records: List[Dict[str, Any]]) -> List[T]:
+        """Deserializes raw records, dropping any that from_dict rejects."""
+        metrics.recordDeserialized(cls.__name__, len(records))
+        items: List[T] = []
+        for record in records:
+            obj = cls.from_dict(record)
+            if obj:
+                items.append(obj)
+        return items
 
-        _save_data(self.FILE_PATH, all_data)
+    @classmethod
+    def _table(cls) -> Table:
+        if not cls.FILE_PATH or not cls.PRIMARY_KEY_FIELD:
+            raise ValueError("FILE_PATH and PRIMARY_KEY_FIELD must be set in subclass.")
+        return get_table(cls.FILE_PATH, cls.PRIMARY_KEY_FIELD, cls.INDEXES,
+                         cls.SHARDING or sharding.configured(cls.FILE_PATH))
+
+    def save(self) -> bool:
+        if self.fromArchive: # Writing it back would resurrect the record in the hot store
+            raise PermissionError(f"{type(self).__name__} {getattr(self, self.PRIMARY_KEY_FIELD, '')} is archived and read-only.")
+        self._table().upsert(self.to_dict())
         return True
 
     @classmethod
     def findByID(cls: Type[T], item_id: str) -> Optional[T]:
-        if not cls.FILE_PATH or not cls.PRIMARY_KEY_FIELD:
-            raise ValueError("FILE_PATH and PRIMARY_KEY_FIELD must be set in subclass.")
+        record = cls._table().get(item_id)
+        if record is None and cls.ARCHIVED:
+            return cls._markArchived(cls._fromRecord(archive.forModel(cls).get(item_id)))
+        return cls._fromRecord(record)
 
-        all_data = _load_data(cls.FILE_PATH)
-        for item_data in all_data:
-            if item_data.get(cls.PRIMARY_KEY_FIELD) == item_id:
-                return cls.from_dict(item_data)
-        return None
+    @staticmethod
+    def _markArchived(obj: Optional[T]) -> Optional[T]:
+        if obj is not None:
+            obj.fromArchive = True
+        return obj
 
     @classmethod
-    def getAll(cls: Type[T]) -> List[T]:
-        if not cls.FILE_PATH:
-            raise ValueError("FILE_PATH must be set in subclass.")
+    def query(cls) -> Query:
+        return Query(cls)
 
-        all_data = _load_data(cls.FILE_PATH)
-        items: List[T] = []
-        for item_data in all_data:
-            obj = cls.from_dict(item_data)
-            if obj:
-                items.append(obj)
-        return items
+    @classmethod
+    def _matchingItems(cls, predicate: Predicate) -> List[Tuple[Any, Dict[str, Any]]]:
+        if isinstance(predicate, Query):
+            if predicate.withArchived: # Writing them back would resurrect archived records in the hot store
+                raise ValueError("updateWhere and deleteWhere cannot match archived records; drop includeArchived().")
+            return predicate.items()
+        return [(key, item_data) for key, item_data in cls._table().items() if predicate(item_data)]
+
+    @classmethod
+    def updateWhere(cls, predicate: Predicate, changes: Dict[str, Any]) -> int:
+        """Applies changes to every raw record matching predicate in one pass and one write."""
+        if cls.PRIMARY_KEY_FIELD in changes:
+            raise ValueError(f"updateWhere cannot change the primary key '{cls.PRIMARY_KEY_FIELD}'.")
+        table = cls._table()
+        with table.transaction():
+            updated = [(key, {**item_data, **changes}) for key, item_data in cls._matchingItems(predicate)]
+            table.apply(updated)
+        return len(updated)
+
+    @classmethod
+    def deleteWhere(cls, predicate: Predicate) -> int:
+        """Deletes every raw record matching predicate in one pass and one write."""
+        table = cls._table()
+        with table.transaction():
+            return table.apply((key, None) for key, _ in cls._matchingItems(predicate))
+
+    @classmethod
+    def getAll(cls: Type[T]) -> List[T]:
+        return cls._fromRecords(cls._table().scan())
 
     @classmethod
     def _parse_datetime(cls, dateStr: Optional[str], default_now: bool = True) -> Optional[datetime]:
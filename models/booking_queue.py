@@ -0,0 +1,165 @@
+# models/booking_queue.py
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional
+
+from . import booking_service
+from .booking_service import BookingResult
+from .trip import Trip
+
+# Admission control for flash sales. Bookings for a trip wait in that trip's
+# queue and a single drain per trip books them in batches through
+# booking_service.bookBatch: one seat-map write and one bulk write per record
+# type for the whole batch, instead of every request contending for the trips
+# lock and writing its own order, payment and tickets. A queue that is already
+# QUEUE_LIMIT deep refuses new requests with QueueFull, carrying a Retry-After
+# estimate from the trip's recent drain rate, rather than letting them pile up.
+# An idle trip's queue is dropped but its drain rate is remembered (for the
+# RATE_MEMORY most recently drained trips), so the next burst gets a real
+# estimate. A caller waits at most WAIT_SECONDS for its batch; one whose request
+# was never started is taken out of the queue and told the booking failed.
+
+ENABLED = os.environ.get('ART_BOOKING_QUEUE', '1') != '0'
+QUEUE_LIMIT = int(os.environ.get('ART_BOOKING_QUEUE_LIMIT', 200)) # Waiting requests per trip
+BATCH_LIMIT = int(os.environ.get('ART_BOOKING_BATCH_LIMIT', 50)) # Requests booked per batch
+WORKERS = int(os.environ.get('ART_BOOKING_WORKERS', 4)) # Trips drained at once
+WAIT_SECONDS = float(os.environ.get('ART_BOOKING_WAIT_SECONDS', 60)) # Longest a caller waits for its batch
+MAX_RETRY_AFTER = 30 # Seconds
+RATE_MEMORY = 1024 # Idle trips whose drain rate is remembered
+
+queueCounts = {"accepted": 0, "rejected": 0, "batches": 0, "timedOut": 0}
+
+class QueueFull(Exception):
+    def __init__(self, tripID: str, retryAfter: int):
+        super().__init__(f"Booking queue for trip {tripID} is full.")
+        self.tripID = tripID
+        self.retryAfter = retryAfter # Whole seconds, for the Retry-After header
+
+class BookingRequest:
+    def __init__(self, userID: str, numTickets: int, preferredSeats: Optional[List[str]]):
+        self.userID = userID
+        self.numTickets = numTickets
+        self.preferredSeats = preferredSeats
+        self.done = threading.Event()
+        self.result: Optional[BookingResult] = None
+
+class TripQueue:
+    def __init__(self):
+        self.pending: Deque[BookingRequest] = deque()
+        self.draining = False
+        self.rate = 0.0 # Requests booked per second, moving average over recent batches
+
+class BookingQueues:
+    def __init__(self, queueLimit: int = QUEUE_LIMIT, batchLimit: int = BATCH_LIMIT, workers: int = WORKERS):
+        self.queueLimit = queueLimit
+        self.batchLimit = batchLimit
+        self.workers = workers
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            # Drain threads do not survive fork; a child starts with no queues.
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        self.queues: Dict[str, TripQueue] = {}
+        self.rates: 'OrderedDict[str, float]' = OrderedDict() # Idle trips' drain rates, least recently drained first
+        self.lock = threading.Lock()
+        self.executor: Optional[ThreadPoolExecutor] = None
+
+    def retryAfter(self, queue: TripQueue) -> int:
+        if queue.rate <= 0:
+            return MAX_RETRY_AFTER
+        return min(MAX_RETRY_AFTER, max(1, math.ceil(len(queue.pending) / queue.rate)))
+
+    def submit(self, userID: str, trip: Trip, numTickets: int = 1,
+               preferredSeats: Optional[List[str]] = None) -> BookingResult:
+        """Books through the trip's queue and waits for the result. Raises QueueFull when the queue is at its limit."""
+        request = BookingRequest(userID, numTickets, preferredSeats)
+        with self.lock:
+            queue = self.queues.get(trip.tripID)
+            if queue is None:
+                queue = self.queues[trip.tripID] = TripQueue()
+                queue.rate = self.rates.pop(trip.tripID, 0.0)
+            if len(queue.pending) >= self.queueLimit:
+                queueCounts["rejected"] += 1
+                raise QueueFull(trip.tripID, self.retryAfter(queue))
+            queue.pending.append(request)
+            queueCounts["accepted"] += 1
+            if not queue.draining:
+                queue.draining = True
+                if self.executor is None:
+                    self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='art-booking')
+                try:
+                    self.executor.submit(self._drain, trip.tripID)
+                except RuntimeError: # Executor shut down (interpreter exit); nothing will drain this request
+                    queue.pending.remove(request)
+                    queue.draining = False
+                    raise
+        if not request.done.wait(WAIT_SECONDS):
+            with self.lock:
+                queue = self.queues.get(trip.tripID)
+                if queue is not None and request in queue.pending: # Never started, so nothing was booked
+                    queue.pending.remove(request)
+                    request.result = BookingResult('seat_failure', "Booking timed out. Please try again.", "error", trip=trip)
+                    request.done.set()
+                queueCounts["timedOut"] += 1
+            if not request.done.wait(0):
+                # In a batch that has not finished; it may still book, so the caller is told to check.
+                return BookingResult('seat_failure', "Your booking is taking longer than expected. "
+                                     "Please check your orders before trying again.", "error", trip=trip)
+        result = request.result
+        booking_service._refreshTrip(trip) # The booking pages show the caller's trip
+        if result.trip is not None:
+            result.trip = trip
+        return result
+
+    def _drain(self, tripID: str) -> None:
+        while True:
+            with self.lock:
+                queue = self.queues[tripID]
+                if not queue.pending:
+                    queue.draining = False
+                    del self.queues[tripID] # Idle trips keep only their drain rate
+                    if queue.rate > 0:
+                        self.rates[tripID] = queue.rate
+                        while len(self.rates) > RATE_MEMORY:
+                            self.rates.popitem(last=False)
+                    return
+                batch = [queue.pending.popleft() for _ in range(min(self.batchLimit, len(queue.pending)))]
+            started = time.monotonic()
+            results: List[BookingResult] = []
+            try:
+                results = booking_service.bookBatch(
+                    tripID, [(request.userID, request.numTickets, request.preferredSeats) for request in batch])
+            except Exception as e:
+                print(f"Warning: Booking batch for trip {tripID} failed: {e}")
+            finally: # Every caller in the batch is answered, whatever escaped
+                failed = BookingResult('seat_failure', "Booking failed. Please try again.", "error")
+                for request, result in zip(batch, results + [failed] * (len(batch) - len(results))):
+                    request.result = result
+                    request.done.set()
+            elapsed = max(time.monotonic() - started, 1e-3)
+            with self.lock:
+                queueCounts["batches"] += 1
+                batchRate = len(batch) / elapsed
+                queue.rate = batchRate if queue.rate <= 0 else 0.8 * queue.rate + 0.2 * batchRate
+
+bookingQueues = BookingQueues()
+
+def bookTrip(userID: str, trip: Trip, numTicketsToBook: int = 1,
+             preferredSeats: Optional[List[str]] = None) -> BookingResult:
+    """booking_service.bookTrip through the trip's queue. Raises QueueFull; see BookingQueues.submit."""
+    if not ENABLED:
+        return booking_service.bookTrip(userID, trip, numTicketsToBook, preferredSeats)
+    if trip.availableSeats < numTicketsToBook: # Refused without queueing, as bookTrip does
+        return BookingResult('sold_out', "Not enough available seats.", "error", trip=trip)
+    return bookingQueues.submit(userID, trip, numTicketsToBook, preferredSeats)
+
+def stats() -> Dict[str, Any]:
+    """Request counters plus how many requests are waiting now."""
+    with bookingQueues.lock:
+        waiting = sum(len(queue.pending) for queue in bookingQueues.queues.values())
+        return {**queueCounts, "waiting": waiting}
@@ -0,0 +1,277 @@
+# models/booking_service.py
+from typing import List, Optional, Tuple
+from . import seat_holds
+from .indexes import upsertAll
+from .order import Order
+from .order_line_item import OrderLineItem
+from .payment import Payment
+from .refund import Refund
+from .ticket import Ticket
+from .trip import Trip
+
+# Booking and refund workflows shared by the HTML routes and the JSON API.
+# Each returns a result carrying an outcome code for the API, plus the message
+# and flash category the HTML pages have always shown.
+
+class BookingResult:
+    def __init__(self, outcome: str, message: str, category: str, trip: Optional[Trip] = None,
+                 order: Optional[Order] = None, payment: Optional[Payment] = None,
+                 tickets: Optional[List[Ticket]] = None):
+        # 'booked', 'sold_out', 'seat_unavailable', 'hold_expired', 'payment_failed' or 'seat_failure'
+        self.outcome = outcome
+        self.message = message
+        self.category = category
+        self.trip = trip
+        self.order = order
+        self.payment = payment
+        self.tickets = tickets or []
+
+    @property
+    def success(self) -> bool:
+        return self.outcome == 'booked'
+
+class RefundResult:
+    def __init__(self, outcome: str, message: str, category: str, order: Optional[Order] = None,
+                 refunds: Optional[List[Refund]] = None):
+        # 'refunded', 'partially_refunded', 'not_found', 'forbidden', 'not_eligible',
+        # 'payment_missing', 'already_refunded' or 'nothing_to_refund'
+        self.outcome = outcome
+        self.message = message
+        self.category = category
+        self.order = order
+        self.refunds = refunds or []
+
+    @property
+    def success(self) -> bool:
+        return self.outcome in ('refunded', 'partially_refunded')
+
+def _refreshTrip(tripToBook: Trip) -> None:
+    """Copies the stored seat state onto the caller's trip, which the booking pages display."""
+    currentTrip = Trip.findByID(tripToBook.tripID) # Call camelCase method
+    if currentTrip:
+        tripToBook.availableSeats = currentTrip.availableSeats
+        tripToBook.capacity, tripToBook.seatMap = currentTrip.capacity, currentTrip.seatMap
+        tripToBook.seatHolds = currentTrip.seatHolds
+
+def bookTrip(userID: str, tripToBook: Trip, numTicketsToBook: int = 1,
+             preferredSeats: Optional[List[str]] = None, holdID: Optional[str] = None) -> BookingResult:
+    """Creates the order, line item, payment and tickets for a booking and takes the seats.
+
+    The seats are held (see seat_holds) before payment and kept only once it
+    succeeds. preferredSeats (one per ticket) are held exactly or the booking is
+    refused. A hold placed earlier in checkout can be passed as holdID instead;
+    its seats then set the ticket count.
+    """
+    if holdID is None:
+        if tripToBook.availableSeats < numTicketsToBook: # Access camelCase attribute
+            return BookingResult('sold_out', "Not enough available seats.", "error", trip=tripToBook)
+        hold = seat_holds.placeHold(tripToBook.tripID, numTicketsToBook, preferredSeats)
+        if hold is None:
+            _refreshTrip(tripToBook)
+            if preferredSeats:
+                return BookingResult('seat_unavailable', f"Seat(s) {', '.join(preferredSeats)} are not available on this trip.",
+                                     "error", trip=tripToBook)
+            return BookingResult('sold_out', "Not enough available seats.", "error", trip=tripToBook)
+    else:
+        hold = seat_holds.getHold(tripToBook.tripID, holdID)
+        if hold is None:
+            return BookingResult('hold_expired', "Your seat hold has expired. Please choose your seats again.",
+                                 "error", trip=tripToBook)
+        numTicketsToBook = len(hold.seats)
+
+    newOrder = Order(userID=userID, status="PendingPayment") # Pass camelCase params
+    newOrder.save()
+
+    lineItem = OrderLineItem(
+        orderID=newOrder.orderID, # Access camelCase attribute
+        itemID=tripToBook.tripID,
+        itemType="TripTicket",      # Pass camelCase params
+        quantity=numTicketsToBook,
+        unitPrice=tripToBook.price # Access lowercase attribute (price was not changed)
+    )
+    lineItem.save()
+
+    orderTotalAmount = newOrder.calculateTotalAmount() # Call camelCase method
+
+    mockPaymentSuccessful = True
+    savedPayment = None
+    if mockPaymentSuccessful:
+        newPayment = Payment(orderID=newOrder.orderID, amount=orderTotalAmount, status="Completed") # Pass camelCase params
+        newPayment.save()
+        savedPayment = newPayment
+        newOrder.status = "Completed" # status is lowercase
+        newOrder.save()
+    else:
+        newOrder.status = "PaymentFailed"
+        newOrder.save()
+        seat_holds.releaseHold(tripToBook.tripID, hold.holdID)
+        _refreshTrip(tripToBook)
+        return BookingResult('payment_failed', "Payment failed.", "error", trip=tripToBook, order=newOrder)
+
+    seatNumbers = seat_holds.confirmHold(tripToBook.tripID, hold.holdID) # None if the hold ran out during payment
+    _refreshTrip(tripToBook)
+    if seatNumbers is not None:
+        createdTickets = [] # Local var
+        for seatNumber in seatNumbers:
+            newTicket = Ticket(userID=userID, tripID=tripToBook.tripID, orderID=newOrder.orderID,
+                               paymentID=savedPayment.paymentID, seatNumber=seatNumber) # Pass camelCase params
+            newTicket.save()
+            createdTickets.append(newTicket)
+
+        return BookingResult('booked', f"{numTicketsToBook} Ticket(s) purchased for Order {newOrder.orderID}!",
+                             'success', trip=tripToBook, order=newOrder, payment=savedPayment, tickets=createdTickets)
+
+    savedPayment.status = "RequiresRefund"; savedPayment.save()
+    newOrder.status = "SeatBookingFailure"; newOrder.save()
+    return BookingResult('seat_failure', "Critical error: Payment successful, but failed to secure seats.",
+                         "error", trip=tripToBook, order=newOrder, payment=savedPayment)
+
+def bookBatch(tripID: str, requests: List[Tuple[str, int, Optional[List[str]]]]) -> List[BookingResult]:
+    """Books several (userID, numTickets, preferredSeats) requests for one trip at once.
+
+    Seats for the whole batch are assigned with one trips write, then orders, line
+    items, payments and tickets are each written with one bulk write, instead of
+    bookTrip's write per record. Payment is the same always-successful mock as in
+    bookTrip. Holds past their TTL are released first, as placeHold does; if the
+    bulk writes fail, the batch's seats are given back and its bookings end in
+    seat_failure, as in bookTrip. Results are in request order.
+    """
+    table = Trip._table()
+    with table.transaction():
+        trip = Trip.findByID(tripID) # Call camelCase method
+        if trip is None or trip.fromArchive: # Archived trips have departed
+            return [BookingResult('sold_out', "Trip not found.", "error") for _ in requests]
+        seat_holds.reapExpired(trip)
+        seatsByRequest = [trip.assignSeats(numTickets, preferredSeats) # Call camelCase method
+                          for _, numTickets, preferredSeats in requests]
+        trip.save()
+
+    results: List[BookingResult] = []
+    orders, lineItems, payments, tickets = [], [], [], []
+    for (userID, numTickets, preferredSeats), seatNumbers in zip(requests, seatsByRequest):
+        if seatNumbers is None:
+            if preferredSeats:
+                results.append(BookingResult('seat_unavailable', f"Seat(s) {', '.join(preferredSeats)} are not available on this trip.",
+                                             "error", trip=trip))
+            else:
+                results.append(BookingResult('sold_out', "Not enough available seats.", "error", trip=trip))
+            continue
+        newOrder = Order(userID=userID, status="Completed") # Pass camelCase params
+        lineItem = OrderLineItem(orderID=newOrder.orderID, itemID=tripID, itemType="TripTicket",
+                                 quantity=numTickets, unitPrice=trip.price) # Pass camelCase params
+        newPayment = Payment(orderID=newOrder.orderID, amount=lineItem.calculateLineTotal(), status="Completed")
+        newTickets = [Ticket(userID=userID, tripID=tripID, orderID=newOrder.orderID,
+                             paymentID=newPayment.paymentID, seatNumber=seatNumber) for seatNumber in seatNumbers]
+        orders.append(newOrder); lineItems.append(lineItem); payments.append(newPayment); tickets.extend(newTickets)
+        results.append(BookingResult('booked', f"{numTickets} Ticket(s) purchased for Order {newOrder.orderID}!",
+                                     'success', trip=trip, order=newOrder, payment=newPayment, tickets=newTickets))
+
+    # Line items before payments: the reporting counters split each payment by its order's lines.
+    try:
+        upsertAll((model._table(), [obj.to_dict() for obj in created])
+                  for model, created in ((Order, orders), (OrderLineItem, lineItems), (Payment, payments), (Ticket, tickets)))
+    except Exception as e:
+        print(f"Warning: Booking writes for trip {tripID} failed, releasing {len(tickets)} seats: {e}")
+        return _failBatch(tripID, results, tickets)
+    return results
+
+def _failBatch(tripID: str, results: List[BookingResult], tickets: List[Ticket]) -> List[BookingResult]:
+    """Gives back the seats of a batch whose writes failed and turns its bookings into seat_failure results."""
+    with Trip._table().transaction():
+        trip = Trip.findByID(tripID) # Call camelCase method
+        if trip is not None and not trip.fromArchive:
+            trip.releaseSeats([ticket.seatNumber for ticket in tickets]) # Call camelCase method
+            trip.save()
+    failed: List[BookingResult] = []
+    for result in results:
+        if not result.success:
+            failed.append(result)
+            continue
+        result.payment.status = "RequiresRefund"
+        result.order.status = "SeatBookingFailure"
+        failed.append(BookingResult('seat_failure', "Critical error: Payment successful, but failed to secure seats.",
+                                    "error", trip=result.trip, order=result.order, payment=result.payment))
+    try: # Best effort: whichever of these records were written must not read as completed
+        booked = [result for result in failed if result.outcome == 'seat_failure']
+        upsertAll([(Order._table(), [result.order.to_dict() for result in booked]),
+                   (Payment._table(), [result.payment.to_dict() for result in booked])])
+    except Exception as e:
+        print(f"Warning: Could not mark failed bookings for trip {tripID}: {e}")
+    return failed
+
+def refundOrder(userID: str, orderIDToRefund: Optional[str]) -> RefundResult:
+    """Refunds every active ticket of a completed order owned by userID and releases their seats."""
+    orderToRefund = Order.findByID(orderIDToRefund) if orderIDToRefund else None # Call camelCase method
+
+    if not orderToRefund:
+        return RefundResult('not_found', "Order not found.", "error")
+    if orderToRefund.userID != userID: # Access camelCase attribute
+        return RefundResult('forbidden', "This order does not belong to you.", "error", order=orderToRefund)
+    if orderToRefund.status != "Completed":
+        return RefundResult('not_eligible', f"Order (Status: {orderToRefund.status}) not eligible for refund.",
+                            "warning", order=orderToRefund)
+
+    paymentForOrder = Payment.findByOrderID(orderToRefund.orderID) # Call camelCase method
+    ticketsForOrder = Ticket.findByOrderID(orderToRefund.orderID) # Call camelCase method
+
+    if not paymentForOrder:
+        return RefundResult('payment_missing', "Payment for this order not found. Cannot process refund.",
+                            "error", order=orderToRefund)
+    if paymentForOrder.status == "Refunded":
+        if orderToRefund.status != "Refunded":
+            orderToRefund.status = "Refunded"; orderToRefund.save()
+        return RefundResult('already_refunded', "This order has already been fully refunded.", "info",
+                            order=orderToRefund)
+
+    refunds: List[Refund] = []
+    for ticket in ticketsForOrder:
+        if ticket.status == "Active" and not ticket.fromArchive: # Archived tickets belong to departed trips
+            tripOfTicket = Trip.findByID(ticket.tripID) # Call camelCase method
+            if tripOfTicket and tripOfTicket.fromArchive:
+                continue
+
+            lineItemsForOrder = OrderLineItem.findByOrderID(orderToRefund.orderID) # Call camelCase method
+            refundAmountThisTicket = 0 # Local var
+            if lineItemsForOrder:
+                numOriginalTicketsInOrder = sum(li.quantity for li in lineItemsForOrder if li.itemType == "TripTicket") # Access camelCase attr
+                if numOriginalTicketsInOrder > 0:
+                    refundAmountThisTicket = orderToRefund.calculateTotalAmount() / numOriginalTicketsInOrder # Call camelCase method
+                else:
+                    refundAmountThisTicket = paymentForOrder.amount / len(ticketsForOrder) if ticketsForOrder else 0
+            else:
+                refundAmountThisTicket = paymentForOrder.amount / len(ticketsForOrder) if ticketsForOrder else 0
+
+            newRefund = Refund(paymentID=paymentForOrder.paymentID, # Access camelCase attr
+                               orderID=orderToRefund.orderID, # Access camelCase attr
+                               ticketID=ticket.ticketID, # Access camelCase attr
+                               refundAmount=refundAmountThisTicket) # Pass camelCase param
+            newRefund.updateStatus("Processed") # Call camelCase method
+            newRefund.save()
+
+            ticket.status = "Refunded"
+            ticket.save()
+
+            if tripOfTicket:
+                with Trip._table().transaction():
+                    tripOfTicket = Trip.findByID(ticket.tripID) or tripOfTicket # Fresh seat map
+                    if tripOfTicket.capacity is not None:
+                        tripOfTicket.releaseSeats([ticket.seatNumber]) # Call camelCase method
+                    else:
+                        tripOfTicket.updateSeats(1, operation="refund") # Call camelCase method
+                    tripOfTicket.save()
+            refunds.append(newRefund)
+
+    if not refunds:
+        return RefundResult('nothing_to_refund', "No active tickets found in this order to refund.", "info",
+                            order=orderToRefund)
+
+    all_tickets_refunded = all(t.status == "Refunded" for t in Ticket.findByOrderID(orderToRefund.orderID)) # Call camelCase method
+    if all_tickets_refunded:
+        paymentForOrder.status = "Refunded"
+        paymentForOrder.save()
+        orderToRefund.status = "Refunded"
+        orderToRefund.save()
+        return RefundResult('refunded', f"All {len(refunds)} ticket(s) in the order refunded successfully. Order status updated.",
+                            "success", order=orderToRefund, refunds=refunds)
+    return RefundResult('partially_refunded', f"{len(refunds)} ticket(s) in the order refunded. Some tickets may not have been active or already refunded.",
+                        "info", order=orderToRefund, refunds=refunds)
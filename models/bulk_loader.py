@@ -0,0 +1,163 @@
+# models/bulk_loader.py
+import csv
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .location import Location
+from .route import Route
+from .stop import Stop
+from .trip import Trip
+
+# Streaming timetable import: rows are read one at a time from CSV or JSONL,
+# validated against the model's required fields and constructor, normalised
+# through to_dict and upserted by primary key in chunks of CHUNK_ROWS, so memory
+# stays bounded however large the file is. The whole import runs in one store
+# transaction. Rejected rows are reported with their line number and reason. Re-importing a trip that already exists updates its
+# timetable fields but keeps what selling it has changed: its seat count, seat
+# map and holds, and its current fare (the imported price becomes its base fare
+# once dynamic fares have priced it).
+
+IMPORTABLE_MODELS: Dict[str, type] = {
+    'trips': Trip,
+    'stops': Stop,
+    'routes': Route,
+    'locations': Location,
+}
+
+TRIP_RUNTIME_FIELDS = ('availableSeats', 'capacity', 'seatMap', 'seatHolds', 'baseFare')
+
+CHUNK_ROWS = int(os.environ.get('ART_IMPORT_CHUNK_ROWS', 5000)) # Rows buffered per write
+
+LIST_FIELDS = {'stopIDs'} # CSV cells holding lists, separated by LIST_SEPARATOR
+LIST_SEPARATOR = ';'
+
+Row = Tuple[int, Optional[Dict[str, Any]], Optional[str]] # (line number, row, parse error)
+
+class ImportReport:
+    def __init__(self, storeName: str):
+        self.storeName = storeName
+        self.rowsRead = 0
+        self.inserted = 0
+        self.updated = 0
+        self.rejected: List[Dict[str, Any]] = [] # {'line', 'reason', 'row'}
+        self.seconds = 0.0
+
+    @property
+    def accepted(self) -> int:
+        return self.inserted + self.updated
+
+    @property
+    def rowsPerSecond(self) -> float:
+        return self.rowsRead / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.storeName}: read {self.rowsRead} rows, {self.inserted} inserted, {self.updated} updated, "
+                f"{len(self.rejected)} rejected in {self.seconds:.2f}s ({self.rowsPerSecond:,.0f} rows/s)")
+
+def _mergeTrip(existing: Dict[str, Any], imported: Dict[str, Any]) -> Dict[str, Any]:
+    merged = {**existing, **imported}
+    for field in TRIP_RUNTIME_FIELDS:
+        if field in existing:
+            merged[field] = existing[field]
+        else:
+            merged.pop(field, None) # A capacity arriving on a sold trip would not match its tickets
+    if existing.get('baseFare') is not None: # Repriced: the timetable price is the new base fare
+        merged['baseFare'], merged['price'] = imported['price'], existing['price']
+    return merged
+
+MERGERS = {'trips': _mergeTrip} # store -> (existing record, imported record) -> record to write
+
+def _csvRows(path: str) -> Iterator[Row]:
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            cleaned: Dict[str, Any] = {}
+            for field, value in row.items():
+                if field is None: # More cells than header columns
+                    continue
+                value = value.strip() if isinstance(value, str) else value
+                if value == '':
+                    value = None
+                elif field in LIST_FIELDS:
+                    value = [part.strip() for part in value.split(LIST_SEPARATOR) if part.strip()]
+                cleaned[field] = value
+            yield reader.line_num, cleaned, None
+
+def _jsonlRows(path: str) -> Iterator[Row]:
+    with open(path, encoding='utf-8') as f:
+        for lineNumber, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield lineNumber, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield lineNumber, None, "Expected a JSON object per line"
+                continue
+            yield lineNumber, row, None
+
+def readRows(path: str, fileFormat: Optional[str] = None) -> Iterator[Row]:
+    """Streams rows from a CSV or JSONL file; the format defaults to the file extension."""
+    fileFormat = fileFormat or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+    if fileFormat == 'csv':
+        return _csvRows(path)
+    if fileFormat == 'jsonl':
+        return _jsonlRows(path)
+    raise ValueError(f"Unsupported import format '{fileFormat}'. Expected 'csv' or 'jsonl'.")
+
+def _parseRow(model: type, row: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """(normalised record, None), or (None, why the row was refused)."""
+    missing = [field for field in model.REQUIRED_FIELDS if row.get(field) in (None, '')]
+    if missing:
+        return None, f"Missing required field(s): {', '.join(missing)}"
+    try:
+        return model._construct(row).to_dict(), None
+    except (ValueError, TypeError) as e:
+        return None, f"Invalid value: {e}"
+
+def importFile(storeName: str, path: str, fileFormat: Optional[str] = None, dryRun: bool = False,
+               chunkRows: int = CHUNK_ROWS) -> ImportReport:
+    """Validates and upserts every row of path into the named store, one write per chunkRows rows."""
+    model = IMPORTABLE_MODELS[storeName]
+    report = ImportReport(storeName)
+    started = time.perf_counter()
+    table = model._table()
+    merge = MERGERS.get(storeName)
+    existedBefore: Dict[Any, bool] = {} # Keys imported so far; later rows for the same key win
+    pending: Dict[Any, Dict[str, Any]] = {}
+
+    def flush() -> None:
+        for pk, record in pending.items():
+            if pk not in existedBefore:
+                existing = table.get(pk)
+                existedBefore[pk] = existing is not None
+                if existing is None:
+                    report.inserted += 1
+                else:
+                    report.updated += 1
+            # Only records that were there before the import keep their runtime fields.
+            if existedBefore[pk] and merge is not None:
+                pending[pk] = merge(table.get(pk), record)
+        if not dryRun:
+            table.bulk_upsert(pending.values())
+        pending.clear()
+
+    with table.transaction():
+        for lineNumber, row, error in readRows(path, fileFormat):
+            report.rowsRead += 1
+            record = None
+            if error is None:
+                record, error = _parseRow(model, row)
+            if error:
+                report.rejected.append({'line': lineNumber, 'reason': error, 'row': row})
+                continue
+            pending[record[model.PRIMARY_KEY_FIELD]] = record
+            if len(pending) >= chunkRows:
+                flush()
+        flush()
+
+    report.seconds = time.perf_counter() - started
+    return report
@@ -0,0 +1,143 @@
+# models/columnar.py
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .base_model import BaseModel
+from .payment import Payment
+from .ticket import Ticket
+from .trip import Trip
+
+try:
+    import numpy as np
+except ImportError: # Optional: only the analytics export needs NumPy
+    np = None
+
+# Typed column snapshots of the ticket, payment and trip stores.
+#
+# Every store becomes one directory of .npy files, one per column, so each column
+# can be opened with np.load(..., mmap_mode='r') without reading the rest:
+#   category -> <col>.codes.npy (int32, -1 = missing) + <col>.categories.npy (str)
+#   datetime -> <col>.npy int64 microseconds since the Unix epoch (MISSING_TIME = missing)
+#   float    -> <col>.npy float64 (NaN = missing)
+#   int      -> <col>.npy int64
+
+MISSING_TIME = -(2 ** 63)
+MICROSECONDS_PER_DAY = 86_400_000_000
+
+ColumnSpec = Tuple[str, str] # (field name, kind)
+
+SCHEMAS: Dict[str, Tuple[type, List[ColumnSpec]]] = {
+    'tickets': (Ticket, [('ticketID', 'category'), ('userID', 'category'), ('tripID', 'category'),
+                         ('orderID', 'category'), ('paymentID', 'category'), ('seatNumber', 'category'),
+                         ('status', 'category'), ('issueDatetime', 'datetime')]),
+    'payments': (Payment, [('paymentID', 'category'), ('orderID', 'category'), ('amount', 'float'),
+                           ('method', 'category'), ('status', 'category'), ('paymentDatetime', 'datetime')]),
+    'trips': (Trip, [('tripID', 'category'), ('origin', 'category'), ('destination', 'category'),
+                     ('departureTime', 'datetime'), ('price', 'float'), ('availableSeats', 'int')]),
+}
+
+def _requireNumpy() -> None:
+    if np is None:
+        raise RuntimeError("NumPy is required for columnar exports. Install it with 'pip install numpy'.")
+
+def _epochMicros(value: Any) -> int:
+    parsed = BaseModel._parse_datetime(value, default_now=False) if value else None
+    if parsed is None:
+        return MISSING_TIME
+    return int(parsed.timestamp() * 1_000_000)
+
+def _toNumber(value: Any, cast: type, missing: Any) -> Any:
+    try:
+        return cast(value) if value is not None else missing
+    except (TypeError, ValueError):
+        return missing
+
+def toColumns(records: List[Dict[str, Any]], columns: List[ColumnSpec]) -> Dict[str, Any]:
+    """Encodes raw records into typed NumPy arrays in a single pass over the records."""
+    _requireNumpy()
+    n = len(records)
+    arrays: Dict[str, Any] = {}
+    categoryCodes: Dict[str, Dict[Any, int]] = {}
+    for field, kind in columns:
+        if kind == 'category':
+            arrays[f"{field}.codes"] = np.full(n, -1, dtype=np.int32)
+            categoryCodes[field] = {}
+        elif kind == 'datetime':
+            arrays[field] = np.full(n, MISSING_TIME, dtype=np.int64)
+        elif kind == 'float':
+            arrays[field] = np.full(n, np.nan, dtype=np.float64)
+        elif kind == 'int':
+            arrays[field] = np.zeros(n, dtype=np.int64)
+        else:
+            raise ValueError(f"Unknown column kind '{kind}' for field '{field}'.")
+
+    for i, record in enumerate(records):
+        for field, kind in columns:
+            value = record.get(field)
+            if kind == 'category':
+                if value is not None:
+                    codes = categoryCodes[field]
+                    arrays[f"{field}.codes"][i] = codes.setdefault(value, len(codes))
+            elif kind == 'datetime':
+                arrays[field][i] = _epochMicros(value)
+            elif kind == 'float':
+                arrays[field][i] = _toNumber(value, float, np.nan)
+            else:
+                arrays[field][i] = _toNumber(value, int, 0)
+
+    for field, codes in categoryCodes.items():
+        arrays[f"{field}.categories"] = np.array([str(v) for v in codes], dtype=str)
+    return arrays
+
+def exportStore(name: str, outDir: str, bundle: bool = False) -> int:
+    """Writes one store's columns under outDir/<name>/. Returns the row count."""
+    _requireNumpy()
+    model, columns = SCHEMAS[name]
+    records = model._table().scan()
+    arrays = toColumns(records, columns)
+    storeDir = os.path.join(outDir, name)
+    os.makedirs(storeDir, exist_ok=True)
+    for column, array in arrays.items():
+        np.save(os.path.join(storeDir, f"{column}.npy"), array)
+    if bundle:
+        np.savez_compressed(os.path.join(outDir, f"{name}.npz"), **arrays)
+    return len(records)
+
+def exportAll(outDir: str, bundle: bool = False, stores: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    return {name: exportStore(name, outDir, bundle) for name in (stores or SCHEMAS)}
+
+def load(outDir: str, name: str, mmap: bool = True) -> Dict[str, Any]:
+    """Opens an exported store. Numeric columns are memory-mapped unless mmap is False."""
+    _requireNumpy()
+    storeDir = os.path.join(outDir, name)
+    arrays: Dict[str, Any] = {}
+    for fileName in sorted(os.listdir(storeDir)):
+        if fileName.endswith('.npy'):
+            column = fileName[:-len('.npy')]
+            # String arrays cannot be mapped, but categories are small.
+            mode = 'r' if mmap and not column.endswith('.categories') else None
+            arrays[column] = np.load(os.path.join(storeDir, fileName), mmap_mode=mode)
+    return arrays
+
+def groupSum(codes: Any, values: Any, categories: Any = None, where: Any = None) -> Dict[Any, float]:
+    """Sums values per group code with one bincount. Rows with a negative code or NaN value are skipped.
+
+    Pass categories to get labels back instead of integer codes, and where (a
+    boolean mask) to restrict the rows first.
+    """
+    _requireNumpy()
+    codes = np.asarray(codes)
+    values = np.asarray(values, dtype=np.float64)
+    keep = (codes >= 0) & ~np.isnan(values)
+    if where is not None:
+        keep &= np.asarray(where, dtype=bool)
+    size = len(categories) if categories is not None else (int(codes.max()) + 1 if codes.size else 0)
+    sums = np.bincount(codes[keep], weights=values[keep], minlength=size)
+    present = np.bincount(codes[keep], minlength=size) > 0
+    labels = [str(label) for label in categories] if categories is not None else range(size)
+    return {labels[i]: float(sums[i]) for i in np.flatnonzero(present)}
+
+def dayCodes(epochMicros: Any) -> Any:
+    """Days since the epoch for a timestamp column, usable as groupSum codes (-1 = missing)."""
+    _requireNumpy()
+    epochMicros = np.asarray(epochMicros)
+    return np.where(epochMicros == MISSING_TIME, -1, epochMicros // MICROSECONDS_PER_DAY)
@@ -0,0 +1,203 @@
+# models/consistency.py
+import contextlib
+import gc
+from typing import Any, Dict, List, Set, Tuple
+
+from . import archive
+from .order import Order
+from .payment import Payment
+from .refund import Refund
+from .seat_map import SeatMap
+from .ticket import Ticket
+from .trip import Trip
+
+# Cross-store consistency checks, done as hash joins: each store is scanned once
+# into a set or dict of its keys, and every reference is then an O(1) lookup,
+# so the whole check is linear in the number of records. Checked:
+#   references      ticket -> order, payment, trip; refund -> payment, order, ticket;
+#                   payment -> order (archived trips, tickets and refunds count as present)
+#   inventory       for seat-mapped trips, the seat map holds exactly the seats of
+#                   active tickets (archived ones included, since a trip can stay hot
+#                   after its tickets are archived) and seat holds, and
+#                   availableSeats = capacity - those
+#   refund totals   processed refunds never exceed their payment, and add up to it
+#                   once the payment is marked Refunded
+# Trips booked only before seat maps existed have no recorded capacity, so their
+# inventory cannot be checked until their first seat-assigned booking (which
+# backfills the map); only a negative seat count is reported for them, and the
+# report counts and lists them as unchecked.
+#
+# Repair rewrites the inventory of mismatched trips from their tickets and holds,
+# in one trips write. Trips with a ticket on an unknown or doubly sold seat are
+# left alone: their tickets need fixing first, and no seat map agrees with them.
+# Repair holds the trips lock for the whole pass, but a booking between taking
+# its seats and saving its tickets still looks like a leak, so run repairs while
+# bookings are quiet. Broken references and refund totals are
+# financial records and are only reported.
+
+MONEY_TOLERANCE = 0.01
+
+class Report:
+    def __init__(self, sampleLimit: int = 20):
+        self.sampleLimit = sampleLimit
+        self.counts: Dict[str, int] = {} # check name -> problems found
+        self.samples: Dict[str, List[str]] = {} # check name -> first few problem descriptions
+        self.scanned: Dict[str, int] = {} # store name -> records read
+        self.uncheckedTrips = 0 # Trips without a seat map
+        self.uncheckedSamples: List[str] = [] # First few of their IDs
+        self.repairedTrips = 0
+        self.unrepairedTrips = 0 # Mismatched, but with conflicting tickets
+
+    def add(self, check: str, detail: str) -> None:
+        self.counts[check] = self.counts.get(check, 0) + 1
+        samples = self.samples.setdefault(check, [])
+        if len(samples) < self.sampleLimit:
+            samples.append(detail)
+
+    @property
+    def problemCount(self) -> int:
+        return sum(self.counts.values())
+
+def _keys(model: type, withArchive: bool = False) -> Set[Any]:
+    keys = {key for key, _ in model._table().items()}
+    if withArchive:
+        keys.update(key for key, _ in archive.forModel(model).items())
+    return keys
+
+def _checkReferences(report: Report, ticketRecords: List[Dict[str, Any]]) -> None:
+    orderIDs = _keys(Order)
+    paymentIDs = _keys(Payment)
+    tripIDs = _keys(Trip, withArchive=True)
+    report.scanned.update(orders=len(orderIDs), payments=len(paymentIDs))
+
+    for ticket in ticketRecords:
+        ticketID = ticket.get('ticketID')
+        if ticket.get('orderID') not in orderIDs:
+            report.add('ticket_missing_order', f"Ticket {ticketID}: order {ticket.get('orderID')} not found")
+        if ticket.get('paymentID') not in paymentIDs:
+            report.add('ticket_missing_payment', f"Ticket {ticketID}: payment {ticket.get('paymentID')} not found")
+        if ticket.get('tripID') not in tripIDs:
+            report.add('ticket_missing_trip', f"Ticket {ticketID}: trip {ticket.get('tripID')} not found")
+
+    for payment in Payment._table().scan():
+        if payment.get('orderID') not in orderIDs:
+            report.add('payment_missing_order', f"Payment {payment.get('paymentID')}: order {payment.get('orderID')} not found")
+
+    ticketIDs = {ticket.get('ticketID') for ticket in ticketRecords}
+    ticketIDs.update(key for key, _ in archive.forModel(Ticket).items())
+    refundedByPayment: Dict[Any, float] = {}
+    refundRecords = Refund._table().scan() + [record for _, record in archive.forModel(Refund).items()]
+    report.scanned['refunds'] = len(refundRecords)
+    for refund in refundRecords:
+        refundID = refund.get('refundID')
+        if refund.get('paymentID') not in paymentIDs:
+            report.add('refund_missing_payment', f"Refund {refundID}: payment {refund.get('paymentID')} not found")
+        if refund.get('orderID') not in orderIDs:
+            report.add('refund_missing_order', f"Refund {refundID}: order {refund.get('orderID')} not found")
+        if refund.get('ticketID') not in ticketIDs:
+            report.add('refund_missing_ticket', f"Refund {refundID}: ticket {refund.get('ticketID')} not found")
+        if refund.get('status') == "Processed":
+            paymentID = refund.get('paymentID')
+            refundedByPayment[paymentID] = refundedByPayment.get(paymentID, 0.0) + float(refund.get('refundAmount') or 0)
+
+    for paymentID, payment in Payment._table().items(refundedByPayment.keys()):
+        refunded, amount = refundedByPayment[paymentID], float(payment.get('amount') or 0)
+        if refunded > amount + MONEY_TOLERANCE:
+            report.add('refund_total', f"Payment {paymentID}: refunded {refunded:.2f} of {amount:.2f}")
+        elif payment.get('status') == "Refunded" and refunded < amount - MONEY_TOLERANCE:
+            report.add('refund_total', f"Payment {paymentID}: marked Refunded but only {refunded:.2f} of {amount:.2f} refunded")
+
+def _expectedSeats(report: Report, tripRecords: Dict[Any, Dict[str, Any]],
+                   ticketRecords: List[Dict[str, Any]]) -> Tuple[Dict[Any, Tuple[SeatMap, int]], Set[Any]]:
+    """Per seat-mapped trip: (map of the seats its active tickets and holds occupy, how many occupy one),
+    and the trips with a ticket on a bad or already occupied seat."""
+    expected: Dict[Any, Tuple[SeatMap, int]] = {}
+    conflicted: Set[Any] = set()
+    for tripID, trip in tripRecords.items():
+        if trip.get('capacity') is None:
+            report.uncheckedTrips += 1
+            if len(report.uncheckedSamples) < report.sampleLimit:
+                report.uncheckedSamples.append(str(tripID))
+            if int(trip.get('availableSeats') or 0) < 0:
+                report.add('trip_seat_count', f"Trip {tripID}: availableSeats {trip['availableSeats']} is negative")
+            continue
+        seatMap = SeatMap(int(trip['capacity']))
+        occupants = 0
+        for hold in (trip.get('seatHolds') or {}).values():
+            for label in hold.get('seats') or []:
+                seat = seatMap.parse(label)
+                if seat is not None:
+                    seatMap.bits |= 1 << seat
+                occupants += 1
+        expected[tripID] = (seatMap, occupants)
+
+    for ticket in ticketRecords:
+        if ticket.get('status') != "Active" or ticket.get('tripID') not in expected:
+            continue
+        seatMap, occupants = expected[ticket['tripID']]
+        seat = seatMap.parse(ticket.get('seatNumber'))
+        if seat is None:
+            report.add('ticket_bad_seat', f"Ticket {ticket.get('ticketID')}: seat {ticket.get('seatNumber')!r} is not on trip {ticket['tripID']}")
+            conflicted.add(ticket['tripID'])
+        elif not seatMap.isFree(seat):
+            report.add('ticket_duplicate_seat', f"Ticket {ticket.get('ticketID')}: seat {ticket.get('seatNumber')} on trip {ticket['tripID']} is already occupied")
+            conflicted.add(ticket['tripID'])
+        else:
+            seatMap.bits |= 1 << seat
+        expected[ticket['tripID']] = (seatMap, occupants + 1)
+    return expected, conflicted
+
+def _checkInventory(report: Report, ticketRecords: List[Dict[str, Any]], repair: bool) -> None:
+    table = Trip._table()
+    tripRecords = dict(table.items())
+    report.scanned['trips'] = len(tripRecords)
+    repaired: List[Dict[str, Any]] = []
+    expected, conflicted = _expectedSeats(report, tripRecords, ticketRecords)
+    for tripID, (expectedMap, occupants) in expected.items():
+        trip = tripRecords[tripID]
+        try:
+            storedMap = SeatMap.decode(expectedMap.capacity, trip.get('seatMap'))
+        except ValueError: # Not valid base64
+            storedMap = SeatMap(expectedMap.capacity, ~expectedMap.bits) # Counts as wrong everywhere
+        available = int(trip.get('availableSeats') or 0)
+        expectedAvailable = expectedMap.capacity - occupants
+        if storedMap.bits != expectedMap.bits:
+            leaked = (storedMap.bits & ~expectedMap.bits).bit_count()
+            missing = (expectedMap.bits & ~storedMap.bits).bit_count()
+            report.add('trip_seat_map', f"Trip {tripID}: {leaked} seat(s) taken with no ticket or hold, {missing} ticketed seat(s) shown free")
+        if available != expectedAvailable:
+            report.add('trip_seat_count', f"Trip {tripID}: availableSeats {available}, expected {expectedAvailable}")
+        if not repair or (storedMap.bits == expectedMap.bits and available == expectedAvailable):
+            continue
+        if tripID in conflicted:
+            report.unrepairedTrips += 1
+        else:
+            repaired.append({**trip, 'seatMap': expectedMap.encode(), 'availableSeats': expectedAvailable})
+    if repaired:
+        table.upsert_many(repaired)
+        report.repairedTrips = len(repaired)
+
+@contextlib.contextmanager
+def _withoutCycleCollection():
+    # The check builds millions of short-lived tuples and sets but no reference cycles;
+    # left on, the cyclic collector re-walks the loaded stores and doubles the run time.
+    wasEnabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if wasEnabled:
+            gc.enable()
+
+def check(repair: bool = False, sampleLimit: int = 20) -> Report:
+    """Runs every check in one pass over each store. With repair, also rewrites mismatched trip inventory."""
+    report = Report(sampleLimit)
+    # Repair reads tickets and trips and rewrites trips under one trips lock, so no booking lands in between.
+    with _withoutCycleCollection(), Trip._table().transaction() if repair else contextlib.nullcontext():
+        ticketRecords = Ticket._table().scan()
+        report.scanned['tickets'] = len(ticketRecords)
+        _checkReferences(report, ticketRecords)
+        hotTicketIDs = {ticket.get('ticketID') for ticket in ticketRecords}
+        archivedTickets = [record for key, record in archive.forModel(Ticket).items() if key not in hotTicketIDs]
+        _checkInventory(report, ticketRecords + archivedTickets, repair)
+    return report
@@ -12,4 +12,5 @@ ROUTE_DATA_FILE = 'routes.json'
 FEEDBACK_DATA_FILE = 'feedbacks.json'
 RESPONSE_DATA_FILE = 'responses.json'
 NOTIFICATION_DATA_FILE = 'notifications.json'
-ORDER_LINE_ITEM_DATA_FILE = 'order_line_items.json'
\ No newline at end of file
+ORDER_LINE_ITEM_DATA_FILE = 'order_line_items.json'
+AGGREGATE_DATA_FILE = 'aggregates.json'
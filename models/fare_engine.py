@@ -0,0 +1,142 @@
+# models/fare_engine.py
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import columnar
+from .columnar import np # None when NumPy is not installed
+from .ticket import Ticket
+from .trip import Trip
+
+# Demand-based fares for the whole timetable, computed in one vectorized pass.
+#
+# A trip keeps the fare it was timetabled at as baseFare; price is the fare
+# charged now, and search results, trip pages and new order lines read it as
+# before, so pricing costs nothing per request. reprice() loads every trip into
+# NumPy columns, scales each base fare by three factors interpolated from the
+# curves below, and writes back only the prices that moved, in one bulk write:
+#   load           share of the trip's seats already sold
+#   days left      time to departure
+#   route demand   the route's average load against the whole timetable's
+# Departed trips keep their last price. Fares change only when an operator asks:
+# `flask reprice` runs one pass, and with ART_DYNAMIC_FARES=1 the app (or the
+# storage server) registers a listener so that a change to any trip's seat count
+# or base fare schedules a reprice REFRESH_SECONDS later, and a burst of bookings
+# costs one pass. Importing the models package never registers it.
+
+LOAD_CURVE = ([0.0, 0.5, 0.8, 1.0], [0.9, 1.0, 1.25, 1.5]) # (load points, multipliers)
+DAYS_CURVE = ([0.0, 1.0, 7.0, 30.0, 60.0], [1.3, 1.2, 1.1, 1.0, 0.9]) # (days to departure, multipliers)
+ROUTE_WEIGHT = 0.5 # Multiplier gained per unit of route load above the timetable's average
+MIN_MULTIPLIER, MAX_MULTIPLIER = 0.75, 2.0
+
+ENABLED = os.environ.get('ART_DYNAMIC_FARES', '0') != '0'
+REFRESH_SECONDS = float(os.environ.get('ART_FARE_REFRESH_SECONDS', 30))
+
+FARE_COLUMNS: List[columnar.ColumnSpec] = [
+    ('origin', 'category'), ('destination', 'category'), ('departureTime', 'datetime'),
+    ('price', 'float'), ('baseFare', 'float'), ('availableSeats', 'int'), ('capacity', 'float'),
+]
+
+def _soldTickets(records: List[Dict[str, Any]], columns: Dict[str, Any]) -> Any:
+    """Active tickets per trip, needed only for trips without a seat map (their capacity is unknown)."""
+    sold = np.zeros(len(records), dtype=np.float64)
+    if not np.isnan(columns['capacity']).any():
+        return sold
+    activeTripIDs = np.array([ticket.get('tripID') or '' for ticket in Ticket._table().scan()
+                              if ticket.get('status') == "Active"], dtype=str)
+    if not activeTripIDs.size:
+        return sold
+    soldIDs, soldCounts = np.unique(activeTripIDs, return_counts=True)
+    tripIDs = np.array([record.get('tripID') or '' for record in records], dtype=str)
+    positions = np.minimum(np.searchsorted(soldIDs, tripIDs), soldIDs.size - 1)
+    return np.where(soldIDs[positions] == tripIDs, soldCounts[positions], 0).astype(np.float64)
+
+def computeFares(columns: Dict[str, Any], soldTickets: Any, nowMicros: int) -> Tuple[Any, Any]:
+    """(base fares, current fares) for trips given as FARE_COLUMNS arrays."""
+    base = np.where(np.isnan(columns['baseFare']), columns['price'], columns['baseFare'])
+    available = columns['availableSeats'].astype(np.float64)
+    capacity = np.where(np.isnan(columns['capacity']), available + soldTickets, columns['capacity'])
+    load = np.divide(capacity - available, capacity, out=np.zeros_like(capacity), where=capacity > 0)
+    load = np.clip(load, 0.0, 1.0)
+
+    departure = columns['departureTime']
+    days = (departure - nowMicros) / columnar.MICROSECONDS_PER_DAY
+    upcoming = (departure != columnar.MISSING_TIME) & (days >= 0)
+
+    destinationCount = int(columns['destination.codes'].max()) + 2 # +1 for missing (-1) codes
+    routePairs = (columns['origin.codes'].astype(np.int64) + 1) * destinationCount + columns['destination.codes'] + 1
+    _, routes = np.unique(routePairs, return_inverse=True)
+    upcomingWeights = upcoming.astype(np.float64)
+    routeLoad = np.bincount(routes, weights=load * upcomingWeights) / np.maximum(np.bincount(routes, weights=upcomingWeights), 1.0)
+    meanLoad = load[upcoming].mean() if upcoming.any() else 0.0
+
+    multiplier = (np.interp(load, *LOAD_CURVE) * np.interp(days, *DAYS_CURVE)
+                  * (1.0 + ROUTE_WEIGHT * (routeLoad[routes] - meanLoad)))
+    multiplier = np.clip(multiplier, MIN_MULTIPLIER, MAX_MULTIPLIER)
+    fares = np.where(upcoming, np.round(base * multiplier, 2), columns['price'])
+    return base, fares
+
+def reprice(now: Optional[datetime] = None, dryRun: bool = False) -> Tuple[int, int]:
+    """Recomputes every trip's fare and writes the changed ones in one write. Returns (trips priced, fares changed)."""
+    columnar._requireNumpy()
+    nowMicros = int((now or datetime.now(timezone.utc)).timestamp() * 1_000_000)
+    table = Trip._table()
+    with table.transaction():
+        records = table.scan()
+        if not records:
+            return 0, 0
+        columns = columnar.toColumns(records, FARE_COLUMNS)
+        base, fares = computeFares(columns, _soldTickets(records, columns), nowMicros)
+        changed = np.flatnonzero((fares != columns['price']) | np.isnan(columns['baseFare']))
+        if changed.size and not dryRun:
+            table.upsert_many({**records[i], 'price': float(fares[i]), 'baseFare': float(base[i])} for i in changed)
+    return len(records), int(changed.size)
+
+_refreshLock = threading.Lock()
+_pendingRefresh: Optional[threading.Timer] = None
+
+def _refresh() -> None:
+    global _pendingRefresh
+    with _refreshLock:
+        _pendingRefresh = None
+    try:
+        reprice()
+    except Exception as e:
+        print(f"Warning: Fare refresh failed: {e}")
+
+def scheduleReprice(delaySeconds: Optional[float] = None) -> None:
+    """Reprices once after delaySeconds (default REFRESH_SECONDS), unless a reprice is already pending."""
+    global _pendingRefresh
+    with _refreshLock:
+        if _pendingRefresh is not None:
+            return
+        _pendingRefresh = threading.Timer(REFRESH_SECONDS if delaySeconds is None else delaySeconds, _refresh)
+        _pendingRefresh.daemon = True
+        _pendingRefresh.start()
+
+def _onTripChanges(changes) -> None:
+    # Seat counts move demand and a re-imported timetable moves base fares; the
+    # engine's own price writes (which only ever set a missing baseFare) must not retrigger it.
+    if any(old is None or new is None or old.get('availableSeats') != new.get('availableSeats')
+           or old.get('baseFare') not in (None, new.get('baseFare'))
+           for _, old, new in changes):
+        scheduleReprice()
+
+def _forgetRefresh() -> None:
+    global _pendingRefresh
+    _pendingRefresh = None # The timer thread does not survive fork
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forgetRefresh)
+
+_registeredOn: List[Any] = []
+
+def register() -> None:
+    """Reprices after seat counts change. Safe to call again; does nothing without NumPy or unless ART_DYNAMIC_FARES=1."""
+    if np is None or not ENABLED:
+        return
+    table = Trip._table()
+    if table not in _registeredOn:
+        table.listeners.append(_onTripChanges)
+        _registeredOn.append(table)
@@ -4,10 +4,12 @@ from datetime import datetime, timezone
 from typing import Optional, List, Dict, Any
 from .base_model import BaseModel
 from .constants import FEEDBACK_DATA_FILE
+from .indexes import HashIndex
 
 class Feedback(BaseModel):
     FILE_PATH = FEEDBACK_DATA_FILE
     PRIMARY_KEY_FIELD = 'feedbackID'
+    INDEXES = {'status': lambda: HashIndex('status')}
 
     def __init__(self, submitterUserID: str, feedbackContent: str, # camelCase params
                  rating: Optional[int] = None, relatedTripID: Optional[str] = None, # camelCase params
@@ -71,10 +73,9 @@ class Feedback(BaseModel):
 
     @classmethod
     def getAll(cls, statusFilter: Optional[str] = None) -> List['Feedback']: # Method name camelCase
-        all_feedback = super(Feedback, cls).getAll() # type: ignore
         if statusFilter:
-            return [fb for fb in all_feedback if fb.status == statusFilter]
-        return all_feedback
+            return cls.query().where('status', '==', statusFilter).all()
+        return super(Feedback, cls).getAll() # type: ignore
 
     def getResponses(self) -> List['Response']: # Method name camelCase, string type hint
         from .response import Response # Local import
@@ -0,0 +1,65 @@
+# models/fragment_cache.py
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+# Bounded LRU of rendered HTML fragments. Keys carry the version of every record
+# a fragment was rendered from (see Table.versioned), so a saved record simply
+# stops matching its old entries; they are never invalidated, only evicted.
+
+class FragmentCache:
+    def __init__(self, maxEntries: int = 20000, maxChars: int = 8_000_000):
+        self.maxEntries = maxEntries
+        self.maxChars = maxChars
+        self.entries: "OrderedDict[Hashable, Tuple[str, str]]" = OrderedDict() # key -> (kind, html)
+        self.chars = 0
+        self.lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {} # kind -> {'hits', 'misses', 'evictions'}
+
+    def _count(self, kind: str, outcome: str) -> None:
+        counts = self.stats.setdefault(kind, {'hits': 0, 'misses': 0, 'evictions': 0})
+        counts[outcome] += 1
+
+    def render(self, kind: str, key: Hashable, renderFn: Callable[[], str]) -> str:
+        """Returns the cached fragment for (kind, key), rendering and storing it on a miss."""
+        fullKey = (kind, key)
+        with self.lock:
+            entry = self.entries.get(fullKey)
+            if entry is not None:
+                self.entries.move_to_end(fullKey)
+                self._count(kind, 'hits')
+                return entry[1]
+            self._count(kind, 'misses')
+        html = str(renderFn()) # Rendered outside the lock; a concurrent miss just renders twice
+        if len(html) > self.maxChars:
+            return html
+        with self.lock:
+            previous = self.entries.pop(fullKey, None)
+            if previous is not None:
+                self.chars -= len(previous[1])
+            self.entries[fullKey] = (kind, html)
+            self.chars += len(html)
+            while len(self.entries) > self.maxEntries or self.chars > self.maxChars:
+                _, (evictedKind, evictedHtml) = self.entries.popitem(last=False)
+                self.chars -= len(evictedHtml)
+                self._count(evictedKind, 'evictions')
+        return html
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.chars = 0
+
+    def metricSamples(self) -> Dict[str, Dict[Tuple[Tuple[str, str], ...], Any]]:
+        """Samples for metrics.renderPrometheus extras, keyed by metric name."""
+        with self.lock:
+            samples: Dict[str, Dict[Tuple[Tuple[str, str], ...], Any]] = {'requests': {}, 'evictions': {}, 'hitRatio': {}}
+            for kind, counts in sorted(self.stats.items()):
+                samples['requests'][(('kind', kind), ('result', 'hit'))] = counts['hits']
+                samples['requests'][(('kind', kind), ('result', 'miss'))] = counts['misses']
+                samples['evictions'][(('kind', kind),)] = counts['evictions']
+                lookups = counts['hits'] + counts['misses']
+                samples['hitRatio'][(('kind', kind),)] = counts['hits'] / lookups if lookups else 0.0
+            samples['entries'] = {(): len(self.entries)}
+            samples['chars'] = {(): self.chars}
+            return samples
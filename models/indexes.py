@@ -0,0 +1,446 @@
+# models/indexes.py
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from . import shared_versions
+from .json_helpers import _load_data, _save_data
+
+Signature = Optional[Tuple[int, int]]
+# With a shared version table, stat() is only needed to notice writers that bypass Table
+# (e.g. a hand-edited file), so it is rate-limited to once per this many seconds.
+STAT_INTERVAL = float(os.environ.get('ART_STAT_INTERVAL', 1.0))
+# When set, stores are served by a storage_server on this Unix socket instead of loaded here.
+REMOTE_SOCKET: Optional[str] = os.environ.get('ART_STORAGE_SOCKET') or None
+Change = Tuple[Any, Optional[Dict[str, Any]], Optional[Dict[str, Any]]] # (key, old record, new record)
+# Stands in for the shared version table's cross-process lock where there is none (no fcntl).
+_processWriteLock = threading.RLock()
+
+
+def _file_signature(file_path: str) -> Signature:
+    """Returns (mtime_ns, size) for a data file, or None if it does not exist."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class Index:
+    """A lookup structure derived from the raw records of one store.
+
+    Indexes never read files themselves: the owning Table feeds them every record
+    on (re)load and the old/new pair of every record it replaces on save.
+    """
+
+    def clear(self) -> None:
+        raise NotImplementedError("Subclasses must implement clear")
+
+    def add(self, key: Any, record: Dict[str, Any]) -> None:
+        raise NotImplementedError("Subclasses must implement add")
+
+    def remove(self, key: Any, record: Dict[str, Any]) -> None:
+        raise NotImplementedError("Subclasses must implement remove")
+
+    def replace(self, key: Any, old: Dict[str, Any], new: Dict[str, Any]) -> None:
+        self.remove(key, old)
+        self.add(key, new)
+
+
+class UniqueIndex(Index):
+    """Maps each value of one field to the key of the record that owns it.
+
+    Stores may already contain duplicates written before the index existed, so
+    every owner is kept; lookup() reports the first one in file order.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self.clear()
+
+    def clear(self) -> None:
+        self.owners: Dict[Any, List[Any]] = {}
+
+    def add(self, key: Any, record: Dict[str, Any]) -> None:
+        value = record.get(self.field)
+        if value is not None:
+            self.owners.setdefault(value, []).append(key)
+
+    def remove(self, key: Any, record: Dict[str, Any]) -> None:
+        keys = self.owners.get(record.get(self.field))
+        if keys and key in keys:
+            keys.remove(key)
+            if not keys:
+                del self.owners[record.get(self.field)]
+
+    def replace(self, key: Any, old: Dict[str, Any], new: Dict[str, Any]) -> None:
+        if old.get(self.field) != new.get(self.field):
+            super().replace(key, old, new)
+
+    def keys(self, value: Any) -> List[Any]:
+        return list(self.owners.get(value, ()))
+
+    def lookup(self, value: Any) -> Optional[Any]:
+        keys = self.owners.get(value)
+        return keys[0] if keys else None
+
+    def isTakenByOther(self, value: Any, key: Any) -> bool:
+        return any(owner != key for owner in self.owners.get(value, ()))
+
+
+class HashIndex(Index):
+    """Partitions records by the value of one field, keeping keys in insertion order."""
+
+    def __init__(self, field: str):
+        self.field = field
+        self.clear()
+
+    def clear(self) -> None:
+        self.buckets: Dict[Any, Dict[Any, None]] = {}
+
+    def add(self, key: Any, record: Dict[str, Any]) -> None:
+        value = record.get(self.field)
+        if value is not None:
+            self.buckets.setdefault(value, {})[key] = None
+
+    def remove(self, key: Any, record: Dict[str, Any]) -> None:
+        value = record.get(self.field)
+        bucket = self.buckets.get(value)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del self.buckets[value]
+
+    def replace(self, key: Any, old: Dict[str, Any], new: Dict[str, Any]) -> None:
+        # Leaving unchanged keys in place keeps each bucket in file order.
+        if old.get(self.field) != new.get(self.field):
+            super().replace(key, old, new)
+
+    def keys(self, value: Any) -> List[Any]:
+        return list(self.buckets.get(value, ()))
+
+    def count(self, value: Any) -> int:
+        return len(self.buckets.get(value, ()))
+
+
+class Table:
+    """In-memory copy of one JSON store, keyed by primary key, with its indexes.
+
+    The copy is re-read only when the file changes: another process's write is
+    seen through the shared version table (see shared_versions) and any other
+    edit through the file's size and mtime, so repeated finders cost a memory
+    read (or a stat()) instead of a full parse. Records held here are
+    treated as immutable: saves replace dicts rather than mutating them, which is
+    what lets indexes remove the exact old entry before adding the new one.
+
+    Lock order: writers take the write lock of the data directory (see
+    transaction()), then table locks; nothing takes the write lock while holding
+    a table lock. Listeners run after apply() has released its locks, so a
+    listener reading another table never waits on it while holding this one.
+    """
+
+    SHARED_VERSIONS = True # Track writes through the shared version table when available
+    SNAPSHOT_FIELDS: Tuple[str, ...] = ('signature', 'records', 'indexes') # Parsed state saved by snapshot
+
+    def __init__(self, file_path: str, pk_field: str,
+                 index_factories: Optional[Dict[str, Callable[[], Index]]] = None):
+        self.file_path = file_path
+        self.pk_field = pk_field
+        self.indexes: Dict[str, Index] = {name: factory() for name, factory in (index_factories or {}).items()}
+        self.records: Dict[Any, Dict[str, Any]] = {}
+        self.signature: Signature = None
+        self.version = 0 # Bumped whenever the records change, by a write here or a reload from disk
+        self.loadedVersion = 0 # Version of every record as of the last reload...
+        self.recordVersions: Dict[Any, int] = {} # ...unless written since then
+        self.loaded = False
+        self.lock = threading.RLock()
+        self.shared = shared_versions.forFile(file_path) if self.SHARED_VERSIONS else None
+        self.sharedName = os.path.basename(file_path) # One table per directory, so the name is enough
+        self.sharedSeen = 0 # Shared counter value our records reflect
+        self.statCheckedAt = 0.0
+        # Called with the list of applied changes after each successful write.
+        self.listeners: List[Callable[[List[Change]], None]] = []
+
+    def _key_for(self, record: Dict[str, Any], position: int) -> Any:
+        pk = record.get(self.pk_field)
+        if pk is None or pk in self.records:
+            # Records without a primary key (or duplicates of one) are kept so a
+            # rewrite never drops data, but they cannot be addressed by key.
+            return ('__unkeyed__', position)
+        return pk
+
+    def _reload(self) -> None:
+        # Read the counter first: a write that lands during the load bumps it again and forces another reload.
+        self.sharedSeen = self.shared.read(self.sharedName) if self.shared else 0
+        self.statCheckedAt = time.monotonic()
+        signature = self._current_signature()
+        all_data = _load_data(self.file_path)
+        self.records = {}
+        for i, item_data in enumerate(all_data):
+            if isinstance(item_data, dict):
+                self.records[self._key_for(item_data, i)] = item_data
+        self.signature = signature if signature is not None else self._current_signature()
+        self._rebuild_indexes()
+        self.loaded = True
+        self.version += 1
+        self.loadedVersion = self.version
+        self.recordVersions = {}
+
+    def _rebuild_indexes(self) -> None:
+        for index in self.indexes.values():
+            index.clear()
+            for key, record in self.records.items():
+                index.add(key, record)
+
+    def _is_stale(self) -> bool:
+        if not self.loaded:
+            return True
+        if self.shared is not None:
+            if self.shared.read(self.sharedName) != self.sharedSeen:
+                return True
+            if time.monotonic() - self.statCheckedAt < STAT_INTERVAL:
+                return False
+            self.statCheckedAt = time.monotonic()
+        return self._current_signature() != self.signature
+
+    def _current_signature(self) -> Signature:
+        """Signature of what is on disk now, compared with the one the records were loaded from."""
+        return _file_signature(self.file_path)
+
+    def ensure_fresh(self) -> 'Table':
+        with self.lock:
+            if self._is_stale():
+                self._reload()
+        return self
+
+    @contextmanager
+    def transaction(self) -> Iterator['Table']:
+        """Holds the store for a read-modify-write, across threads and worker processes.
+
+        Takes the data directory's write lock, then self.lock, then reloads if
+        another process wrote meanwhile, so whatever is read inside is still
+        current when it is written back.
+        """
+        with self.shared.locked() if self.shared is not None else _processWriteLock:
+            with self.lock:
+                self.ensure_fresh()
+                yield self
+
+    def snapshotState(self) -> Dict[str, Any]:
+        """The parsed records and built indexes, fresh. Hold self.lock until they are serialized."""
+        with self.lock:
+            self.ensure_fresh()
+            return {field: getattr(self, field) for field in self.SNAPSHOT_FIELDS}
+
+    @staticmethod
+    def _indexShape(indexes: Dict[str, Index]) -> Dict[str, Tuple[type, Any]]:
+        return {name: (type(index), getattr(index, 'field', None)) for name, index in indexes.items()}
+
+    def restoreState(self, state: Dict[str, Any]) -> bool:
+        """Adopts a snapshotState() if it matches the files on disk and this table's indexes.
+
+        Returns False, leaving the table untouched, if it does not.
+        """
+        with self.lock:
+            sharedSeen = self.shared.read(self.sharedName) if self.shared else 0 # Before the check, as in _reload
+            if any(field not in state for field in self.SNAPSHOT_FIELDS):
+                return False
+            if state['signature'] is None or state['signature'] != self._current_signature():
+                return False
+            if self._indexShape(state['indexes']) != self._indexShape(self.indexes):
+                return False
+            for field in self.SNAPSHOT_FIELDS:
+                setattr(self, field, state[field])
+            self.sharedSeen = sharedSeen
+            self.statCheckedAt = time.monotonic()
+            self.loaded = True
+            self.version += 1
+            self.loadedVersion = self.version
+            self.recordVersions = {}
+            return True
+
+    def index(self, name: str) -> Index:
+        self.ensure_fresh()
+        return self.indexes[name]
+
+    def get(self, pk: Any) -> Optional[Dict[str, Any]]:
+        self.ensure_fresh()
+        return self.records.get(pk)
+
+    def get_many(self, pks: Iterable[Any]) -> List[Dict[str, Any]]:
+        self.ensure_fresh()
+        records = self.records
+        return [records[pk] for pk in pks if pk in records]
+
+    def items(self, keys: Optional[Iterable[Any]] = None) -> List[Tuple[Any, Dict[str, Any]]]:
+        """Snapshot of (key, record) pairs, for all records or just the given keys."""
+        with self.lock:
+            self.ensure_fresh()
+            if keys is None:
+                return list(self.records.items())
+            records = self.records
+            return [(key, records[key]) for key in keys if key in records]
+
+    def scan(self) -> List[Dict[str, Any]]:
+        """Snapshot of all raw records in file order."""
+        with self.lock:
+            self.ensure_fresh()
+            return list(self.records.values())
+
+    def validator(self) -> Tuple[int, Signature]:
+        """(version, signature) of the current contents; changes whenever the records do."""
+        with self.lock:
+            self.ensure_fresh()
+            return self.version, self.signature
+
+    def versioned(self, pk: Any) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """(record version, record) for one key, read together. The version changes when that record does.
+
+        Does not stat the file, so callers rendering many rows after a finder pay
+        for freshness once.
+        """
+        with self.lock:
+            if not self.loaded:
+                self._reload()
+            return self.recordVersions.get(pk, self.loadedVersion), self.records.get(pk)
+
+    def _persist(self, applied: List[Change]) -> None:
+        """Writes the records to disk and records the new signature."""
+        _save_data(self.file_path, list(self.records.values()))
+        self.signature = self._current_signature()
+
+    def _write(self, applied: List[Change]) -> None:
+        """Persists applied changes. The caller holds transaction()."""
+        self._persist(applied)
+        if self.shared is not None:
+            self.sharedSeen = self.shared.bumpLocked(self.sharedName)
+        self.version += 1
+        for key, _, record in applied:
+            if record is None:
+                self.recordVersions.pop(key, None)
+            else:
+                self.recordVersions[key] = self.version
+
+    def apply(self, changes: Iterable[Tuple[Any, Optional[Dict[str, Any]]]], notify: bool = True) -> int:
+        """Applies (key, new record) pairs in one pass and one file write.
+
+        A new record of None deletes the key. Returns how many keys changed.
+        notify=False skips the listeners, for moves that do not change the data
+        as a whole (e.g. archiving).
+        """
+        applied: List[Change] = []
+        with self.transaction():
+            records = self.records
+            for key, record in changes:
+                old = records.get(key)
+                if record is None:
+                    if old is None:
+                        continue
+                    del records[key]
+                    for index in self.indexes.values():
+                        index.remove(key, old)
+                else:
+                    records[key] = record
+                    for index in self.indexes.values():
+                        if old is not None:
+                            index.replace(key, old, record)
+                        else:
+                            index.add(key, record)
+                applied.append((key, old, record))
+            if applied:
+                self._write(applied)
+        if applied and notify:
+            self._notify(applied)
+        return len(applied)
+
+    def _notify(self, applied: List[Change]) -> None:
+        for listener in self.listeners:
+            try:
+                listener(applied)
+            except Exception as e:
+                print(f"Warning: listener on {self.file_path} failed: {e}")
+
+    def upsert_many(self, new_records: Iterable[Dict[str, Any]]) -> int:
+        """Inserts or replaces records by primary key with a single file write."""
+        return self.apply((record.get(self.pk_field), record) for record in new_records)
+
+    def bulk_upsert(self, new_records: Iterable[Dict[str, Any]]) -> int:
+        """Like upsert_many, but rebuilds indexes once at the end instead of per record."""
+        applied: List[Change] = []
+        with self.transaction():
+            records = self.records
+            for record in new_records:
+                pk = record.get(self.pk_field)
+                applied.append((pk, records.get(pk), record))
+                records[pk] = record
+            if applied:
+                self._write(applied)
+                self._rebuild_indexes()
+        if applied:
+            self._notify(applied)
+        return len(applied)
+
+    def upsert(self, record: Dict[str, Any]) -> None:
+        self.upsert_many([record])
+
+    def delete_many(self, keys: Iterable[Any]) -> int:
+        return self.apply((key, None) for key in keys)
+
+
+_tables: Dict[str, Table] = {}
+_tables_lock = threading.Lock()
+
+
+def get_table(file_path: str, pk_field: str,
+              index_factories: Optional[Dict[str, Callable[[], Index]]] = None,
+              sharding: Optional[Any] = None) -> Table:
+    """Returns the shared Table for a data file, creating it on first use.
+
+    With REMOTE_SOCKET set this is a storage_client.RemoteTable, which offers the
+    same methods backed by the storage server. With a sharding strategy (see
+    sharding) it is a ShardedTable spreading the records over several files.
+    """
+    key = os.path.abspath(file_path)
+    table = _tables.get(key)
+    if table is None:
+        with _tables_lock:
+            table = _tables.get(key)
+            if table is None:
+                if REMOTE_SOCKET:
+                    from .storage_client import RemoteTable # Deferred: the client imports this module
+                    table = RemoteTable(REMOTE_SOCKET, key, pk_field)
+                elif sharding is not None:
+                    from .sharding import ShardedTable # Deferred: sharding builds on Table
+                    table = ShardedTable(key, pk_field, sharding, index_factories)
+                else:
+                    table = Table(key, pk_field, index_factories)
+                _tables[key] = table
+    return table
+
+
+def upsertAll(writes: Iterable[Tuple[Any, Iterable[Dict[str, Any]]]]) -> None:
+    """upsert_many on each (table, records) in turn.
+
+    Remote tables of one storage server are written with a single batch request,
+    one round trip for every store instead of one each.
+    """
+    writes = [(table, list(records)) for table, records in writes]
+    writes = [(table, records) for table, records in writes if records]
+    if not writes:
+        return
+    client = getattr(writes[0][0], 'client', None) # Only RemoteTable has one
+    if client is not None and all(getattr(table, 'client', None) is client for table, _ in writes):
+        client.batch([{'op': 'upsertMany', 'store': table.store, 'records': records} for table, records in writes])
+        return
+    for table, records in writes:
+        table.upsert_many(records)
+
+
+def useLocalStorage() -> None:
+    """Switches this process to local tables, dropping any remote ones already handed out."""
+    global REMOTE_SOCKET
+    with _tables_lock:
+        REMOTE_SOCKET = None
+        for key in [key for key, table in _tables.items() if not isinstance(table, Table)]:
+            del _tables[key]
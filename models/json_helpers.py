@@ -1,7 +1,9 @@
 # models/json_helpers.py
 import json
 import os
+import time
 from typing import List, Dict, Any
+from . import metrics
 
 def _load_data(file_path: str) -> List[Dict[str, Any]]:
     """Loads data from a JSON file. Creates the file with an empty list if it doesn't exist."""
@@ -9,16 +11,22 @@ def _load_data(file_path: str) -> List[Dict[str, Any]]:
         with open(file_path, 'w') as f:
             json.dump([], f)
         return []
-    if os.path.getsize(file_path) == 0:  # Check for empty file
+    size = os.path.getsize(file_path)
+    if size == 0:  # Check for empty file
         return []
     try:
+        started = time.perf_counter()
         with open(file_path, 'r') as f:
-            data = json.load(f)
-            if not isinstance(data, list):
-                print(f"Warning: Data in {file_path} is not a list. Re-initializing as empty list.")
-                _save_data(file_path, []) # Attempt to fix the file
-                return []
-            return data
+            text = f.read()
+        decodeStarted = time.perf_counter()
+        data = json.loads(text)
+        finished = time.perf_counter()
+        metrics.recordIO(file_path, 'load', size, finished - started, finished - decodeStarted)
+        if not isinstance(data, list):
+            print(f"Warning: Data in {file_path} is not a list. Re-initializing as empty list.")
+            _save_data(file_path, []) # Attempt to fix the file
+            return []
+        return data
     except json.JSONDecodeError:
         print(f"Warning: Could not decode JSON from {file_path}. Returning empty list.")
         return []
@@ -29,7 +37,10 @@ def _load_data(file_path: str) -> List[Dict[str, Any]]:
 def _save_data(file_path: str, all_items_data: List[Dict[str, Any]]) -> None:
     """Saves data to a JSON file."""
     try:
+        started = time.perf_counter()
+        text = json.dumps(all_items_data, indent=4)
         with open(file_path, 'w') as f:
-            json.dump(all_items_data, f, indent=4)
+            f.write(text)
+        metrics.recordIO(file_path, 'save', len(text), time.perf_counter() - started)
     except Exception as e:
         print(f"An unexpected error occurred while saving to {file_path}: {e}")
\ No newline at end of file
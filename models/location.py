@@ -7,6 +7,7 @@ from .constants import LOCATION_DATA_FILE
 class Location(BaseModel):
     FILE_PATH = LOCATION_DATA_FILE
     PRIMARY_KEY_FIELD = 'locationID'
+    REQUIRED_FIELDS = ('latitude', 'longitude', 'addressLine1', 'city', 'postcode')
 
     def __init__(self, latitude: float, longitude: float, addressLine1: str, # camelCase params
                  city: str, postcode: str, locationID: Optional[str] = None): # camelCase params
@@ -40,17 +41,21 @@ class Location(BaseModel):
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> Optional['Location']:
         # Expect camelCase keys (addressLine1)
-        if not isinstance(data, dict) or not all(k in data for k in ['latitude', 'longitude', 'addressLine1', 'city', 'postcode']):
+        if not isinstance(data, dict) or not all(k in data for k in cls.REQUIRED_FIELDS):
             return None
         try:
-            return cls(
-                latitude=float(data['latitude']),
-                longitude=float(data['longitude']),
-                addressLine1=data['addressLine1'],
-                city=data['city'],
-                postcode=data['postcode'],
-                locationID=data.get('locationID')
-            )
+            return cls._construct(data)
         except (ValueError, TypeError) as e:
             print(f"Error deserializing Location: {e}, data: {data}")
-            return None
\ No newline at end of file
+            return None
+
+    @classmethod
+    def _construct(cls, data: Dict[str, Any]) -> 'Location':
+        return cls(
+            latitude=float(data['latitude']),
+            longitude=float(data['longitude']),
+            addressLine1=data['addressLine1'],
+            city=data['city'],
+            postcode=data['postcode'],
+            locationID=data.get('locationID')
+        )
\ No newline at end of file
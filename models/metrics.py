@@ -0,0 +1,172 @@
+# models/metrics.py
+import contextvars
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Process-wide storage I/O counters, plus an optional per-request scope.
+#
+# json_helpers reports every load/save here; the model layer reports how many
+# records it deserialized. When a request scope is active (app.py opens one per
+# Flask request) the same numbers are also attributed to that request, and
+# rolled up per endpoint when the scope ends.
+
+class IOStats:
+    """Counters for one scope: the whole process, one request, or one endpoint."""
+
+    def __init__(self):
+        self.calls: Dict[Tuple[str, str], int] = {}       # (file, op) -> calls
+        self.bytes: Dict[Tuple[str, str], int] = {}       # (file, op) -> bytes read/written
+        self.seconds: Dict[Tuple[str, str], float] = {}   # (file, op) -> wall time incl. decode/encode
+        self.decodeSeconds: Dict[str, float] = {}         # file -> time spent in json decode
+        self.deserialized: Dict[str, int] = {}            # model -> records passed through from_dict
+
+    def addIO(self, fileLabel: str, op: str, nbytes: int, seconds: float, decodeSeconds: float = 0.0) -> None:
+        key = (fileLabel, op)
+        self.calls[key] = self.calls.get(key, 0) + 1
+        self.bytes[key] = self.bytes.get(key, 0) + nbytes
+        self.seconds[key] = self.seconds.get(key, 0.0) + seconds
+        if decodeSeconds:
+            self.decodeSeconds[fileLabel] = self.decodeSeconds.get(fileLabel, 0.0) + decodeSeconds
+
+    def addDeserialized(self, model: str, count: int) -> None:
+        self.deserialized[model] = self.deserialized.get(model, 0) + count
+
+    def merge(self, other: 'IOStats') -> None:
+        for key, value in other.calls.items():
+            self.calls[key] = self.calls.get(key, 0) + value
+        for key, value in other.bytes.items():
+            self.bytes[key] = self.bytes.get(key, 0) + value
+        for key, value in other.seconds.items():
+            self.seconds[key] = self.seconds.get(key, 0.0) + value
+        for key, value in other.decodeSeconds.items():
+            self.decodeSeconds[key] = self.decodeSeconds.get(key, 0.0) + value
+        for key, value in other.deserialized.items():
+            self.deserialized[key] = self.deserialized.get(key, 0) + value
+
+    def totalCalls(self, op: str) -> int:
+        return sum(v for (_, o), v in self.calls.items() if o == op)
+
+    def totalBytes(self, op: Optional[str] = None) -> int:
+        return sum(v for (_, o), v in self.bytes.items() if op is None or o == op)
+
+    def totalSeconds(self) -> float:
+        return sum(self.seconds.values())
+
+    def totalDeserialized(self) -> int:
+        return sum(self.deserialized.values())
+
+class RequestScope:
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.stats = IOStats()
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+class EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.seconds = 0.0
+        self.io = IOStats()
+
+_lock = threading.Lock()
+_process = IOStats()
+_endpoints: Dict[str, EndpointStats] = {}
+_currentScope: contextvars.ContextVar[Optional[RequestScope]] = contextvars.ContextVar('art_request_scope', default=None)
+
+def _fileLabel(file_path: str) -> str:
+    return os.path.basename(file_path)
+
+def recordIO(file_path: str, op: str, nbytes: int, seconds: float, decodeSeconds: float = 0.0) -> None:
+    label = _fileLabel(file_path)
+    with _lock:
+        _process.addIO(label, op, nbytes, seconds, decodeSeconds)
+    scope = _currentScope.get()
+    if scope is not None:
+        scope.stats.addIO(label, op, nbytes, seconds, decodeSeconds)
+
+def recordDeserialized(model: str, count: int) -> None:
+    if not count:
+        return
+    with _lock:
+        _process.addDeserialized(model, count)
+    scope = _currentScope.get()
+    if scope is not None:
+        scope.stats.addDeserialized(model, count)
+
+def beginRequest(endpoint: str) -> contextvars.Token:
+    return _currentScope.set(RequestScope(endpoint))
+
+def currentRequest() -> Optional[RequestScope]:
+    return _currentScope.get()
+
+def endRequest(token: contextvars.Token) -> Optional[RequestScope]:
+    """Closes the current scope, rolls it into its endpoint's totals and returns it."""
+    scope = _currentScope.get()
+    _currentScope.reset(token)
+    if scope is None:
+        return None
+    with _lock:
+        endpoint = _endpoints.setdefault(scope.endpoint, EndpointStats())
+        endpoint.requests += 1
+        endpoint.seconds += scope.elapsed
+        endpoint.io.merge(scope.stats)
+    return scope
+
+def reset() -> None:
+    global _process
+    with _lock:
+        _process = IOStats()
+        _endpoints.clear()
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(**labels: str) -> str:
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + '}'
+
+def renderPrometheus(extra: Optional[List[Tuple[str, str, str, Dict[Tuple[Tuple[str, str], ...], float]]]] = None) -> str:
+    """Renders all counters in the Prometheus text exposition format (version 0.0.4).
+
+    extra lets callers append their own metrics as (name, type, help, {label pairs: value}).
+    """
+    lines: List[str] = []
+
+    def family(name: str, kind: str, helpText: str, samples: List[Tuple[Dict[str, str], float]]) -> None:
+        lines.append(f"# HELP {name} {helpText}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            text = f"{value:.6f}".rstrip('0').rstrip('.') if isinstance(value, float) else str(value)
+            lines.append(f"{name}{_labels(**labels) if labels else ''} {text}")
+
+    with _lock:
+        family('art_storage_operations_total', 'counter', 'Storage loads and saves by data file.',
+               [({'file': f, 'op': op}, v) for (f, op), v in sorted(_process.calls.items())])
+        family('art_storage_bytes_total', 'counter', 'Bytes read or written by data file.',
+               [({'file': f, 'op': op}, v) for (f, op), v in sorted(_process.bytes.items())])
+        family('art_storage_seconds_total', 'counter', 'Wall time spent loading or saving, by data file.',
+               [({'file': f, 'op': op}, v) for (f, op), v in sorted(_process.seconds.items())])
+        family('art_storage_decode_seconds_total', 'counter', 'Time spent decoding JSON, by data file.',
+               [({'file': f}, v) for f, v in sorted(_process.decodeSeconds.items())])
+        family('art_records_deserialized_total', 'counter', 'Records passed through from_dict, by model.',
+               [({'model': m}, v) for m, v in sorted(_process.deserialized.items())])
+
+        endpoints = sorted(_endpoints.items())
+        family('art_http_requests_total', 'counter', 'Requests served, by endpoint.',
+               [({'endpoint': e}, s.requests) for e, s in endpoints])
+        family('art_http_request_seconds_total', 'counter', 'Wall time spent serving requests, by endpoint.',
+               [({'endpoint': e}, s.seconds) for e, s in endpoints])
+        family('art_http_storage_operations_total', 'counter', 'Storage loads and saves, by endpoint.',
+               [({'endpoint': e, 'op': op}, s.io.totalCalls(op)) for e, s in endpoints for op in ('load', 'save')])
+        family('art_http_storage_bytes_total', 'counter', 'Bytes read or written, by endpoint.',
+               [({'endpoint': e, 'op': op}, s.io.totalBytes(op)) for e, s in endpoints for op in ('load', 'save')])
+        family('art_http_records_deserialized_total', 'counter', 'Records passed through from_dict, by endpoint.',
+               [({'endpoint': e}, s.io.totalDeserialized()) for e, s in endpoints])
+
+    for name, kind, helpText, samples in extra or []:
+        family(name, kind, helpText, [(dict(labels), value) for labels, value in samples.items()])
+    return '\n'.join(lines) + '\n'
@@ -1,14 +1,70 @@
 # models/notification.py
 import uuid
+from bisect import bisect_left, insort
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+from . import archive
 from .base_model import BaseModel
 from .constants import NOTIFICATION_DATA_FILE
-from .json_helpers import _load_data
+from .indexes import Index
+
+InboxEntry = Tuple[float, str] # (-sent timestamp, notificationID): ascending order is newest-first
+
+class InboxIndex(Index):
+    """Per-recipient inboxes kept newest-first, with a parallel unread list whose length is the badge count."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        self.inboxes: Dict[str, List[InboxEntry]] = {}
+        self.unread: Dict[str, List[InboxEntry]] = {}
+
+    @staticmethod
+    def _entry(key: Any, record: Dict[str, Any]) -> Optional[Tuple[str, InboxEntry]]:
+        recipient = record.get('recipientUserID')
+        if not recipient or 'messageContent' not in record or key != record.get('notificationID'):
+            return None
+        sent = Notification._parse_datetime(record.get('sentDatetime'), default_now=False)
+        # Undated notifications deserialize as "now", so they sort to the top.
+        return recipient, (-sent.timestamp() if sent else float('-inf'), key)
+
+    @staticmethod
+    def _discard(entries: Optional[List[InboxEntry]], entry: InboxEntry) -> None:
+        if entries:
+            i = bisect_left(entries, entry)
+            if i < len(entries) and entries[i] == entry:
+                del entries[i]
+
+    def add(self, key: Any, record: Dict[str, Any]) -> None:
+        found = self._entry(key, record)
+        if found:
+            recipient, entry = found
+            insort(self.inboxes.setdefault(recipient, []), entry)
+            if not record.get('readStatus', False):
+                insort(self.unread.setdefault(recipient, []), entry)
+
+    def remove(self, key: Any, record: Dict[str, Any]) -> None:
+        found = self._entry(key, record)
+        if found:
+            recipient, entry = found
+            self._discard(self.inboxes.get(recipient), entry)
+            if not record.get('readStatus', False):
+                self._discard(self.unread.get(recipient), entry)
+
+    def page(self, recipient: str, offset: int = 0, limit: Optional[int] = None, unreadOnly: bool = False) -> List[str]:
+        entries = (self.unread if unreadOnly else self.inboxes).get(recipient, [])
+        end = None if limit is None else offset + limit
+        return [notificationID for _, notificationID in entries[offset:end]]
+
+    def unreadCount(self, recipient: str) -> int:
+        return len(self.unread.get(recipient, ()))
 
 class Notification(BaseModel):
     FILE_PATH = NOTIFICATION_DATA_FILE
     PRIMARY_KEY_FIELD = 'notificationID'
+    INDEXES = {'inbox': InboxIndex}
+    ARCHIVED = True
 
     def __init__(self, recipientUserID: str, senderUserID: str, messageContent: str, # camelCase params
                  notificationType: str = "General", notificationID: Optional[str] = None, # camelCase params
@@ -61,15 +117,37 @@ class Notification(BaseModel):
     
     @classmethod
     def findByRecipientID(cls, userIDToFind: str, unreadOnly: bool = False) -> List['Notification']: # Method name camelCase
-        all_data = _load_data(cls.FILE_PATH)
-        items: List['Notification'] = []
-        for d_item in all_data:
-            if d_item.get('recipientUserID') == userIDToFind: # Key camelCase
-                obj = cls.from_dict(d_item)
-                if obj:
-                    if unreadOnly and not obj.readStatus: # Access camelCase attribute
-                        items.append(obj)
-                    elif not unreadOnly:
-                        items.append(obj)
-        items.sort(key=lambda n: n.sentDatetime, reverse=True) # Access camelCase attribute
-        return items
\ No newline at end of file
+        return cls.getLatest(userIDToFind, limit=None, unreadOnly=unreadOnly)
+
+    @classmethod
+    def getLatest(cls, userID: str, limit: Optional[int] = 20, offset: int = 0,
+                  unreadOnly: bool = False) -> List['Notification']:
+        """Returns one page of a user's inbox, archived notifications included, newest first,
+        deserializing only that page."""
+        table = cls._table()
+        end = None if limit is None else offset + limit
+        archived = archive.forModel(cls)
+        archivedIDs = archived.index('inbox').page(userID, 0, end, unreadOnly)
+        with table.lock:
+            if not archivedIDs:
+                return cls._fromRecords(table.get_many(table.index('inbox').page(userID, offset, limit, unreadOnly)))
+            records = table.get_many(table.index('inbox').page(userID, 0, end, unreadOnly))
+        # Both inboxes are newest-first, so the page lies within the first `end` entries of each.
+        hotIDs = {record['notificationID'] for record in records}
+        records += [record for record in archived.get_many(archivedIDs) if record['notificationID'] not in hotIDs]
+        records.sort(key=lambda record: InboxIndex._entry(record['notificationID'], record)[1])
+        return [cls._markArchived(notification) if notification.notificationID not in hotIDs else notification
+                for notification in cls._fromRecords(records[offset:end])]
+
+    @classmethod
+    def countUnread(cls, userID: str) -> int:
+        return cls._table().index('inbox').unreadCount(userID)
+
+    @classmethod
+    def markAllAsRead(cls, userID: str) -> int:
+        """Marks every unread notification for a user as read with one write. Returns how many changed."""
+        table = cls._table()
+        with table.transaction():
+            unreadIDs = table.index('inbox').page(userID, unreadOnly=True)
+            updated = [dict(d_item, readStatus=True) for d_item in table.get_many(unreadIDs)]
+            return table.upsert_many(updated)
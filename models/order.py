@@ -5,11 +5,12 @@ from typing import Optional, List, Dict, Any
 from .base_model import BaseModel
 from .constants import ORDER_DATA_FILE
 from .order_line_item import OrderLineItem # Direct import for getLineItems
-from .json_helpers import _load_data # For findByUserID
+from .indexes import HashIndex
 
 class Order(BaseModel):
     FILE_PATH = ORDER_DATA_FILE
     PRIMARY_KEY_FIELD = 'orderID'
+    INDEXES = {'userID': lambda: HashIndex('userID')}
 
     def __init__(self, userID: str, orderID: Optional[str] = None,
                  status: str = "PendingPayment", order_datetime: Optional[datetime] = None):
@@ -58,11 +59,4 @@ class Order(BaseModel):
 
     @classmethod
     def findByUserID(cls, user_id: str) -> List['Order']:
-        all_data = _load_data(cls.FILE_PATH)
-        orders: List['Order'] = []
-        for item_data in all_data:
-            if item_data.get('userID') == user_id:
-                obj = cls.from_dict(item_data)
-                if obj:
-                    orders.append(obj)
-        return orders
\ No newline at end of file
+        return cls.query().where('userID', '==', user_id).all()
\ No newline at end of file
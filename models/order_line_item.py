@@ -3,11 +3,12 @@ import uuid
 from typing import Optional, Dict, Any, List
 from .base_model import BaseModel
 from .constants import ORDER_LINE_ITEM_DATA_FILE
-from .json_helpers import _load_data
+from .indexes import HashIndex
 
 class OrderLineItem(BaseModel):
     FILE_PATH = ORDER_LINE_ITEM_DATA_FILE
     PRIMARY_KEY_FIELD = 'lineItemID'
+    INDEXES = {'orderID': lambda: HashIndex('orderID')}
 
     def __init__(self, orderID: str, itemID: str, itemType: str, # camelCase params
                  quantity: int, unitPrice: float, lineItemID: Optional[str] = None): # camelCase params
@@ -51,11 +52,4 @@ class OrderLineItem(BaseModel):
 
     @classmethod
     def findByOrderID(cls, orderIDToFind: str) -> List['OrderLineItem']: # Method name camelCase
-        all_data = _load_data(cls.FILE_PATH)
-        items: List['OrderLineItem'] = []
-        for item_data in all_data:
-            if item_data.get('orderID') == orderIDToFind: # Key is camelCase
-                obj = cls.from_dict(item_data)
-                if obj:
-                    items.append(obj)
-        return items
\ No newline at end of file
+        return cls.query().where('orderID', '==', orderIDToFind).all()
\ No newline at end of file
@@ -4,11 +4,12 @@ from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 from .base_model import BaseModel
 from .constants import PAYMENT_DATA_FILE
-from .json_helpers import _load_data
+from .indexes import HashIndex
 
 class Payment(BaseModel):
     FILE_PATH = PAYMENT_DATA_FILE
     PRIMARY_KEY_FIELD = 'paymentID'
+    INDEXES = {'orderID': lambda: HashIndex('orderID')}
 
     def __init__(self, orderID: str, amount: float, method: str = "MockCard",
                  status: str = "Completed", paymentID: Optional[str] = None, # camelCase params
@@ -57,8 +58,4 @@ class Payment(BaseModel):
             
     @classmethod
     def findByOrderID(cls, orderIDToFind: str) -> Optional['Payment']: # Method name camelCase
-        all_data = _load_data(cls.FILE_PATH)
-        for item_data in all_data:
-            if item_data.get('orderID') == orderIDToFind: # Key camelCase
-                return cls.from_dict(item_data)
-        return None
\ No newline at end of file
+        return cls.query().where('orderID', '==', orderIDToFind).first()
\ No newline at end of file
@@ -0,0 +1,174 @@
+# models/query.py
+import heapq
+import itertools
+import operator
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from . import archive
+
+def _contains(value: Any, needle: Any) -> bool:
+    return value is not None and needle in value
+
+def _icontains(value: Any, needle: str) -> bool:
+    return isinstance(value, str) and needle.lower() in value.lower()
+
+def _startswith(value: Any, prefix: str) -> bool:
+    return isinstance(value, str) and value.startswith(prefix)
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda value, options: value in options,
+    'contains': _contains,
+    'icontains': _icontains,
+    'startswith': _startswith,
+}
+
+class Query:
+    """Chainable filter over a model's raw records.
+
+    Predicates run against the stored dicts, so only rows that survive every
+    where() clause (and the limit) are passed to from_dict. An '==' or 'in'
+    clause on a field the model indexes is answered from the index instead of
+    a scan.
+    """
+
+    def __init__(self, model: Any):
+        self.model = model
+        self.conditions: List[Tuple[str, str, Any]] = []
+        self.orderField: Optional[str] = None
+        self.descending = False
+        self.limitCount: Optional[int] = None
+        self.offsetCount = 0
+        self.withArchived = False
+        self.archivedKeys: Set[Any] = set() # Keys the last items() served from the archive
+
+    def where(self, field: str, op: str, value: Any) -> 'Query':
+        if op not in OPERATORS:
+            raise ValueError(f"Unsupported query operator '{op}'. Expected one of: {', '.join(OPERATORS)}")
+        self.conditions.append((field, op, value))
+        return self
+
+    def order_by(self, field: str, descending: bool = False) -> 'Query':
+        self.orderField = field
+        self.descending = descending
+        return self
+
+    def limit(self, count: int, offset: int = 0) -> 'Query':
+        self.limitCount = count
+        self.offsetCount = offset
+        return self
+
+    def includeArchived(self) -> 'Query':
+        """Also matches records the archival job has moved out of the hot store. Read-only: update() and delete() refuse it."""
+        self.withArchived = True
+        return self
+
+    def _indexedKeys(self, table: Any) -> Optional[List[Any]]:
+        for field, op, value in self.conditions:
+            if op not in ('==', 'in'):
+                continue
+            # Indexes skip None values, so those clauses are answered by a scan.
+            if (value is None) if op == '==' else (None in value):
+                continue
+            for index in table.indexes.values():
+                if getattr(index, 'field', None) == field and hasattr(index, 'keys'):
+                    if op == '==':
+                        return index.keys(value)
+                    return [key for option in value for key in index.keys(option)]
+        return None
+
+    def _matchingIn(self, table: Any) -> List[Tuple[Any, Dict[str, Any]]]:
+        with table.lock:
+            candidates = table.items(self._indexedKeys(table.ensure_fresh()))
+        return [item for item in candidates if self._matches(item[1])]
+
+    def _matches(self, record: Dict[str, Any]) -> bool:
+        for field, op, value in self.conditions:
+            try:
+                if not OPERATORS[op](record.get(field), value):
+                    return False
+            except TypeError: # e.g. comparing a stored None or str against a number
+                return False
+        return True
+
+    def items(self) -> List[Tuple[Any, Dict[str, Any]]]:
+        """Returns matching (key, raw record) pairs, ordered and limited, without deserializing."""
+        table = self.model._table()
+        if hasattr(table, 'query'): # Served by the storage server, next to its indexes
+            if not self.withArchived:
+                return table.query(self)
+            unordered = Query(self.model)
+            unordered.conditions = self.conditions
+            rows = table.query(unordered)
+        else:
+            rows = self._matchingIn(table)
+        if self.withArchived:
+            seen = {key for key, _ in rows}
+            archived = [item for item in self._matchingIn(archive.forModel(self.model)) if item[0] not in seen]
+            self.archivedKeys = {key for key, _ in archived}
+            rows += archived
+
+        if self.orderField is not None:
+            field = self.orderField
+            # Missing values sort last in either direction.
+            present = [item for item in rows if item[1].get(field) is not None]
+            missing = [item for item in rows if item[1].get(field) is None]
+            keyFunc = lambda item: item[1].get(field)
+            if self.limitCount is not None:
+                wanted = self.offsetCount + self.limitCount
+                pick = heapq.nlargest if self.descending else heapq.nsmallest
+                present = pick(wanted, present, key=keyFunc)
+            else:
+                present.sort(key=keyFunc, reverse=self.descending)
+            rows = present + missing
+
+        if self.limitCount is not None:
+            return rows[self.offsetCount:self.offsetCount + self.limitCount]
+        return rows[self.offsetCount:]
+
+    def iterRecords(self) -> Iterator[Dict[str, Any]]:
+        """Yields matching raw records lazily. Unordered queries filter as they go, so a
+        consumer that streams its output never holds the full result list."""
+        table = self.model._table()
+        if self.orderField is not None or self.withArchived or hasattr(table, 'query'): # Ordering and merging need every match first
+            yield from self.records()
+            return
+        with table.lock:
+            candidates = table.items(self._indexedKeys(table.ensure_fresh())) # Snapshot of references only
+        matches = (record for _, record in candidates if self._matches(record))
+        stop = self.offsetCount + self.limitCount if self.limitCount is not None else None
+        yield from itertools.islice(matches, self.offsetCount, stop)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Returns the matching raw records without deserializing them."""
+        return [record for _, record in self.items()]
+
+    def _markArchived(self, obj: Any) -> Any:
+        if self.archivedKeys and getattr(obj, self.model.PRIMARY_KEY_FIELD, None) in self.archivedKeys:
+            obj.fromArchive = True # save() refuses it
+        return obj
+
+    def all(self) -> List[Any]:
+        return [self._markArchived(obj) for obj in self.model._fromRecords(self.records())]
+
+    def first(self) -> Optional[Any]:
+        for record in self.records():
+            obj = self.model._fromRecord(record)
+            if obj:
+                return self._markArchived(obj)
+        return None
+
+    def count(self) -> int:
+        return len(self.items())
+
+    def update(self, changes: Dict[str, Any]) -> int:
+        """Merges changes into every matching record with one write. Returns the affected count."""
+        return self.model.updateWhere(self, changes)
+
+    def delete(self) -> int:
+        """Deletes every matching record with one write. Returns the affected count."""
+        return self.model.deleteWhere(self)
@@ -8,6 +8,7 @@ from .constants import REFUND_DATA_FILE
 class Refund(BaseModel):
     FILE_PATH = REFUND_DATA_FILE
     PRIMARY_KEY_FIELD = 'refundID'
+    ARCHIVED = True
 
     def __init__(self, paymentID: str, orderID: str, ticketID: str, # camelCase params
                  refundAmount: float, refundReason: str = "User requested", # camelCase params
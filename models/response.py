@@ -4,11 +4,12 @@ from datetime import datetime, timezone
 from typing import Optional, List, Dict, Any
 from .base_model import BaseModel
 from .constants import RESPONSE_DATA_FILE
-from .json_helpers import _load_data # For find_by_feedback_id
+from .indexes import HashIndex
 
 class Response(BaseModel):
     FILE_PATH = RESPONSE_DATA_FILE
     PRIMARY_KEY_FIELD = 'responseID'
+    INDEXES = {'feedbackID': lambda: HashIndex('feedbackID')}
 
     def __init__(self, feedbackID: str, responderAdminID: str, responseContent: str,
         responseID: Optional[str] = None, responseDatetime: Optional[datetime] = None):
@@ -50,11 +51,4 @@ class Response(BaseModel):
 
     @classmethod
     def find_by_feedback_id(cls, feedback_id_to_find: str) -> List['Response']:
-        all_data = _load_data(cls.FILE_PATH)
-        items: List['Response'] = []
-        for d_item in all_data:
-            if d_item.get('feedbackID') == feedback_id_to_find:
-                obj = cls.from_dict(d_item)
-                if obj:
-                    items.append(obj)
-        return items
\ No newline at end of file
+        return cls.query().where('feedbackID', '==', feedback_id_to_find).all()
\ No newline at end of file
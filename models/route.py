@@ -8,6 +8,7 @@ from .stop import Stop
 class Route(BaseModel):
     FILE_PATH = ROUTE_DATA_FILE
     PRIMARY_KEY_FIELD = 'routeID'
+    REQUIRED_FIELDS = ('routeName', 'routeID')
 
     def __init__(self, routeName: str, description: str, # camelCase params
                  routeID: Optional[str] = None, stopIDs: Optional[List[str]] = None): # camelCase params
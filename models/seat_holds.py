@@ -0,0 +1,140 @@
+# models/seat_holds.py
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from .timing_wheel import TimingWheel
+from .trip import Trip
+
+# Seats held for a checkout in progress.
+#
+# A hold takes its seats in the trip's seat map straight away, so every worker
+# sees them as gone, and records {holdID: {seats, expiresAt}} on the trip. It
+# then either becomes a booking (confirmHold keeps the seats) or is released:
+# explicitly, or when its TTL runs out on this process's timing wheel. Holds
+# orphaned by a process that died are reaped lazily, the next time their trip
+# is held against.
+
+HOLD_SECONDS = float(os.environ.get('ART_SEAT_HOLD_SECONDS', 600))
+
+holdCounts = {"placed": 0, "confirmed": 0, "released": 0, "expired": 0}
+holdCountsLock = threading.Lock()
+
+def _count(event: str, amount: int = 1) -> None:
+    with holdCountsLock:
+        holdCounts[event] += amount
+
+class SeatHold:
+    def __init__(self, holdID: str, tripID: str, seats: List[str], expiresAt: float):
+        self.holdID = holdID
+        self.tripID = tripID
+        self.seats = seats
+        self.expiresAt = expiresAt # Unix time
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'holdID': self.holdID, 'tripID': self.tripID, 'seats': self.seats, 'expiresAt': self.expiresAt}
+
+def _releaseOnTrip(trip: Trip, holdIDs: List[str]) -> int:
+    released = 0
+    for holdID in holdIDs:
+        hold = trip.seatHolds.pop(holdID, None)
+        if hold is not None:
+            trip.releaseSeats(hold['seats'])
+            released += 1
+    return released
+
+def _reapExpired(trip: Trip, now: float) -> int:
+    expired = [holdID for holdID, hold in trip.seatHolds.items() if hold.get('expiresAt', 0) <= now]
+    for holdID in expired:
+        _wheel.cancel(holdID)
+    return _releaseOnTrip(trip, expired)
+
+def reapExpired(trip: Trip) -> int:
+    """Releases the trip's holds whose TTL has passed. The caller holds the trips transaction and saves the trip."""
+    return _reapExpired(trip, time.time())
+
+def _expire(due: List[Tuple[str, str]]) -> None:
+    """Timing wheel callback: releases every hold due this tick, with one write for all their trips."""
+    holdsByTrip: Dict[str, List[str]] = {}
+    for tripID, holdID in due:
+        holdsByTrip.setdefault(tripID, []).append(holdID)
+    table = Trip._table()
+    with table.transaction():
+        changedTrips = []
+        expiredCount = 0
+        for tripID, holdIDs in holdsByTrip.items():
+            trip = Trip.findByID(tripID)
+            released = _releaseOnTrip(trip, holdIDs) if trip and not trip.fromArchive else 0
+            if released:
+                changedTrips.append(trip.to_dict())
+                expiredCount += released
+        table.upsert_many(changedTrips)
+    _count("expired", expiredCount)
+
+_wheel = TimingWheel(_expire)
+
+def activeHolds() -> int:
+    """Holds this process is timing."""
+    return len(_wheel)
+
+def placeHold(tripID: str, numSeats: int, preferredSeats: Optional[List[str]] = None,
+              ttlSeconds: Optional[float] = None) -> Optional[SeatHold]:
+    """Holds numSeats seats (exactly the preferred ones, if given). Returns None if they are not available."""
+    ttl = HOLD_SECONDS if ttlSeconds is None else ttlSeconds
+    with Trip._table().transaction():
+        trip = Trip.findByID(tripID) # Call camelCase method
+        if trip is None or trip.fromArchive: # Archived trips have departed
+            return None
+        hadSeatMap = trip.capacity is not None
+        reaped = _reapExpired(trip, time.time())
+        seats = trip.assignSeats(numSeats, preferredSeats) # Call camelCase method
+        if seats is None:
+            if reaped or not hadSeatMap:
+                trip.save()
+            return None
+        hold = SeatHold(str(uuid.uuid4()), tripID, seats, time.time() + ttl)
+        trip.seatHolds[hold.holdID] = {'seats': seats, 'expiresAt': hold.expiresAt}
+        trip.save()
+    _wheel.schedule(hold.holdID, ttl, (tripID, hold.holdID))
+    _count("placed")
+    return hold
+
+def getHold(tripID: str, holdID: str) -> Optional[SeatHold]:
+    """A live hold, or None if it was confirmed, released or has expired."""
+    trip = Trip.findByID(tripID) # Call camelCase method
+    hold = trip.seatHolds.get(holdID) if trip else None
+    if hold is None or hold['expiresAt'] <= time.time():
+        return None
+    return SeatHold(holdID, tripID, hold['seats'], hold['expiresAt'])
+
+def confirmHold(tripID: str, holdID: str) -> Optional[List[str]]:
+    """Turns a live hold into a booking: its seats stay taken. Returns them, or None if the hold is gone."""
+    with Trip._table().transaction():
+        trip = Trip.findByID(tripID) # Call camelCase method
+        hold = trip.seatHolds.pop(holdID, None) if trip and not trip.fromArchive else None
+        if hold is None:
+            return None
+        if hold['expiresAt'] <= time.time(): # Expired but not yet reaped
+            trip.releaseSeats(hold['seats'])
+            trip.save()
+            _wheel.cancel(holdID)
+            _count("expired")
+            return None
+        trip.save()
+    _wheel.cancel(holdID)
+    _count("confirmed")
+    return hold['seats']
+
+def releaseHold(tripID: str, holdID: str) -> bool:
+    """Gives a hold's seats back. Returns False if the hold is already gone."""
+    with Trip._table().transaction():
+        trip = Trip.findByID(tripID) # Call camelCase method
+        released = _releaseOnTrip(trip, [holdID]) if trip and not trip.fromArchive else 0
+        if released:
+            trip.save()
+    _wheel.cancel(holdID)
+    if released:
+        _count("released")
+    return bool(released)
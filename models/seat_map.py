@@ -0,0 +1,109 @@
+# models/seat_map.py
+import base64
+from typing import Iterable, List, Optional
+
+# Seat occupancy for one trip as a bitmap held in a Python int: bit i set means
+# seat i+1 is taken. Free-seat searches are a handful of big-int operations
+# (a 300-seat train is five machine words), not a loop over seats:
+#   lowest free seat          ~bits & (bits + 1)
+#   start of a free run of n  AND of ~bits shifted by 0..n-1
+# Trips persist the bitmap as base64 of its little-endian bytes (40 bytes of
+# base64 for 300 seats) next to their capacity.
+
+class SeatMap:
+    def __init__(self, capacity: int, bits: int = 0):
+        if capacity < 0:
+            raise ValueError("Seat map capacity cannot be negative.")
+        self.capacity = capacity
+        self.full = (1 << capacity) - 1
+        self.bits = bits & self.full
+
+    @staticmethod
+    def label(seat: int) -> str:
+        return str(seat + 1)
+
+    def parse(self, label: Optional[str]) -> Optional[int]:
+        """Seat index for a seat label, or None if it is not a seat on this map."""
+        try:
+            seat = int(str(label).strip()) - 1
+        except (TypeError, ValueError):
+            return None
+        return seat if 0 <= seat < self.capacity else None
+
+    def takenCount(self) -> int:
+        return self.bits.bit_count()
+
+    def freeCount(self) -> int:
+        return self.capacity - self.takenCount()
+
+    def isFree(self, seat: int) -> bool:
+        return 0 <= seat < self.capacity and not (self.bits >> seat) & 1
+
+    def firstFree(self) -> Optional[int]:
+        lowest = ~self.bits & (self.bits + 1) & self.full
+        return lowest.bit_length() - 1 if lowest else None
+
+    def firstFreeRun(self, count: int) -> Optional[int]:
+        """Start of the lowest run of count adjacent free seats, or None."""
+        starts = ~self.bits & self.full
+        for shift in range(1, count):
+            starts &= ~self.bits >> shift
+        starts &= (1 << max(self.capacity - count + 1, 0)) - 1
+        return (starts & -starts).bit_length() - 1 if starts else None
+
+    def _freeSeats(self, count: int) -> List[int]:
+        seats: List[int] = []
+        bits = self.bits
+        while len(seats) < count:
+            lowest = ~bits & (bits + 1) & self.full
+            if not lowest:
+                break
+            seats.append(lowest.bit_length() - 1)
+            bits |= lowest
+        return seats
+
+    def canAllocate(self, count: int, preferred: Optional[Iterable[str]] = None) -> bool:
+        if preferred:
+            seats = [self.parse(label) for label in preferred]
+            return len(set(seats)) == len(seats) == count and all(seat is not None and self.isFree(seat) for seat in seats)
+        return self.freeCount() >= count
+
+    def allocate(self, count: int, preferred: Optional[Iterable[str]] = None) -> Optional[List[str]]:
+        """Takes count seats at once and returns their labels, or takes none and returns None.
+
+        Preferred seats are taken exactly as given. Otherwise a group gets adjacent
+        seats when a long enough run is free, else the lowest free seats.
+        """
+        if count < 1:
+            return []
+        if preferred:
+            preferred = list(preferred)
+            if not self.canAllocate(count, preferred):
+                return None
+            seats = [self.parse(label) for label in preferred]
+        else:
+            start = self.firstFreeRun(count)
+            seats = list(range(start, start + count)) if start is not None else self._freeSeats(count)
+            if len(seats) < count:
+                return None
+        for seat in seats:
+            self.bits |= 1 << seat
+        return [self.label(seat) for seat in seats]
+
+    def release(self, labels: Iterable[str]) -> int:
+        """Frees the given seats. Returns how many were taken before."""
+        released = 0
+        for label in labels:
+            seat = self.parse(label)
+            if seat is not None and not self.isFree(seat):
+                self.bits &= ~(1 << seat)
+                released += 1
+        return released
+
+    def encode(self) -> str:
+        return base64.b64encode(self.bits.to_bytes((self.capacity + 7) // 8, 'little')).decode('ascii')
+
+    @classmethod
+    def decode(cls, capacity: int, encoded: Optional[str]) -> 'SeatMap':
+        bits = int.from_bytes(base64.b64decode(encoded), 'little') if encoded else 0
+        return cls(capacity, bits)
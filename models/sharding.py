@@ -0,0 +1,204 @@
+# models/sharding.py
+import glob
+import os
+import re
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .indexes import Change, Index, Table, _file_signature
+from .json_helpers import _load_data, _save_data
+
+# Splits one logical store over several JSON files so a save rewrites only the
+# shard its record lives in. tickets.json sharded by month becomes
+#
+#   tickets.shard-2025-06.json, tickets.shard-2025-07.json, ...
+#
+# next to the original file. Records still in the original (unsharded) file stay
+# readable and move to their shard the next time they are saved, or all at once
+# with ShardedTable.migrate() (`flask shard-stores`).
+#
+# Sharding is configured per store with ART_SHARDING, e.g.
+#   ART_SHARDING="tickets.json=month:issueDatetime,notifications.json=hash:16,order_line_items.json=field:orderID"
+# or by setting SHARDING on a model class.
+
+SHARD_INFIX = '.shard-'
+
+def _safeName(value: Any) -> str:
+    return re.sub(r'[^A-Za-z0-9_-]', '_', str(value)) or '_'
+
+class ShardStrategy:
+    """Decides which shard a record belongs to."""
+
+    def shardFor(self, key: Any, record: Dict[str, Any]) -> str:
+        raise NotImplementedError("Subclasses must implement shardFor")
+
+class HashShards(ShardStrategy):
+    """Spreads records evenly over a fixed number of shards by primary key."""
+
+    def __init__(self, count: int):
+        if count < 1:
+            raise ValueError("Shard count must be at least 1.")
+        self.count = count
+        self.width = len(str(count - 1))
+
+    def shardForKey(self, key: Any) -> str:
+        """The shard a key lives in, known without the record."""
+        return f"{zlib.crc32(str(key).encode('utf-8')) % self.count:0{self.width}d}"
+
+    def shardFor(self, key: Any, record: Dict[str, Any]) -> str:
+        return self.shardForKey(key)
+
+class FieldShards(ShardStrategy):
+    """One shard per value of a partition field, e.g. tripID."""
+
+    def __init__(self, field: str):
+        self.field = field
+
+    def shardFor(self, key: Any, record: Dict[str, Any]) -> str:
+        value = record.get(self.field)
+        return _safeName(value) if value not in (None, '') else 'none'
+
+class MonthShards(FieldShards):
+    """One shard per calendar month of an ISO date field, e.g. issueDatetime."""
+
+    def shardFor(self, key: Any, record: Dict[str, Any]) -> str:
+        value = record.get(self.field)
+        if isinstance(value, str) and re.match(r'\d{4}-\d{2}', value):
+            return value[:7]
+        return 'undated'
+
+STRATEGIES: Dict[str, Callable[[str], ShardStrategy]] = {
+    'hash': lambda arg: HashShards(int(arg)),
+    'field': FieldShards,
+    'month': MonthShards,
+}
+
+def parseSpec(spec: str) -> Dict[str, ShardStrategy]:
+    """Parses 'store.json=kind:arg,...' into strategies keyed by store file name."""
+    strategies: Dict[str, ShardStrategy] = {}
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        try:
+            store, rule = entry.split('=', 1)
+            kind, arg = rule.split(':', 1)
+            strategies[os.path.basename(store.strip())] = STRATEGIES[kind.strip()](arg.strip())
+        except (KeyError, ValueError) as e:
+            print(f"Warning: Ignoring sharding rule '{entry}': {e}. Expected store.json=hash:N|field:name|month:name.")
+    return strategies
+
+_configured: Optional[Dict[str, ShardStrategy]] = None
+
+def configured(file_path: str) -> Optional[ShardStrategy]:
+    """The strategy ART_SHARDING assigns to a store, or None to keep it in one file."""
+    global _configured
+    if _configured is None:
+        _configured = parseSpec(os.environ.get('ART_SHARDING', ''))
+    return _configured.get(os.path.basename(file_path))
+
+class ShardedTable(Table):
+    """A Table whose records are spread over per-shard files.
+
+    Indexes stay global, so finders and queries behave exactly as for a single
+    file. A write rewrites only the shards its changes touch, and a reload after
+    another process's write re-parses only the shard files whose signature moved.
+    """
+
+    SNAPSHOT_FIELDS = Table.SNAPSHOT_FIELDS + ('shards', 'shardSignatures', 'shardOf')
+
+    def __init__(self, file_path: str, pk_field: str, strategy: ShardStrategy,
+                 index_factories: Optional[Dict[str, Callable[[], Index]]] = None):
+        super().__init__(file_path, pk_field, index_factories)
+        self.strategy = strategy
+        self.shardPrefix = os.path.splitext(file_path)[0] + SHARD_INFIX
+        self.shards: Dict[str, Dict[Any, Dict[str, Any]]] = {} # shard file -> records; file_path holds unmigrated ones
+        self.shardSignatures: Dict[str, Tuple[int, int]] = {}
+        self.shardOf: Dict[Any, str] = {} # key -> shard file it is stored in
+
+    def shardPath(self, shard: str) -> str:
+        return f"{self.shardPrefix}{shard}.json"
+
+    def _diskSignatures(self) -> Dict[str, Tuple[int, int]]:
+        paths = [self.file_path] + glob.glob(glob.escape(self.shardPrefix) + '*.json')
+        signatures = {path: _file_signature(path) for path in paths}
+        return {path: signature for path, signature in signatures.items() if signature is not None}
+
+    @staticmethod
+    def _combined(signatures: Dict[str, Tuple[int, int]]) -> Any:
+        return tuple(sorted((os.path.basename(path), signature) for path, signature in signatures.items()))
+
+    def _current_signature(self) -> Any:
+        return self._combined(self._diskSignatures())
+
+    def _key_for_shard(self, record: Dict[str, Any], path: str, position: int) -> Any:
+        pk = record.get(self.pk_field)
+        if pk is None or pk in self.records:
+            return ('__unkeyed__', os.path.basename(path), position)
+        return pk
+
+    def _reload(self) -> None:
+        self.sharedSeen = self.shared.read(self.sharedName) if self.shared else 0
+        self.statCheckedAt = time.monotonic()
+        onDisk = self._diskSignatures()
+        changed = [path for path in sorted(set(onDisk) | set(self.shards))
+                   if path not in self.shardSignatures or onDisk.get(path) != self.shardSignatures[path]]
+        self.version += 1
+        # Drop every changed shard before loading any: a record another process moved
+        # into an earlier shard would otherwise still be held by its old one, load as unkeyed,
+        # and then lose its real key when the old shard is dropped.
+        for path in changed:
+            for key, record in self.shards.pop(path, {}).items():
+                if self.shardOf.get(key) == path:
+                    del self.records[key], self.shardOf[key]
+                    self.recordVersions.pop(key, None)
+                    for index in self.indexes.values():
+                        index.remove(key, record)
+            self.shardSignatures.pop(path, None)
+        for path in changed:
+            if path not in onDisk:
+                continue
+            records: Dict[Any, Dict[str, Any]] = {}
+            for i, item_data in enumerate(_load_data(path)):
+                if isinstance(item_data, dict):
+                    key = self._key_for_shard(item_data, path, i)
+                    records[key] = self.records[key] = item_data
+                    self.shardOf[key] = path
+                    if self.loaded: # Unchanged shards keep their record versions
+                        self.recordVersions[key] = self.version
+                    for index in self.indexes.values():
+                        index.add(key, item_data)
+            self.shards[path] = records
+            self.shardSignatures[path] = onDisk[path]
+        if not self.loaded:
+            self.loadedVersion = self.version
+            self.loaded = True
+        self.signature = self._combined(self.shardSignatures)
+
+    def _place(self, applied: List[Change]) -> List[str]:
+        """Moves changed records into their shards' record maps; returns the shard files to rewrite."""
+        touched = set()
+        for key, _, record in applied:
+            previous = self.shardOf.pop(key, None)
+            if previous is not None:
+                self.shards[previous].pop(key, None)
+                touched.add(previous)
+            if record is not None:
+                path = self.shardPath(self.strategy.shardFor(key, record))
+                self.shards.setdefault(path, {})[key] = record
+                self.shardOf[key] = path
+                touched.add(path)
+        return sorted(touched)
+
+    def _persist(self, applied: List[Change]) -> None:
+        for path in self._place(applied):
+            _save_data(path, list(self.shards[path].values()))
+            self.shardSignatures[path] = _file_signature(path)
+        self.signature = self._combined(self.shardSignatures)
+
+    def migrate(self) -> int:
+        """Moves every record still in the unsharded file into its shard. Returns how many moved."""
+        with self.transaction():
+            legacy = self.shards.get(self.file_path, {})
+            moved: List[Change] = [(key, record, record) for key, record in legacy.items()]
+            if moved:
+                self._write(moved) # Contents are unchanged, so indexes and listeners are left alone
+            return len(moved)
@@ -0,0 +1,130 @@
+# models/shared_versions.py
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError: # Not available on Windows; tables fall back to stat() checks only
+    fcntl = None
+
+# A small memory-mapped file of per-store write counters shared by every worker
+# process. Each Table bumps its store's counter after writing it and compares
+# the counter with the value it last loaded before every read, which costs a
+# memory read instead of a stat() call.
+#
+# Layout of VERSION_FILE_NAME (one per data directory):
+#   16-byte header: MAGIC + padding
+#   SLOT_COUNT slots of <name hash: uint64, counter: uint64>, hash 0 = free slot
+# Slots are claimed with linear probing and never released, so a store's offset
+# can be cached once found. Writers hold an exclusive flock on the file.
+
+VERSION_FILE_NAME = '.art_versions'
+MAGIC = b'ARTVER01'
+HEADER_SIZE = 16
+SLOT = struct.Struct('<QQ')
+COUNTER = struct.Struct('<Q')
+SLOT_COUNT = 1024
+FILE_SIZE = HEADER_SIZE + SLOT_COUNT * SLOT.size
+
+def _nameHash(name: str) -> int:
+    value = int.from_bytes(hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest(), 'little')
+    return value or 1 # 0 marks a free slot
+
+class VersionTable:
+    def __init__(self, path: str):
+        self.path = path
+        self.offsets: Dict[str, int] = {} # store name -> slot offset, once claimed
+        self._open()
+        if hasattr(os, 'register_at_fork'):
+            # A forked worker must not share the parent's open file, or its flock would not exclude the parent.
+            os.register_at_fork(after_in_child=self._open)
+
+    def _open(self) -> None:
+        if getattr(self, 'map', None) is not None: # Reopening after fork: drop the inherited handles
+            self.map.close()
+            os.close(self.fd)
+        self.threadLock = threading.RLock() # flock does not exclude threads sharing the descriptor
+        self.depth = 0 # Nested locked() sections of the thread holding threadLock
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        with self.locked():
+            if os.fstat(self.fd).st_size < FILE_SIZE:
+                os.ftruncate(self.fd, FILE_SIZE)
+                os.pwrite(self.fd, MAGIC, 0)
+        self.map = mmap.mmap(self.fd, FILE_SIZE)
+        if self.map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a version table.")
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Exclusive across threads and processes. Re-entrant: only the outermost section takes and drops the flock."""
+        with self.threadLock:
+            if self.depth == 0:
+                fcntl.flock(self.fd, fcntl.LOCK_EX)
+            self.depth += 1
+            try:
+                yield
+            finally:
+                self.depth -= 1
+                if self.depth == 0:
+                    fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def _slot(self, name: str, claim: bool) -> Optional[int]:
+        offset = self.offsets.get(name)
+        if offset is not None:
+            return offset
+        wanted = _nameHash(name)
+        for probe in range(SLOT_COUNT):
+            offset = HEADER_SIZE + ((wanted + probe) % SLOT_COUNT) * SLOT.size
+            stored, _ = SLOT.unpack_from(self.map, offset)
+            if stored == wanted:
+                self.offsets[name] = offset
+                return offset
+            if stored == 0:
+                if not claim:
+                    return None
+                with self.locked():
+                    stored, _ = SLOT.unpack_from(self.map, offset) # Another process may have claimed it
+                    if stored == 0:
+                        SLOT.pack_into(self.map, offset, wanted, 0)
+                if stored in (0, wanted):
+                    self.offsets[name] = offset
+                    return offset
+        raise RuntimeError(f"Version table {self.path} is full.")
+
+    def read(self, name: str) -> int:
+        """Current counter for a store; 0 if it has never been written through a Table."""
+        offset = self._slot(name, claim=False)
+        return COUNTER.unpack_from(self.map, offset + 8)[0] if offset is not None else 0
+
+    def bumpLocked(self, name: str) -> int:
+        """Increments and returns a store's counter. The caller must hold locked()."""
+        offset = self._slot(name, claim=True)
+        value = COUNTER.unpack_from(self.map, offset + 8)[0] + 1
+        COUNTER.pack_into(self.map, offset + 8, value)
+        return value
+
+    def bump(self, name: str) -> int:
+        with self.locked():
+            return self.bumpLocked(name)
+
+_tables: Dict[str, Optional[VersionTable]] = {}
+_tablesLock = threading.Lock()
+
+def forFile(file_path: str) -> Optional[VersionTable]:
+    """The version table shared by stores in file_path's directory, or None if unsupported here."""
+    if fcntl is None or os.environ.get('ART_SHARED_VERSIONS', '1') == '0':
+        return None
+    directory = os.path.dirname(os.path.abspath(file_path))
+    with _tablesLock:
+        if directory not in _tables:
+            try:
+                _tables[directory] = VersionTable(os.path.join(directory, VERSION_FILE_NAME))
+            except (OSError, ValueError) as e:
+                print(f"Warning: Shared version table unavailable in {directory}: {e}. Using file stat checks only.")
+                _tables[directory] = None
+        return _tables[directory]
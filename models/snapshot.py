@@ -0,0 +1,98 @@
+# models/snapshot.py
+import os
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from . import aggregates
+from .indexes import Table
+
+# Startup image of every parsed store and its built indexes.
+#
+# writeAll() pickles each store's Table.snapshotState() into SNAPSHOT_DIR, one
+# file per store. warmup() loads those files on a thread pool and hands each to
+# Table.restoreState(), which accepts it only if the store's files still have
+# the signature the snapshot was taken at and the model declares the same
+# indexes. A store whose snapshot is missing, stale or unreadable is parsed and
+# indexed the usual way, and its snapshot is rewritten for the next start.
+#
+# Snapshots are pickles: only load ones this application wrote (the directory is
+# local, like the JSON stores it caches).
+
+SNAPSHOT_DIR = os.environ.get('ART_SNAPSHOT_DIR', '.art_snapshot')
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_WORKERS = int(os.environ.get('ART_SNAPSHOT_WORKERS', 4))
+
+def tables() -> Dict[str, Table]:
+    """Every model store (and the reporting counters) loaded in this process, keyed by file name."""
+    import models
+    found: Dict[str, Table] = {}
+    for name in models.__all__:
+        model = getattr(models, name)
+        if getattr(model, 'FILE_PATH', None) and getattr(model, 'PRIMARY_KEY_FIELD', None):
+            found[os.path.basename(model.FILE_PATH)] = model._table()
+    found[os.path.basename(aggregates._table().file_path)] = aggregates._table()
+    return {storeName: table for storeName, table in found.items() if isinstance(table, Table)} # Not remote ones
+
+def _path(storeName: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, storeName + '.pickle')
+
+def writeStore(storeName: str, table: Table) -> int:
+    """Writes one store's snapshot atomically. Returns its size in bytes."""
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    # snapshotState() hands back the live records map and indexes, which apply() updates in
+    # place; pickle them under the lock so the image is one consistent records+indexes+signature.
+    with table.lock:
+        payload = pickle.dumps({'format': SNAPSHOT_FORMAT, 'pk': table.pk_field, 'state': table.snapshotState()},
+                               protocol=pickle.HIGHEST_PROTOCOL)
+    temp_path = _path(storeName) + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(temp_path, _path(storeName))
+    return len(payload)
+
+def writeAll() -> Dict[str, int]:
+    """Snapshots every store. Returns bytes written by store."""
+    return {storeName: writeStore(storeName, table) for storeName, table in tables().items()}
+
+def _loadStore(storeName: str, table: Table) -> bool:
+    try:
+        with open(_path(storeName), 'rb') as f:
+            image = pickle.load(f)
+    except FileNotFoundError:
+        return False
+    except Exception as e: # Truncated, or pickled against classes that have since changed
+        print(f"Warning: Ignoring unreadable snapshot for {storeName}: {e}")
+        return False
+    if not isinstance(image, dict) or image.get('format') != SNAPSHOT_FORMAT or image.get('pk') != table.pk_field:
+        return False
+    return table.restoreState(image.get('state') or {})
+
+def _warmStore(storeName: str, table: Table) -> str:
+    if _loadStore(storeName, table):
+        return 'snapshot'
+    table.ensure_fresh() # Full parse and index build
+    try:
+        writeStore(storeName, table)
+    except OSError as e:
+        print(f"Warning: Could not write snapshot for {storeName}: {e}")
+    return 'rebuilt'
+
+def warmup(workers: Optional[int] = None) -> Dict[str, str]:
+    """Loads every store before serving, in parallel. Returns 'snapshot' or 'rebuilt' by store.
+
+    Disabled with ART_SNAPSHOT=0, in which case stores load lazily on first use.
+    """
+    if os.environ.get('ART_SNAPSHOT', '1') == '0':
+        return {}
+    started = time.perf_counter()
+    aggregates._ensureBuilt() # Before loading creates an empty counters file
+    stores = tables()
+    names: List[str] = sorted(stores)
+    with ThreadPoolExecutor(max_workers=workers or SNAPSHOT_WORKERS, thread_name_prefix='art-snapshot') as pool:
+        outcomes = dict(zip(names, pool.map(lambda storeName: _warmStore(storeName, stores[storeName]), names)))
+    restored = sum(outcome == 'snapshot' for outcome in outcomes.values())
+    print(f"Warmed {len(outcomes)} stores in {(time.perf_counter() - started) * 1000:.0f} ms "
+          f"({restored} from snapshot, {len(outcomes) - restored} rebuilt)")
+    return outcomes
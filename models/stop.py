@@ -8,6 +8,7 @@ from .location import Location
 class Stop(BaseModel):
     FILE_PATH = STOP_DATA_FILE
     PRIMARY_KEY_FIELD = 'stopID'
+    REQUIRED_FIELDS = ('stopName', 'locationID')
 
     def __init__(self, stopName: str, locationID: str, # camelCase params
                  stopID: Optional[str] = None, stopCode: Optional[str] = None): # camelCase params
@@ -27,7 +28,7 @@ class Stop(BaseModel):
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> Optional['Stop']:
         # Expect camelCase keys
-        if not isinstance(data, dict) or not all(k in data for k in ['stopName', 'locationID']):
+        if not isinstance(data, dict) or not all(k in data for k in cls.REQUIRED_FIELDS):
             return None
         return cls(
             stopName=data['stopName'],
@@ -0,0 +1,201 @@
+# models/storage_client.py
+import os
+import socket
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .storage_protocol import encode, fromWire, recvFrame
+
+# Client side of the storage server (see storage_server). RemoteTable offers the
+# Table methods the models use, so with ART_STORAGE_SOCKET set get_table hands
+# these out and model code runs unchanged against the shared, server-held data.
+
+class StorageError(RuntimeError):
+    """The server rejected or failed an operation."""
+
+class StorageClient:
+    """One connection per thread, since a store locked through it stays locked by that connection."""
+
+    def __init__(self, socketPath: str, timeout: float = 30.0):
+        self.socketPath = socketPath
+        self.timeout = timeout
+        self.local = threading.local()
+        self.nextID = 0
+        self.idLock = threading.Lock()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self.local, 'sock', None)
+        if sock is None or getattr(self.local, 'pid', None) != os.getpid(): # Never reuse a parent's socket after fork
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socketPath)
+            self.local.sock, self.local.pid = sock, os.getpid()
+        return sock
+
+    def _drop(self) -> None:
+        sock = getattr(self.local, 'sock', None)
+        self.local.sock = None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def callMany(self, requests: List[Dict[str, Any]]) -> List[Any]:
+        """Writes every request in one send, then reads the replies. Raises StorageError on the first failure."""
+        if not requests:
+            return []
+        with self.idLock:
+            firstID = self.nextID
+            self.nextID += len(requests)
+        frames = b''.join(encode({'id': firstID + i, **request}) for i, request in enumerate(requests))
+        sock = self._connection()
+        try:
+            sock.sendall(frames)
+            replies = [recvFrame(sock) for _ in requests]
+        except (OSError, ValueError):
+            self._drop() # The stream position is unknown now; start over on the next call
+            raise
+        results = []
+        for i, reply in enumerate(replies):
+            if reply is None or reply.get('id') != firstID + i:
+                self._drop()
+                raise StorageError("Storage server closed the connection or answered out of order.")
+            if not reply.get('ok'):
+                raise StorageError(reply.get('error') or "Storage operation failed.")
+            results.append(reply.get('result'))
+        return results
+
+    def call(self, op: str, **args: Any) -> Any:
+        return self.callMany([{'op': op, **args}])[0]
+
+    def batch(self, ops: List[Dict[str, Any]]) -> List[Any]:
+        """Runs ops on the server in one round trip, holding the locks of every store they touch."""
+        return self.call('batch', ops=ops)
+
+_clients: Dict[str, StorageClient] = {}
+_clientsLock = threading.Lock()
+
+def clientFor(socketPath: str) -> StorageClient:
+    with _clientsLock:
+        if socketPath not in _clients:
+            _clients[socketPath] = StorageClient(socketPath)
+        return _clients[socketPath]
+
+class RemoteLock:
+    """Context manager taking a store's server-side lock. Re-entrant per thread, like Table.lock.
+
+    The lock request is not sent on entry but pipelined with the thread's next
+    request on the store, so a locked read-modify-write costs no extra round trip
+    to take the lock, and a lock that is never used costs none at all.
+    """
+
+    def __init__(self, table: 'RemoteTable'):
+        self.table = table
+        self.local = threading.local()
+
+    def __enter__(self) -> 'RemoteLock':
+        depth = getattr(self.local, 'depth', 0)
+        if depth == 0:
+            self.local.pending, self.local.held = True, False
+        self.local.depth = depth + 1
+        return self
+
+    def takePending(self) -> bool:
+        """True once, if this thread has entered the lock but not yet sent it."""
+        if getattr(self.local, 'pending', False):
+            self.local.pending, self.local.held = False, True
+            return True
+        return False
+
+    def __exit__(self, *exc: Any) -> None:
+        self.local.depth -= 1
+        if self.local.depth == 0:
+            self.local.pending = False
+            if self.local.held:
+                self.local.held = False
+                self.table.client.call('unlock', store=self.table.store)
+
+class RemoteIndex:
+    """Forwards read-only index calls (lookup, keys, page, ...) to the server's index."""
+
+    def __init__(self, table: 'RemoteTable', name: str):
+        self.table = table
+        self.name = name
+
+    def __getattr__(self, method: str) -> Callable[..., Any]:
+        def call(*args: Any) -> Any:
+            result = self.table._call('index', index=self.name, method=method, args=list(args))
+            return [fromWire(key) for key in result] if isinstance(result, list) else fromWire(result)
+        return call
+
+class RemoteTable:
+    def __init__(self, socketPath: str, file_path: str, pk_field: str):
+        self.client = clientFor(socketPath)
+        self.file_path = file_path
+        self.pk_field = pk_field
+        self.store = os.path.basename(file_path)
+        self.lock = RemoteLock(self)
+        # Kept for interface parity; the server's own tables run the listeners (e.g. aggregates).
+        self.listeners: List[Callable[..., None]] = []
+
+    def _call(self, op: str, **args: Any) -> Any:
+        if self.lock.takePending():
+            return self.client.callMany([{'op': 'lock', 'store': self.store}, {'op': op, 'store': self.store, **args}])[1]
+        return self.client.call(op, store=self.store, **args)
+
+    @contextmanager
+    def transaction(self) -> Iterator['RemoteTable']:
+        """Holds the store on the server for a read-modify-write (see Table.transaction)."""
+        with self.lock:
+            yield self
+
+    def ensure_fresh(self) -> 'RemoteTable':
+        return self # The server keeps its tables fresh
+
+    def index(self, name: str) -> RemoteIndex:
+        return RemoteIndex(self, name)
+
+    def get(self, pk: Any) -> Optional[Dict[str, Any]]:
+        return self._call('get', key=pk)
+
+    def get_many(self, pks: Iterable[Any]) -> List[Dict[str, Any]]:
+        return self._call('getMany', keys=list(pks))
+
+    def items(self, keys: Optional[Iterable[Any]] = None) -> List[Tuple[Any, Dict[str, Any]]]:
+        result = self._call('items', keys=list(keys) if keys is not None else None)
+        return [(fromWire(key), record) for key, record in result]
+
+    def scan(self) -> List[Dict[str, Any]]:
+        return self._call('scan')
+
+    def query(self, query: Any) -> List[Tuple[Any, Dict[str, Any]]]:
+        """Evaluates a Query on the server, where its indexes are, and returns (key, record) pairs."""
+        result = self._call('query', conditions=[list(c) for c in query.conditions],
+                            orderField=query.orderField, descending=query.descending,
+                            limit=query.limitCount, offset=query.offsetCount)
+        return [(fromWire(key), record) for key, record in result]
+
+    def validator(self) -> Tuple[int, Any]:
+        version, signature = self._call('validator')
+        return version, fromWire(signature)
+
+    def versioned(self, pk: Any) -> Tuple[int, Optional[Dict[str, Any]]]:
+        version, record = self._call('versioned', key=pk)
+        return version, record
+
+    def apply(self, changes: Iterable[Tuple[Any, Optional[Dict[str, Any]]]], notify: bool = True) -> int:
+        return self._call('apply', changes=[[key, record] for key, record in changes], notify=notify)
+
+    def upsert_many(self, new_records: Iterable[Dict[str, Any]]) -> int:
+        return self._call('upsertMany', records=list(new_records))
+
+    def bulk_upsert(self, new_records: Iterable[Dict[str, Any]]) -> int:
+        return self._call('bulkUpsert', records=list(new_records))
+
+    def upsert(self, record: Dict[str, Any]) -> None:
+        self.upsert_many([record])
+
+    def delete_many(self, keys: Iterable[Any]) -> int:
+        return self.apply((key, None) for key in keys)
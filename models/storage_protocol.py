@@ -0,0 +1,49 @@
+# models/storage_protocol.py
+import json
+import socket
+import struct
+from typing import Any, Dict, Optional
+
+# Wire format shared by storage_server and storage_client.
+#
+# Every message is one frame: a 4-byte big-endian payload length followed by
+# compact UTF-8 JSON. Requests are {"id", "op", ...op arguments}; replies are
+# {"id", "ok": true, "result"} or {"id", "ok": false, "error"}. A connection
+# carries any number of requests, answered strictly in order, so a client may
+# write several before reading any replies (pipelining).
+
+HEADER = struct.Struct('>I')
+MAX_FRAME = 256 * 1024 * 1024
+
+def encode(message: Dict[str, Any]) -> bytes:
+    payload = json.dumps(message, separators=(',', ':')).encode('utf-8')
+    if len(payload) > MAX_FRAME:
+        raise ValueError(f"Storage message of {len(payload)} bytes exceeds the {MAX_FRAME} byte limit.")
+    return HEADER.pack(len(payload)) + payload
+
+def _recvExactly(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+def recvFrame(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """Reads one message, or returns None if the peer closed the connection between frames."""
+    header = _recvExactly(sock, HEADER.size)
+    if header is None:
+        return None
+    (length,) = HEADER.unpack(header)
+    if length > MAX_FRAME:
+        raise ValueError(f"Storage frame of {length} bytes exceeds the {MAX_FRAME} byte limit.")
+    payload = _recvExactly(sock, length)
+    if payload is None:
+        raise ConnectionError("Storage connection closed mid-frame.")
+    return json.loads(payload)
+
+def fromWire(key: Any) -> Any:
+    """JSON turns tuple keys (e.g. ('__unkeyed__', 3)) into lists; turn them back so they hash."""
+    return tuple(key) if isinstance(key, list) else key
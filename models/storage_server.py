@@ -0,0 +1,201 @@
+# models/storage_server.py
+"""Serves the JSON stores to worker processes over a Unix domain socket.
+
+    python -m models.storage_server --socket /tmp/art-storage.sock
+    ART_STORAGE_SOCKET=/tmp/art-storage.sock python app.py
+
+Run from the data directory. The server loads every store once, keeps the
+tables, indexes and reporting counters hot, and is the only process that writes
+the files; workers started with ART_STORAGE_SOCKET use storage_client.RemoteTable
+instead of loading stores themselves.
+"""
+import argparse
+import contextlib
+import os
+import socketserver
+import sys
+from typing import Any, Callable, Dict, List
+
+from . import aggregates, fare_engine, indexes, snapshot
+from .indexes import Table
+from .query import Query
+from .storage_protocol import encode, fromWire, recvFrame
+
+INDEX_METHODS = {'lookup', 'keys', 'count', 'page', 'unreadCount', 'isTakenByOther'} # Read-only index calls
+
+class StorageError(Exception):
+    pass
+
+class _TableModel:
+    """Stands in for a model class so Query can run against a table directly."""
+
+    def __init__(self, table: Table):
+        self.table = table
+
+    def _table(self) -> Table:
+        return self.table
+
+def loadStores() -> Dict[str, Table]:
+    """Opens every model's store (and the reporting counters) in this process, keyed by file name."""
+    import models
+    stores: Dict[str, Table] = {}
+    for name in models.__all__:
+        model = getattr(models, name)
+        if getattr(model, 'FILE_PATH', None) and getattr(model, 'PRIMARY_KEY_FIELD', None):
+            table = model._table().ensure_fresh()
+            stores[os.path.basename(table.file_path)] = table
+    aggregates._ensureBuilt()
+    counters = aggregates._table().ensure_fresh()
+    stores[os.path.basename(counters.file_path)] = counters
+    return stores
+
+class StorageHandler(socketserver.BaseRequestHandler):
+    """One thread per connection. Locks taken with 'lock' are owned by that thread."""
+
+    def setup(self) -> None:
+        self.held: Dict[str, List[contextlib.ExitStack]] = {} # store -> transactions opened by this connection
+
+    def _store(self, message: Dict[str, Any]) -> Table:
+        table = self.server.stores.get(message.get('store'))
+        if table is None:
+            raise StorageError(f"Unknown store '{message.get('store')}'.")
+        return table
+
+    def _run(self, message: Dict[str, Any]) -> Any:
+        op = message.get('op')
+        if op == 'batch':
+            return self._batch(message.get('ops') or [])
+        handler: Callable[[Dict[str, Any]], Any] = getattr(self, f"op_{op}", None)
+        if handler is None:
+            raise StorageError(f"Unknown operation '{op}'.")
+        return handler(message)
+
+    def _batch(self, ops: List[Dict[str, Any]]) -> List[Any]:
+        """Runs ops in order inside a transaction on every involved store (taken in name order)."""
+        tables = [self._store({'store': name}) for name in sorted({op.get('store') for op in ops if op.get('store')})]
+        with contextlib.ExitStack() as stack:
+            for table in tables:
+                stack.enter_context(table.transaction())
+            return [self._run(op) for op in ops]
+
+    def op_stores(self, message: Dict[str, Any]) -> List[str]:
+        return sorted(self.server.stores)
+
+    def op_get(self, message: Dict[str, Any]) -> Any:
+        return self._store(message).get(fromWire(message['key']))
+
+    def op_getMany(self, message: Dict[str, Any]) -> Any:
+        return self._store(message).get_many(fromWire(key) for key in message['keys'])
+
+    def op_items(self, message: Dict[str, Any]) -> Any:
+        keys = message.get('keys')
+        return self._store(message).items([fromWire(key) for key in keys] if keys is not None else None)
+
+    def op_scan(self, message: Dict[str, Any]) -> Any:
+        return self._store(message).scan()
+
+    def op_apply(self, message: Dict[str, Any]) -> int:
+        return self._store(message).apply(((fromWire(key), record) for key, record in message['changes']),
+                                          notify=message.get('notify', True))
+
+    def op_upsertMany(self, message: Dict[str, Any]) -> int:
+        return self._store(message).upsert_many(message['records'])
+
+    def op_bulkUpsert(self, message: Dict[str, Any]) -> int:
+        return self._store(message).bulk_upsert(message['records'])
+
+    def op_index(self, message: Dict[str, Any]) -> Any:
+        if message.get('method') not in INDEX_METHODS:
+            raise StorageError(f"Index method '{message.get('method')}' is not available remotely.")
+        table = self._store(message)
+        with table.lock:
+            index = table.index(message['index'])
+            return getattr(index, message['method'])(*message.get('args', []))
+
+    def op_query(self, message: Dict[str, Any]) -> Any:
+        query = Query(_TableModel(self._store(message)))
+        for field, op, value in message.get('conditions', []):
+            query.where(field, op, value)
+        if message.get('orderField') is not None:
+            query.order_by(message['orderField'], bool(message.get('descending')))
+        if message.get('limit') is not None or message.get('offset'):
+            query.limit(message.get('limit'), message.get('offset') or 0)
+        return query.items()
+
+    def op_validator(self, message: Dict[str, Any]) -> Any:
+        return self._store(message).validator()
+
+    def op_versioned(self, message: Dict[str, Any]) -> Any:
+        return self._store(message).versioned(fromWire(message['key']))
+
+    def op_lock(self, message: Dict[str, Any]) -> bool:
+        stack = contextlib.ExitStack()
+        stack.enter_context(self._store(message).transaction())
+        self.held.setdefault(message['store'], []).append(stack)
+        return True
+
+    def op_unlock(self, message: Dict[str, Any]) -> bool:
+        if not self.held.get(message['store']):
+            raise StorageError(f"Store '{message['store']}' is not locked by this connection.")
+        self.held[message['store']].pop().close()
+        return True
+
+    def handle(self) -> None:
+        sock = self.request
+        while True:
+            try:
+                message = recvFrame(sock)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Dropping storage connection: {e}")
+                return
+            if message is None:
+                return
+            try:
+                reply = {'id': message.get('id'), 'ok': True, 'result': self._run(message)}
+            except Exception as e:
+                reply = {'id': message.get('id'), 'ok': False, 'error': f"{type(e).__name__}: {e}"}
+            try:
+                sock.sendall(encode(reply))
+            except OSError:
+                return
+
+    def finish(self) -> None:
+        for stacks in self.held.values(): # A client that disconnects mid-lock must not wedge the store
+            while stacks:
+                stacks.pop().close()
+
+class StorageServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128 # Every worker thread opens its own connection, often at once
+
+    def __init__(self, socketPath: str, stores: Dict[str, Table]):
+        self.stores = stores
+        super().__init__(socketPath, StorageHandler)
+
+def serve(socketPath: str) -> None:
+    indexes.useLocalStorage() # This process owns the files; never proxy to itself
+    aggregates.register() # Onto the local tables, in case the package import saw ART_STORAGE_SOCKET
+    fare_engine.register()
+    snapshot.warmup()
+    stores = loadStores()
+    if os.path.exists(socketPath):
+        os.unlink(socketPath) # Left over from a previous run
+    with StorageServer(socketPath, stores) as server:
+        print(f"Serving {len(stores)} stores on {socketPath} ({', '.join(sorted(stores))})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socketPath)
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--socket', default=os.environ.get('ART_STORAGE_SOCKET', 'art-storage.sock'),
+                        help="Unix socket path to listen on (default $ART_STORAGE_SOCKET or art-storage.sock).")
+    args = parser.parse_args(argv)
+    serve(args.socket)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,11 +4,13 @@ from datetime import datetime, timezone
 from typing import Optional, List, Dict, Any
 from .base_model import BaseModel
 from .constants import TICKET_DATA_FILE
-from .json_helpers import _load_data, _save_data
+from .indexes import HashIndex
 
 class Ticket(BaseModel):
     FILE_PATH = TICKET_DATA_FILE
     PRIMARY_KEY_FIELD = 'ticketID'
+    INDEXES = {'orderID': lambda: HashIndex('orderID'), 'tripID': lambda: HashIndex('tripID')}
+    ARCHIVED = True
 
     def __init__(self, userID: str, tripID: str, orderID: str, paymentID: str, # camelCase params
                  seatNumber: Optional[str] = None, issueDatetime: Optional[datetime] = None, # camelCase params
@@ -66,22 +68,8 @@ class Ticket(BaseModel):
 
     @classmethod
     def findByOrderID(cls, orderIDToFind: str) -> List['Ticket']: # Method name camelCase
-        all_data = _load_data(cls.FILE_PATH)
-        items: List['Ticket'] = []
-        for item_data in all_data:
-            if item_data.get('orderID') == orderIDToFind: # Key camelCase
-                obj = cls.from_dict(item_data)
-                if obj:
-                    items.append(obj)
-        return items
+        return cls.query().where('orderID', '==', orderIDToFind).includeArchived().all()
 
     @classmethod
     def deleteByOrderID(cls, orderIDToDelete: str) -> bool: # Method name camelCase
-        all_data = _load_data(cls.FILE_PATH)
-        initial_count = len(all_data)
-        remaining_items = [d for d in all_data if d.get('orderID') != orderIDToDelete] # Key camelCase
-        
-        if len(remaining_items) < initial_count:
-            _save_data(cls.FILE_PATH, remaining_items)
-            return True
-        return False
\ No newline at end of file
+        return cls.deleteWhere(cls.query().where('orderID', '==', orderIDToDelete)) > 0
\ No newline at end of file
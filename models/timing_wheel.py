@@ -0,0 +1,86 @@
+# models/timing_wheel.py
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+# A hashed timing wheel: SLOT_COUNT buckets visited one per tick, each holding
+# the timers due when the wheel next reaches it (plus how many more full turns
+# they must wait). Scheduling and cancelling are O(1) dict operations, and a tick
+# touches only one bucket, so the cost of expiry does not grow with the number
+# of live timers. Due payloads are handed to onExpire in one batch per tick.
+
+Entry = Tuple[int, Any] # (remaining full turns, payload)
+
+class TimingWheel:
+    def __init__(self, onExpire: Callable[[List[Any]], None], tickSeconds: float = 1.0, slotCount: int = 512):
+        self.onExpire = onExpire
+        self.tickSeconds = tickSeconds
+        self.slotCount = slotCount
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            # The ticking thread does not survive fork; a child starts an empty wheel on its first schedule().
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        self.slots: List[Dict[Hashable, Entry]] = [{} for _ in range(self.slotCount)]
+        self.slotOf: Dict[Hashable, int] = {} # timer key -> slot index, for O(1) cancel
+        self.current = 0
+        self.thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.slotOf)
+
+    def schedule(self, key: Hashable, delaySeconds: float, payload: Any) -> None:
+        """Fires payload after delaySeconds (rounded up to whole ticks). Replaces any timer with the same key."""
+        ticks = max(1, math.ceil(delaySeconds / self.tickSeconds))
+        with self.lock:
+            self._cancelLocked(key)
+            slot = (self.current + ticks) % self.slotCount
+            self.slots[slot][key] = ((ticks - 1) // self.slotCount, payload)
+            self.slotOf[key] = slot
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='art-timing-wheel', daemon=True)
+                self.thread.start()
+
+    def _cancelLocked(self, key: Hashable) -> bool:
+        slot = self.slotOf.pop(key, None)
+        if slot is None:
+            return False
+        del self.slots[slot][key]
+        return True
+
+    def cancel(self, key: Hashable) -> bool:
+        """Stops a timer. Returns False if it already fired or never existed."""
+        with self.lock:
+            return self._cancelLocked(key)
+
+    def tick(self) -> List[Any]:
+        """Advances one tick and returns the payloads that fell due."""
+        due: List[Any] = []
+        with self.lock:
+            self.current = (self.current + 1) % self.slotCount
+            bucket = self.slots[self.current]
+            for key, (turns, payload) in list(bucket.items()):
+                if turns:
+                    bucket[key] = (turns - 1, payload)
+                else:
+                    del bucket[key]
+                    del self.slotOf[key]
+                    due.append(payload)
+        return due
+
+    def _run(self) -> None:
+        nextTick = time.monotonic() + self.tickSeconds
+        while True:
+            time.sleep(max(0.0, nextTick - time.monotonic()))
+            while time.monotonic() >= nextTick: # Catch up on ticks missed while busy
+                due = self.tick()
+                nextTick += self.tickSeconds
+                if due:
+                    try:
+                        self.onExpire(due)
+                    except Exception as e:
+                        print(f"Warning: Timer expiry handler failed for {len(due)} timers: {e}")
@@ -3,13 +3,19 @@ from datetime import datetime, timezone
 from typing import Union, Optional, List, Dict, Any
 from .base_model import BaseModel
 from .constants import TRIP_DATA_FILE
+from .query import Query
+from .seat_map import SeatMap
 
 class Trip(BaseModel):
     FILE_PATH = TRIP_DATA_FILE
     PRIMARY_KEY_FIELD = 'tripID' # This is the key in the JSON, often matches attribute
+    REQUIRED_FIELDS = ('tripID', 'origin', 'destination', 'departureTime', 'price', 'availableSeats')
+    ARCHIVED = True
 
     def __init__(self, tripID: str, origin: str, destination: str,
-                 departureTime: Union[str, datetime], price: float, availableSeats: int): # Parameters to camelCase
+                 departureTime: Union[str, datetime], price: float, availableSeats: int, # Parameters to camelCase
+                 capacity: Optional[int] = None, seatMap: Optional[str] = None,
+                 seatHolds: Optional[Dict[str, Dict[str, Any]]] = None, baseFare: Optional[float] = None):
         self.tripID: str = tripID
         self.origin: str = origin
         self.destination: str = destination
@@ -28,10 +34,16 @@ class Trip(BaseModel):
             raise TypeError("departureTime must be a string or datetime object")
 
         self.price: float = float(price) # price was likely already lowercase
+        # Timetabled fare; price is then the demand-based fare charged now (see fare_engine).
+        self.baseFare: Optional[float] = float(baseFare) if baseFare is not None else None
         self.availableSeats: int = int(availableSeats) # Attribute to camelCase
+        # Seat allocation; None until the trip's first seat-assigned booking (see ensureSeatMap).
+        self.capacity: Optional[int] = int(capacity) if capacity is not None else None
+        self.seatMap: Optional[str] = seatMap # SeatMap.encode() of the taken seats
+        self.seatHolds: Dict[str, Dict[str, Any]] = dict(seatHolds or {}) # holdID -> {seats, expiresAt}, see seat_holds
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
+        data = {
             'tripID': self.tripID,
             'origin': self.origin,
             'destination': self.destination,
@@ -39,54 +51,115 @@ class Trip(BaseModel):
             'price': self.price,
             'availableSeats': self.availableSeats # Key is camelCase
         }
+        if self.capacity is not None:
+            data['capacity'] = self.capacity
+            data['seatMap'] = self.seatMap
+        if self.seatHolds:
+            data['seatHolds'] = self.seatHolds
+        if self.baseFare is not None:
+            data['baseFare'] = self.baseFare
+        return data
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> Optional['Trip']:
         # Ensure keys being accessed match the JSON data (which should be camelCase)
-        if not isinstance(data, dict) or not all(k in data for k in ['tripID', 'origin', 'destination', 'departureTime', 'price', 'availableSeats']):
+        if not isinstance(data, dict) or not all(k in data for k in cls.REQUIRED_FIELDS):
             return None
         try:
-            return cls(
-                tripID=data['tripID'],
-                origin=data['origin'],
-                destination=data['destination'],
-                departureTime=data['departureTime'], # Expect camelCase key
-                price=float(data['price']),
-                availableSeats=int(data['availableSeats']) # Expect camelCase key
-            )
+            return cls._construct(data)
         except (ValueError, TypeError) as e:
             print(f"Error deserializing Trip: {e}, data: {data}")
             return None
 
+    @classmethod
+    def _construct(cls, data: Dict[str, Any]) -> 'Trip':
+        return cls(
+            tripID=data['tripID'],
+            origin=data['origin'],
+            destination=data['destination'],
+            departureTime=data['departureTime'], # Expect camelCase key
+            price=float(data['price']),
+            availableSeats=int(data['availableSeats']), # Expect camelCase key
+            capacity=data.get('capacity'),
+            seatMap=data.get('seatMap'),
+            seatHolds=data.get('seatHolds'),
+            baseFare=data.get('baseFare')
+        )
+
     @classmethod
     def search(cls, origin: Optional[str] = None, destination: Optional[str] = None, date_str: Optional[str] = None) -> List['Trip']:
-        all_trips = cls.getAll()
-        filtered_trips: List['Trip'] = []
+        return cls.searchQuery(origin, destination, date_str).all()
 
-        target_date: Optional[datetime.date] = None
+    @classmethod
+    def searchQuery(cls, origin: Optional[str] = None, destination: Optional[str] = None, date_str: Optional[str] = None) -> Query:
+        """The query behind search(), for callers that want raw records or to stream them."""
+        query = cls.query().where('availableSeats', '>', 0)
+        if origin:
+            query.where('origin', 'icontains', origin)
+        if destination:
+            query.where('destination', 'icontains', destination)
         if date_str:
             try:
                 target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+                # Stored ISO strings start with the departure's own calendar date,
+                # which is what departureTime.date() returns after parsing.
+                query.where('departureTime', 'startswith', target_date.isoformat())
             except ValueError:
                 print(f"Warning: Invalid date format for trip search '{date_str}'. Expected YYYY-MM-DD.")
+        return query
 
-        for trip in all_trips:
-            match = True
-            if origin and origin.lower() not in trip.origin.lower():
-                match = False
-            if destination and destination.lower() not in trip.destination.lower():
-                match = False
-            # Accessing the camelCase attribute on the trip object
-            if target_date and trip.departureTime.date() != target_date:
-                match = False
+    def ensureSeatMap(self) -> SeatMap:
+        """Returns the trip's seat map, creating it on first use.
 
-            # Accessing the camelCase attribute on the trip object
-            if match and trip.availableSeats > 0:
-                filtered_trips.append(trip)
-        return filtered_trips
+        A trip booked before seat maps existed gets capacity = seats left + active
+        tickets, and those tickets are given real seats (one write) so the map and
+        availableSeats agree. The caller saves the trip, inside the trips
+        transaction; the tickets are taken after it, in Table's lock order.
+        """
+        if self.capacity is not None:
+            return SeatMap.decode(self.capacity, self.seatMap)
+        from .ticket import Ticket # Deferred: tickets are only needed for this one-time backfill
+        activeTickets = Ticket.query().where('tripID', '==', self.tripID).where('status', '==', "Active").all()
+        seatMap = SeatMap(self.availableSeats + len(activeTickets))
+        unseated = []
+        for ticket in activeTickets:
+            seat = seatMap.parse(ticket.seatNumber)
+            if seat is not None and seatMap.isFree(seat):
+                seatMap.bits |= 1 << seat
+            else:
+                unseated.append(ticket)
+        for ticket in unseated:
+            ticket.seatNumber = seatMap.allocate(1)[0]
+        if unseated:
+            Ticket._table().upsert_many(ticket.to_dict() for ticket in unseated)
+        self.capacity, self.seatMap = seatMap.capacity, seatMap.encode()
+        self.availableSeats = seatMap.freeCount()
+        return seatMap
+
+    def assignSeats(self, numSeats: int, preferredSeats: Optional[List[str]] = None) -> Optional[List[str]]:
+        """Takes numSeats seats (the preferred ones, if given) all or nothing. Returns their labels."""
+        seatMap = self.ensureSeatMap()
+        seats = seatMap.allocate(int(numSeats), preferredSeats)
+        if seats is not None:
+            self.seatMap = seatMap.encode()
+            self.availableSeats = seatMap.freeCount()
+        return seats
+
+    def releaseSeats(self, seatNumbers: List[str]) -> int:
+        """Frees seats, e.g. on refund. Returns how many were taken."""
+        seatMap = self.ensureSeatMap()
+        released = seatMap.release(seatNumbers)
+        self.seatMap = seatMap.encode()
+        self.availableSeats = seatMap.freeCount()
+        return released
 
     def updateSeats(self, numSeats: int, operation: str = "book") -> bool: # Method name kept as camelCase
         numSeats = int(numSeats)
+        if self.capacity is not None: # Seat-mapped trips must know which seats are involved
+            if operation == "book":
+                return self.assignSeats(numSeats) is not None
+            print(f"Warning: Trip {self.tripID} has a seat map; use releaseSeats with the seat numbers.")
+            return False
         if operation == "book":
             if self.availableSeats >= numSeats: # Access camelCase attribute
                 self.availableSeats -= numSeats
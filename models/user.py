@@ -3,14 +3,25 @@ import uuid
 from datetime import datetime, timezone
 import hashlib
 from typing import List, Dict, Any, Optional, TypeVar, Type
+from . import metrics
 from .constants import USER_DATA_FILE
-from .json_helpers import _load_data, _save_data
-import models # For polymorphic instantiation in from_dict
+from .indexes import Table, UniqueIndex, HashIndex, get_table
 
 U = TypeVar('U', bound='User')
 
 class User:
     FILE_PATH = USER_DATA_FILE
+    PRIMARY_KEY_FIELD = 'userID'
+    INDEXES = {
+        'username': lambda: UniqueIndex('username'),
+        'email': lambda: UniqueIndex('email'),
+        'userType': lambda: HashIndex('_userType'),
+    }
+    _userTypes: Dict[str, Type['User']] = {} # '_userType' value -> class, filled by __init_subclass__
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        User._userTypes[cls.__name__] = cls
 
     def __init__(self, username: str, email: str, password: Optional[str],
                  userID: Optional[str] = None,
@@ -83,97 +94,91 @@ class User:
         lastName = data.get('lastName') # Expect camelCase key
         dateRegisteredStr = data.get('dateRegistered') # Expect camelCase key
         accountStatus = data.get('accountStatus', "Active") # Expect camelCase key
-        isAdminFlag = data.get('isAdmin', False) # Expect camelCase key
 
         if not all([userID, username, email, passwordHashFromData]):
             return None
 
-        dateRegistered = cls._parse_user_datetime(dateRegisteredStr)
-
-        instance: Optional[User] = None
-
-        if user_type == "Admin":
-            instance = models.Admin(username=username, email=email, password=None,
-                                    userID=userID, phone=phone, firstName=firstName, lastName=lastName,
-                                    dateRegistered=dateRegistered, accountStatus=accountStatus,
-                                    adminLevel=data.get('adminLevel', 'staff'), # Expect camelCase key
-                                    permissions=data.get('permissions'), assignedArea=data.get('assignedArea'))
-        elif user_type == "ArtPassenger":
-            instance = models.ArtPassenger(username=username, email=email, password=None,
-                                           userID=userID, phone=phone, firstName=firstName, lastName=lastName,
-                                           dateRegistered=dateRegistered, accountStatus=accountStatus,
-                                           paymentMethods=data.get('paymentMethods'), # Expect camelCase key
-                                           bookingHistory=data.get('bookingHistory'), # Expect camelCase key
-                                           preferences=data.get('preferences'),
-                                           loyaltyPoints=data.get('loyaltyPoints', 0)) # Expect camelCase key
-        elif user_type == "User" or user_type is None:
-            instance = cls(username=username, email=email, password=None,
-                           userID=userID, phone=phone, firstName=firstName, lastName=lastName,
-                           dateRegistered=dateRegistered, accountStatus=accountStatus,
-                           isAdmin=isAdminFlag)
-        else:
+        user_cls = User._userTypes.get(user_type or "User")
+        if user_cls is None:
             print(f"Warning: Unknown user type '{user_type}' encountered during deserialization.")
             return None
 
-        if instance:
-            instance.passwordHash = passwordHashFromData # Set camelCase attribute
+        instance = user_cls(username=username, email=email, password=None,
+                            userID=userID, phone=phone, firstName=firstName, lastName=lastName,
+                            dateRegistered=cls._parse_user_datetime(dateRegisteredStr),
+                            accountStatus=accountStatus, **user_cls._typeFieldsFromDict(data))
+        instance.passwordHash = passwordHashFromData # Set camelCase attribute
         return instance # type: ignore
 
+    @classmethod
+    def _typeFieldsFromDict(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Constructor kwargs specific to this user type; subclasses override."""
+        return {'isAdmin': data.get('isAdmin', False)} # Expect camelCase key
+
+    @classmethod
+    def _table(cls) -> Table:
+        return get_table(cls.FILE_PATH, cls.PRIMARY_KEY_FIELD, cls.INDEXES)
+
     def save(self) -> bool: # Method name kept as lowercase (common for save)
-        all_data = _load_data(self.FILE_PATH)
-        user_dict = self.to_dict()
-        found_existing = False
-
-        for i, d in enumerate(all_data):
-            if d.get('userID') == self.userID:
-                for other_d in all_data:
-                    if other_d.get('userID') != self.userID:
-                        if other_d.get('username') == self.username:
-                            print(f"Update failed: Username '{self.username}' is already taken.")
-                            return False
-                        if other_d.get('email') == self.email:
-                            print(f"Update failed: Email '{self.email}' is already taken.")
-                            return False
-                all_data[i] = user_dict
-                found_existing = True
-                break
-        
-        if not found_existing:
-            for d in all_data:
-                if d.get('username') == self.username:
+        table = self._table()
+        with table.transaction():
+            is_update = table.get(self.userID) is not None
+            if table.index('username').isTakenByOther(self.username, self.userID):
+                if is_update:
+                    print(f"Update failed: Username '{self.username}' is already taken.")
+                else:
                     print(f"Save failed: Username '{self.username}' already exists.")
-                    return False
-                if d.get('email') == self.email:
+                return False
+            if table.index('email').isTakenByOther(self.email, self.userID):
+                if is_update:
+                    print(f"Update failed: Email '{self.email}' is already taken.")
+                else:
                     print(f"Save failed: Email '{self.email}' already exists.")
-                    return False
-            all_data.append(user_dict)
-
-        _save_data(self.FILE_PATH, all_data)
+                return False
+            table.upsert(self.to_dict())
         return True
 
     @classmethod
     def findByID(cls: Type[U], userIDToFind: str) -> Optional[U]: # Method name camelCase
-        all_data = _load_data(cls.FILE_PATH)
-        for d in all_data:
-            if d.get('userID') == userIDToFind: # Key is camelCase
-                return cls.from_dict(d)
-        return None
+        return cls._fromRecord(cls._table().get(userIDToFind))
+
+    @classmethod
+    def _fromRecord(cls: Type[U], d: Optional[Dict[str, Any]]) -> Optional[U]:
+        if d is None:
+            return None
+        metrics.recordDeserialized(cls.__name__, 1)
+        return cls.from_dict(d)
+
+    @classmethod
+    def _findByUniqueField(cls: Type[U], field: str, value: str) -> Optional[U]:
+        table = cls._table()
+        with table.lock:
+            key = table.index(field).lookup(value)
+            d = table.get(key) if key is not None else None
+        return cls._fromRecord(d)
 
     @classmethod
     def findByUsername(cls: Type[U], usernameToFind: str) -> Optional[U]: # Method name camelCase
-        all_data = _load_data(cls.FILE_PATH)
-        for d in all_data:
-            if d.get('username') == usernameToFind:
-                return cls.from_dict(d)
-        return None
+        return cls._findByUniqueField('username', usernameToFind)
+
+    @classmethod
+    def findByEmail(cls: Type[U], emailToFind: str) -> Optional[U]:
+        return cls._findByUniqueField('email', emailToFind)
 
     @classmethod
     def getAll(cls: Type[U]) -> List[U]: # Method name camelCase
-        all_data = _load_data(cls.FILE_PATH)
+        table = cls._table()
+        if cls is User:
+            records = table.scan()
+        else:
+            with table.lock:
+                records = table.get_many(table.index('userType').keys(cls.__name__))
+        metrics.recordDeserialized(cls.__name__, len(records))
         items: List[U] = []
-        for d in all_data:
-            if cls.__name__ == "User" or d.get('_userType') == cls.__name__:
-                obj = cls.from_dict(d)
-                if obj:
-                    items.append(obj)
-        return items
\ No newline at end of file
+        for d in records:
+            obj = cls.from_dict(d)
+            if obj:
+                items.append(obj)
+        return items
+
+User._userTypes['User'] = User
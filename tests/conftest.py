@@ -0,0 +1,18 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import archive, indexes # noqa: E402
+
+@pytest.fixture
+def dataDir(tmp_path, monkeypatch):
+    """An empty data directory as the working directory, with no tables or archives cached from other tests."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(indexes, 'REMOTE_SOCKET', None)
+    monkeypatch.setattr(indexes, '_tables', {})
+    monkeypatch.setattr(archive, '_archives', {})
+    return tmp_path
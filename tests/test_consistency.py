@@ -0,0 +1,69 @@
+# tests/test_consistency.py
+from models import archive, consistency
+from models.seat_map import SeatMap
+from models.ticket import Ticket
+from models.trip import Trip
+
+def _trip(tripID, capacity, takenSeats, availableSeats, **extra):
+    seatMap = SeatMap(capacity)
+    seatMap.allocate(len(takenSeats), takenSeats)
+    return {'tripID': tripID, 'origin': 'A', 'destination': 'B', 'departureTime': '2030-01-01T09:00:00',
+            'price': 10.0, 'availableSeats': availableSeats, 'capacity': capacity,
+            'seatMap': seatMap.encode(), **extra}
+
+def _ticket(ticketID, tripID, seat, status="Active"):
+    return {'ticketID': ticketID, 'userID': 'u1', 'tripID': tripID, 'orderID': 'o1', 'paymentID': 'p1',
+            'seatNumber': seat, 'issueDatetime': '2020-01-01T09:00:00', 'status': status}
+
+def _inventoryProblems(report):
+    return {check: count for check, count in report.counts.items() if check.startswith(('trip_', 'ticket_'))
+            and check not in ('ticket_missing_order', 'ticket_missing_payment')}
+
+def _stored(tripID):
+    record = Trip._table().get(tripID)
+    return SeatMap.decode(record['capacity'], record['seatMap']).bits, record['availableSeats']
+
+def test_repair_frees_seats_without_a_ticket_or_hold(dataDir):
+    holds = {'h1': {'seats': ['3'], 'expiresAt': 4102444800}}
+    # Seat 2's ticket was refunded but its seat never given back.
+    Trip._table().upsert_many([_trip('t1', 4, ['1', '2', '3'], 1, seatHolds=holds)])
+    Ticket._table().upsert_many([_ticket('k1', 't1', '1'), _ticket('k2', 't1', '2', status="Refunded")])
+
+    report = consistency.check()
+    assert _inventoryProblems(report) == {'trip_seat_map': 1, 'trip_seat_count': 1}
+    assert report.repairedTrips == 0
+
+    report = consistency.check(repair=True)
+    assert report.repairedTrips == 1
+    assert _stored('t1') == (0b101, 2)
+    assert _inventoryProblems(consistency.check()) == {}
+
+def test_trip_with_a_doubly_sold_seat_is_left_alone(dataDir):
+    Trip._table().upsert_many([_trip('t1', 4, ['1', '4'], 2)])
+    Ticket._table().upsert_many([_ticket('k1', 't1', '1'), _ticket('k2', 't1', '1')])
+
+    report = consistency.check(repair=True)
+    assert report.counts['ticket_duplicate_seat'] == 1
+    assert report.repairedTrips == 0
+    assert report.unrepairedTrips == 1
+    assert _stored('t1') == (0b1001, 2)
+
+def test_archived_tickets_still_hold_their_seats(dataDir):
+    Trip._table().upsert_many([_trip('t1', 2, ['1'], 1)])
+    archive.writeSegment(Ticket.FILE_PATH, [_ticket('k1', 't1', '1')])
+
+    report = consistency.check(repair=True)
+    assert _inventoryProblems(report) == {}
+    assert report.repairedTrips == 0
+    assert _stored('t1') == (0b1, 1)
+
+def test_trips_without_capacity_are_reported_unchecked(dataDir):
+    Trip._table().upsert_many([{'tripID': 'legacy', 'origin': 'A', 'destination': 'B',
+                                'departureTime': '2030-01-01T09:00:00', 'price': 10.0, 'availableSeats': 3}])
+    Ticket._table().upsert_many([_ticket('k1', 'legacy', '1')])
+
+    report = consistency.check(repair=True)
+    assert report.uncheckedTrips == 1
+    assert report.uncheckedSamples == ['legacy']
+    assert _inventoryProblems(report) == {}
+    assert report.repairedTrips == 0
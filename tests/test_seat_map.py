@@ -0,0 +1,55 @@
+# tests/test_seat_map.py
+import pytest
+
+from models.seat_map import SeatMap
+
+def test_allocate_prefers_adjacent_seats():
+    seatMap = SeatMap(6)
+    assert seatMap.allocate(1, ['2']) == ['2']
+    assert seatMap.allocate(1, ['4']) == ['4']
+    # Seats 1, 3 and 5 are free but not adjacent; 5-6 is the first run of two.
+    assert seatMap.allocate(2) == ['5', '6']
+    assert seatMap.freeCount() == 2
+
+def test_allocate_falls_back_to_scattered_seats():
+    seatMap = SeatMap(3)
+    seatMap.allocate(1, ['2'])
+    assert seatMap.allocate(2) == ['1', '3']
+    assert seatMap.allocate(1) is None
+    assert seatMap.takenCount() == 3
+
+def test_preferred_seats_are_all_or_nothing():
+    seatMap = SeatMap(4)
+    seatMap.allocate(1, ['3'])
+    assert seatMap.allocate(2, ['1', '3']) is None
+    assert seatMap.isFree(0)
+    assert seatMap.allocate(1, ['9']) is None
+    assert seatMap.allocate(2, ['1', '2']) == ['1', '2']
+
+def test_release_frees_seats():
+    seatMap = SeatMap(3)
+    seats = seatMap.allocate(3)
+    seatMap.release(seats[:2])
+    assert seatMap.freeCount() == 2
+    assert seatMap.firstFree() == 0
+    assert seatMap.firstFreeRun(2) == 0
+
+def test_encode_round_trips():
+    seatMap = SeatMap(20)
+    seatMap.allocate(1, ['1'])
+    seatMap.allocate(1, ['17'])
+    decoded = SeatMap.decode(20, seatMap.encode())
+    assert decoded.bits == seatMap.bits
+    assert not decoded.isFree(16)
+    assert SeatMap.decode(20, None).freeCount() == 20
+
+def test_parse_rejects_seats_off_the_map():
+    seatMap = SeatMap(3)
+    assert seatMap.parse('3') == 2
+    assert seatMap.parse('0') is None
+    assert seatMap.parse('4') is None
+    assert seatMap.parse('A1') is None
+
+def test_negative_capacity_is_rejected():
+    with pytest.raises(ValueError):
+        SeatMap(-1)
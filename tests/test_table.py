@@ -0,0 +1,76 @@
+# tests/test_table.py
+import multiprocessing
+import threading
+
+import pytest
+
+from models import indexes
+from models.indexes import HashIndex, Table
+
+def _routeIndex():
+    return {'route': lambda: HashIndex('route')}
+
+def test_apply_updates_records_and_indexes(dataDir):
+    table = Table(str(dataDir / 'trips.json'), 'tripID', _routeIndex())
+    table.apply([('t1', {'tripID': 't1', 'route': 'A'}), ('t2', {'tripID': 't2', 'route': 'A'})])
+    table.apply([('t1', {'tripID': 't1', 'route': 'B'}), ('t2', None)])
+
+    assert table.get('t1')['route'] == 'B'
+    assert table.get('t2') is None
+    assert table.index('route').keys('A') == []
+    assert table.index('route').keys('B') == ['t1']
+
+def test_listeners_run_after_the_lock_is_released(dataDir):
+    table = Table(str(dataDir / 'trips.json'), 'tripID')
+    seen = []
+
+    def listener(changes):
+        # Another thread must be able to take the table while listeners run.
+        acquired = []
+
+        def takeLock():
+            acquired.append(table.lock.acquire(timeout=1))
+            if acquired[0]:
+                table.lock.release()
+
+        worker = threading.Thread(target=takeLock)
+        worker.start()
+        worker.join()
+        seen.append((changes, acquired[0]))
+
+    table.listeners.append(listener)
+    table.apply([('t1', {'tripID': 't1'})])
+    assert seen == [([('t1', None, {'tripID': 't1'})], True)]
+
+def test_write_is_seen_by_another_table_without_waiting_for_stat(dataDir, monkeypatch):
+    monkeypatch.setattr(indexes, 'STAT_INTERVAL', 3600.0)
+    path = str(dataDir / 'trips.json')
+    writer, reader = Table(path, 'tripID'), Table(path, 'tripID')
+    if reader.shared is None:
+        pytest.skip("Shared version table unavailable on this platform")
+    writer.apply([('t1', {'tripID': 't1', 'availableSeats': 5})])
+    assert reader.ensure_fresh().get('t1')['availableSeats'] == 5
+
+    writer.apply([('t1', {'tripID': 't1', 'availableSeats': 4})])
+    assert reader.ensure_fresh().get('t1')['availableSeats'] == 4
+
+def _increment(path, times):
+    table = Table(path, 'counterID')
+    for _ in range(times):
+        with table.transaction():
+            row = table.get('hits') or {'counterID': 'hits', 'value': 0}
+            table.upsert({**row, 'value': row['value'] + 1})
+
+def test_transactions_in_separate_processes_lose_no_updates(dataDir):
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        pytest.skip("Needs fork to share the test's imports")
+    path = str(dataDir / 'counters.json')
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=_increment, args=(path, 25)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    assert Table(path, 'counterID').ensure_fresh().get('hits')['value'] == 100
@@ -0,0 +1,38 @@
+# tests/test_timing_wheel.py
+from models.timing_wheel import TimingWheel
+
+def _wheel(slotCount=8):
+    expired = []
+    # A tick an hour long keeps the background thread idle; the tests call tick() themselves.
+    return TimingWheel(expired.extend, tickSeconds=3600, slotCount=slotCount), expired
+
+def test_entries_expire_on_their_tick():
+    wheel, _ = _wheel()
+    wheel.schedule('a', 1, 'A')
+    wheel.schedule('b', 3 * 3600, 'B')
+    assert wheel.tick() == ['A']
+    assert wheel.tick() == []
+    assert wheel.tick() == ['B']
+    assert len(wheel) == 0
+
+def test_cancelled_entries_never_expire():
+    wheel, _ = _wheel()
+    wheel.schedule('a', 1, 'A')
+    wheel.cancel('a')
+    wheel.cancel('missing')
+    assert wheel.tick() == []
+    assert len(wheel) == 0
+
+def test_delays_longer_than_one_turn_wait_for_their_turn():
+    wheel, _ = _wheel(slotCount=4)
+    wheel.schedule('late', 6 * 3600, 'LATE')
+    due = [wheel.tick() for _ in range(6)]
+    assert due == [[], [], [], [], [], ['LATE']]
+
+def test_rescheduling_a_key_replaces_it():
+    wheel, _ = _wheel()
+    wheel.schedule('a', 1, 'first')
+    wheel.schedule('a', 2 * 3600, 'second')
+    assert len(wheel) == 1
+    assert wheel.tick() == []
+    assert wheel.tick() == ['second']
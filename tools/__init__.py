@@ -0,0 +1,3 @@
+# tools/__init__.py
+
+# Developer tooling (data generation, benchmarking). Run modules with 'python -m tools.<name>'.
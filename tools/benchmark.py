@@ -0,0 +1,193 @@
+# tools/benchmark.py
+"""Times model finders and Flask routes against generated datasets of increasing size.
+
+    python -m tools.benchmark --scales 1000,10000,100000 --output bench_results.json
+    python -m tools.benchmark --scales 1000,10000 --baseline bench_baseline.json
+
+Each scale is generated with tools.generate_dataset into a temporary directory and
+measured in a fresh interpreter whose working directory is that dataset, so the
+repository's own JSON files are never touched. Results are written as JSON. With
+--baseline, any case whose median slows down by more than --threshold (and by
+more than --min-delta-ms) is reported as a regression and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from tools.generate_dataset import MOCK_USER_ID, writeDataset
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _measure(fn: Callable[[Any], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """Times fn(setup()) once cold and then repeat more times. Setup time is not counted."""
+    samples: List[float] = []
+    for _ in range(repeat + 1):
+        arg = setup() if setup else None
+        started = time.perf_counter()
+        fn(arg)
+        samples.append((time.perf_counter() - started) * 1000)
+    warm = sorted(samples[1:]) or samples
+    return {
+        'cold_ms': round(samples[0], 3),
+        'median_ms': round(statistics.median(warm), 3),
+        'p95_ms': round(warm[min(len(warm) - 1, int(len(warm) * 0.95))], 3),
+        'min_ms': round(warm[0], 3),
+        'runs': len(warm),
+    }
+
+def _runCases(repeat: int, seed: int) -> Dict[str, Dict[str, Any]]:
+    """Runs inside the dataset directory (see --worker)."""
+    import app as appModule
+    from models import Feedback, Notification, Order, Ticket, Trip, User
+
+    rng = random.Random(seed)
+    client = appModule.app.test_client()
+    trips = Trip._table().scan()
+    tripIDs = [t['tripID'] for t in trips]
+    openTripIDs = [t['tripID'] for t in trips if t.get('availableSeats', 0) > 0]
+    userIDs = [u['userID'] for u in User._table().scan()]
+    orderIDs = [o['orderID'] for o in Order._table().scan()]
+    origin = trips[0]['origin'] if trips else ''
+    date = (trips[0].get('departureTime') or '')[:10] if trips else ''
+
+    def pick(values: List[str]) -> Callable[[], str]:
+        return lambda: rng.choice(values)
+
+    def bookedOrder() -> str:
+        client.post(f"/book-trip/{rng.choice(openTripIDs)}")
+        newest = max((o for o in Order.findByUserID(MOCK_USER_ID) if o.status == "Completed"),
+                     key=lambda o: o.order_datetime)
+        return newest.orderID
+
+    def get(url: str) -> Callable[[Any], Any]:
+        return lambda _: client.get(url)
+
+    cases: Dict[str, Dict[str, Any]] = {}
+    def case(name: str, fn: Callable[[Any], Any], setup: Optional[Callable[[], Any]] = None) -> None:
+        cases[name] = _measure(fn, repeat, setup)
+
+    # Model finders
+    case('User.findByID', User.findByID, pick(userIDs))
+    case('User.findByUsername', lambda _: User.findByUsername('mockuser'))
+    case('Trip.findByID', Trip.findByID, pick(tripIDs))
+    case('Trip.search(origin)', lambda _: Trip.search(origin=origin))
+    case('Trip.search(date)', lambda _: Trip.search(date_str=date))
+    case('Order.findByUserID', lambda _: Order.findByUserID(MOCK_USER_ID))
+    case('Ticket.findByOrderID', Ticket.findByOrderID, pick(orderIDs))
+    case('Notification.getLatest', lambda _: Notification.getLatest(MOCK_USER_ID, limit=20))
+    case('Notification.countUnread', lambda _: Notification.countUnread(MOCK_USER_ID))
+    case('Feedback.getAll(New)', lambda _: Feedback.getAll(statusFilter="New"))
+
+    # Flask routes through the test client
+    case('GET /search-trips', get('/search-trips'))
+    case('GET /search-trips?origin', get(f'/search-trips?origin={origin}'))
+    case('GET /book-trip/<id>', lambda tripID: client.get(f'/book-trip/{tripID}'), pick(tripIDs))
+    case('POST /book-trip/<id>', lambda tripID: client.post(f'/book-trip/{tripID}'), pick(openTripIDs))
+    case('GET /standalone-refund-demo', get('/standalone-refund-demo'))
+    case('POST /standalone-refund-demo',
+         lambda orderID: client.post('/standalone-refund-demo', data={'order_id_to_refund': orderID}),
+         bookedOrder)
+    case('GET /admin/feedbacks', get('/admin/feedbacks?status=All'))
+    case('GET /admin/reports', get('/admin/reports'))
+    return cases
+
+def runScale(scale: int, repeat: int, seed: int, keepData: bool = False) -> Dict[str, Any]:
+    dataDir = tempfile.mkdtemp(prefix=f"art-bench-{scale}-")
+    try:
+        started = time.perf_counter()
+        rowCounts = writeDataset(dataDir, scale, seed)
+        generateSeconds = time.perf_counter() - started
+        resultPath = os.path.join(dataDir, 'bench_worker.json')
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+        proc = subprocess.run([sys.executable, '-m', 'tools.benchmark', '--worker', resultPath,
+                               '--repeat', str(repeat), '--seed', str(seed)],
+                              cwd=dataDir, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Benchmark worker failed at scale {scale}:\n{proc.stderr[-4000:]}")
+        with open(resultPath) as f:
+            cases = json.load(f)
+        return {'rows': sum(rowCounts.values()), 'generate_s': round(generateSeconds, 2), 'cases': cases}
+    finally:
+        if keepData:
+            print(f"  dataset kept at {dataDir}")
+        else:
+            shutil.rmtree(dataDir, ignore_errors=True)
+
+def findRegressions(results: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float, minDeltaMs: float) -> List[str]:
+    regressions = []
+    for scale, current in results['scales'].items():
+        baseCases = baseline.get('scales', {}).get(scale, {}).get('cases', {})
+        for name, stats in current['cases'].items():
+            base = baseCases.get(name)
+            if not base:
+                continue
+            delta = stats['median_ms'] - base['median_ms']
+            if stats['median_ms'] > base['median_ms'] * (1 + threshold) and delta > minDeltaMs:
+                regressions.append(f"scale {scale}: {name} median {base['median_ms']:.3f}ms -> "
+                                   f"{stats['median_ms']:.3f}ms (+{delta:.3f}ms)")
+    return regressions
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', default='1000,10000', help="Comma-separated dataset scales (default 1000,10000).")
+    parser.add_argument('--repeat', type=int, default=20, help="Warm runs per case (default 20).")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results.json', help="Where to write results JSON.")
+    parser.add_argument('--baseline', help="Baseline results JSON to compare against.")
+    parser.add_argument('--save-baseline', action='store_true', help="Also write the results to --baseline.")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Allowed relative slowdown (default 0.25).")
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help="Ignore slowdowns smaller than this.")
+    parser.add_argument('--keep-data', action='store_true', help="Keep the generated datasets.")
+    parser.add_argument('--worker', metavar='RESULT_PATH', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        with open(args.worker, 'w') as f:
+            json.dump(_runCases(args.repeat, args.seed), f)
+        return 0
+
+    results: Dict[str, Any] = {
+        'generated': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'repeat': args.repeat,
+        'scales': {},
+    }
+    for scale in [int(s) for s in args.scales.split(',') if s.strip()]:
+        print(f"Scale {scale:,}: generating and measuring...")
+        results['scales'][str(scale)] = scaleResult = runScale(scale, args.repeat, args.seed, args.keep_data)
+        for name, stats in scaleResult['cases'].items():
+            print(f"  {name:<32} cold {stats['cold_ms']:>10.3f}ms  median {stats['median_ms']:>10.3f}ms  "
+                  f"p95 {stats['p95_ms']:>10.3f}ms")
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as f:
+            regressions = findRegressions(results, json.load(f), args.threshold, args.min_delta_ms)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
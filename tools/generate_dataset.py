@@ -0,0 +1,170 @@
+# tools/generate_dataset.py
+"""Generates a reproducible, referentially consistent dataset for every model.
+
+    python -m tools.generate_dataset --scale 100000 --out /tmp/art-100k --seed 7
+
+Run from the repository root. --scale is the number of orders (and roughly of
+tickets, payments and notifications); the other stores are sized relative to it.
+Records are built through the model classes and written with to_dict, so they
+always match the current schema.
+"""
+import argparse
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from models import (
+    Admin, ArtPassenger, Feedback, Location, Notification, Order, OrderLineItem,
+    Payment, Refund, Response, Route, Stop, Ticket, Trip, User,
+)
+from models.json_helpers import _save_data
+
+MOCK_USER_ID = "mock_user_001" # The IDs app.py acts as
+MOCK_ADMIN_ID = "admin_user_001"
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc) # Fixed so a seed always yields the same data
+TOWNS = ["Kuching Sentral", "Serian", "Sibu", "Bintulu", "Miri", "Samarahan", "Bau", "Lundu",
+         "Sri Aman", "Sarikei", "Kapit", "Mukah", "Betong", "Limbang", "Lawas", "Kota Samarahan"]
+REFUND_RATE = 0.08
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+def _when(rng: random.Random, days: int) -> datetime:
+    return EPOCH + timedelta(seconds=rng.randrange(days * 86400))
+
+def generate(scale: int, seed: int = 0) -> Dict[str, List[Dict[str, Any]]]:
+    """Builds every store in memory, keyed by the model's FILE_PATH."""
+    rng = random.Random(seed)
+    stores: Dict[str, List[Dict[str, Any]]] = {model.FILE_PATH: [] for model in (
+        User, Trip, Ticket, Order, Payment, Refund, Location, Stop, Route,
+        Feedback, Response, Notification, OrderLineItem)}
+
+    def put(obj: Any) -> Any:
+        stores[obj.FILE_PATH].append(obj.to_dict())
+        return obj
+
+    # Places and network
+    stops: List[Stop] = []
+    for i in range(max(len(TOWNS), scale // 100)):
+        town = TOWNS[i % len(TOWNS)]
+        location = put(Location(latitude=1.0 + rng.random() * 4, longitude=110.0 + rng.random() * 5,
+                                addressLine1=f"{i + 1} Jalan {town.split()[0]}", city=town,
+                                postcode=f"{93000 + i % 1000}", locationID=f"LOC{i:06d}"))
+        stops.append(put(Stop(stopName=f"{town} Stop {i // len(TOWNS) + 1}", locationID=location.locationID,
+                              stopID=f"STP{i:06d}")))
+    for i in range(max(3, scale // 1000)):
+        routeStops = rng.sample(stops, k=min(len(stops), rng.randint(3, 10)))
+        put(Route(routeName=f"{routeStops[0].stopName} - {routeStops[-1].stopName}",
+                  description=f"Synthetic route {i + 1}", routeID=f"RTE{i:05d}",
+                  stopIDs=[s.stopID for s in routeStops]))
+
+    # People
+    users = [put(User(username="mockuser", email="mock@example.com", password="password", userID=MOCK_USER_ID))]
+    admins = [put(Admin(username="admin", email="admin@example.com", password="adminpassword",
+                        userID=MOCK_ADMIN_ID, adminLevel="superuser"))]
+    for i in range(max(5, scale // 500)):
+        admins.append(put(Admin(username=f"admin{i}", email=f"admin{i}@example.com", password="pw",
+                                userID=f"ADM{i:05d}", dateRegistered=_when(rng, 180))))
+    for i in range(max(10, scale // 10)):
+        users.append(put(ArtPassenger(username=f"passenger{i}", email=f"passenger{i}@example.com",
+                                      password="pw", userID=f"USR{i:07d}", loyaltyPoints=rng.randrange(500),
+                                      dateRegistered=_when(rng, 365))))
+
+    # Timetable: capacity is fixed per trip and availableSeats is derived from tickets below.
+    trips: List[Dict[str, Any]] = []
+    for i in range(max(10, scale // 10)):
+        origin, destination = rng.sample(TOWNS, 2)
+        trips.append({'trip': Trip(tripID=f"TRP{i:07d}", origin=origin, destination=destination,
+                                   departureTime=_when(rng, 365).replace(minute=0, second=0, microsecond=0),
+                                   price=round(5 + rng.random() * 80, 2), availableSeats=0),
+                      'capacity': rng.choice([40, 60, 120, 300]), 'sold': 0})
+
+    # Sales: order -> line item -> payment -> tickets, with some orders refunded
+    mockOrders = max(5, scale // 1000)
+    for i in range(scale):
+        slot = rng.choice(trips)
+        if slot['sold'] >= slot['capacity']:
+            continue
+        trip: Trip = slot['trip']
+        userID = MOCK_USER_ID if i < mockOrders else rng.choice(users).userID
+        quantity = min(rng.choice([1, 1, 1, 2, 3]), slot['capacity'] - slot['sold'])
+        orderedAt = min(trip.departureTime - timedelta(hours=1), _when(rng, 365))
+        refunded = rng.random() < REFUND_RATE
+        order = Order(userID=userID, orderID=_uuid(rng), status="Refunded" if refunded else "Completed",
+                      order_datetime=orderedAt)
+        put(order)
+        line = put(OrderLineItem(orderID=order.orderID, itemID=trip.tripID, itemType="TripTicket",
+                                 quantity=quantity, unitPrice=trip.price, lineItemID=_uuid(rng)))
+        payment = put(Payment(orderID=order.orderID, amount=line.calculateLineTotal(),
+                              status="Refunded" if refunded else "Completed", paymentID=_uuid(rng),
+                              paymentDatetime=orderedAt + timedelta(seconds=5)))
+        for _ in range(quantity):
+            ticket = put(Ticket(userID=userID, tripID=trip.tripID, orderID=order.orderID,
+                                paymentID=payment.paymentID, ticketID=_uuid(rng),
+                                issueDatetime=orderedAt + timedelta(seconds=6),
+                                status="Refunded" if refunded else "Active"))
+            if refunded:
+                refund = Refund(paymentID=payment.paymentID, orderID=order.orderID, ticketID=ticket.ticketID,
+                                refundAmount=trip.price, refundID=_uuid(rng),
+                                requestDatetime=orderedAt + timedelta(days=1))
+                refund.updateStatus("Processed")
+                refund.processedDatetime = refund.requestDatetime + timedelta(minutes=5)
+                put(refund)
+            else:
+                slot['sold'] += 1
+    for slot in trips:
+        slot['trip'].availableSeats = slot['capacity'] - slot['sold']
+        put(slot['trip'])
+
+    # Feedback loop
+    for i in range(max(5, scale // 20)):
+        submitter = rng.choice(users)
+        status = rng.choice(["New", "New", "Pending", "Responded", "Closed"])
+        feedback = Feedback(submitterUserID=submitter.userID, feedbackContent=f"Synthetic feedback #{i}",
+                            rating=rng.randint(1, 5), relatedTripID=rng.choice(trips)['trip'].tripID,
+                            feedbackID=_uuid(rng), status=status, submissionDatetime=_when(rng, 365))
+        if status in ("Responded", "Closed"):
+            admin = rng.choice(admins)
+            response = put(Response(feedbackID=feedback.feedbackID, responderAdminID=admin.userID,
+                                    responseContent="Thank you for your feedback.", responseID=_uuid(rng),
+                                    responseDatetime=feedback.submissionDatetime + timedelta(hours=3)))
+            feedback.addResponseID(response.responseID)
+            put(Notification(recipientUserID=submitter.userID, senderUserID=admin.userID,
+                             messageContent=f"Admin responded to your feedback (ID: {feedback.feedbackID})",
+                             notificationType="FeedbackResponse", notificationID=_uuid(rng),
+                             sentDatetime=response.responseDatetime, readStatus=rng.random() < 0.5))
+        put(feedback)
+    for i in range(scale):
+        put(Notification(recipientUserID=MOCK_USER_ID if i % 200 == 0 else rng.choice(users).userID,
+                         senderUserID="System", messageContent=f"Service update #{i}",
+                         notificationID=_uuid(rng), sentDatetime=_when(rng, 365),
+                         readStatus=rng.random() < 0.7))
+    return stores
+
+def writeDataset(outDir: str, scale: int, seed: int = 0) -> Dict[str, int]:
+    """Generates the dataset and writes one JSON file per store into outDir. Returns row counts."""
+    os.makedirs(outDir, exist_ok=True)
+    counts = {}
+    for fileName, rows in generate(scale, seed).items():
+        _save_data(os.path.join(outDir, fileName), rows)
+        counts[fileName] = len(rows)
+    return counts
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=1000, help="Number of orders to generate (default 1000).")
+    parser.add_argument('--out', required=True, help="Directory to write the JSON stores into.")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default 0).")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    counts = writeDataset(args.out, args.scale, args.seed)
+    for fileName, count in sorted(counts.items()):
+        print(f"{fileName:<24} {count:>10,} rows")
+    print(f"Wrote {sum(counts.values()):,} rows to {args.out} in {time.perf_counter() - started:.1f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+# tools/replay.py
+"""Replays captured requests against the app and reports latency per endpoint.
+
+    ART_CAPTURE_REQUESTS=captured_requests.jsonl python app.py        # capture traffic
+    python -m tools.replay captured_requests.jsonl --concurrency 8 --rate 200
+    python -m tools.replay captured_requests.jsonl --url http://127.0.0.1:5000 --loops 5
+
+Run from the repository root. By default requests go through the Flask test
+client in this process, against a temporary copy of the JSON stores in the
+current directory, so replayed bookings and refunds do not touch them. Use
+--data-dir to replay against another dataset (e.g. one from
+tools.generate_dataset), --in-place to use the stores as they are, or --url to
+drive a running server instead. With --rate, requests are started on a fixed
+schedule and latency is measured from the scheduled start, so a backed-up
+server is not hidden by the replayer waiting for it.
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_CAPTURE_FILE = 'captured_requests.jsonl'
+
+def loadCapture(path: str) -> List[Dict[str, Any]]:
+    entries = []
+    with open(path, encoding='utf-8') as f:
+        for lineNumber, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Warning: Skipping line {lineNumber} of {path}: {e}")
+                continue
+            if isinstance(entry, dict) and entry.get('method') and entry.get('path'):
+                entries.append(entry)
+    return entries
+
+def endpointKey(entry: Dict[str, Any]) -> str:
+    return f"{entry['method']} {entry.get('endpoint') or entry['path']}"
+
+class TestClientTarget:
+    """Sends requests through Flask's test client, one client per worker thread."""
+
+    def __init__(self):
+        import app as appModule # Imported here so the data directory is chosen first
+        self.app = appModule.app
+        self.local = threading.local()
+
+    def send(self, entry: Dict[str, Any]) -> int:
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.open(entry['path'], method=entry['method'],
+                               query_string=entry.get('query') or None, data=entry.get('form') or None)
+        response.close()
+        return response.status_code
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None # Report the 3xx itself, as the test client does
+
+class HttpTarget:
+    """Sends requests to a running server over HTTP."""
+
+    def __init__(self, baseUrl: str, timeout: float):
+        self.baseUrl = baseUrl.rstrip('/')
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(_NoRedirect)
+
+    def send(self, entry: Dict[str, Any]) -> int:
+        url = self.baseUrl + entry['path']
+        if entry.get('query'):
+            url += '?' + urllib.parse.urlencode(entry['query'], doseq=True)
+        body = urllib.parse.urlencode(entry['form'], doseq=True).encode() if entry.get('form') else None
+        req = urllib.request.Request(url, data=body, method=entry['method'])
+        try:
+            with self.opener.open(req, timeout=self.timeout) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+def _percentile(sortedValues: List[float], fraction: float) -> float:
+    return sortedValues[min(len(sortedValues) - 1, int(len(sortedValues) * fraction))] if sortedValues else 0.0
+
+def replay(target: Any, entries: List[Dict[str, Any]], concurrency: int,
+           rate: Optional[float] = None, loops: int = 1) -> Dict[str, Any]:
+    """Replays entries loops times with up to concurrency requests in flight. Returns the report."""
+    jobs = [entry for _ in range(loops) for entry in entries]
+    samples: List[Tuple[str, float, Optional[int], Optional[str]]] = [] # (endpoint, ms, status, error)
+    samplesLock = threading.Lock()
+    started = time.perf_counter()
+
+    def run(index: int, entry: Dict[str, Any]) -> None:
+        scheduled = started + index / rate if rate else None
+        if scheduled is not None and scheduled > time.perf_counter():
+            time.sleep(scheduled - time.perf_counter())
+        sent = time.perf_counter()
+        status, error = None, None
+        try:
+            status = target.send(entry)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        elapsedMs = (time.perf_counter() - (scheduled if scheduled is not None else sent)) * 1000
+        with samplesLock:
+            samples.append((endpointKey(entry), elapsedMs, status, error))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(run, i, entry) for i, entry in enumerate(jobs)]:
+            future.result()
+    wallSeconds = time.perf_counter() - started
+
+    grouped: Dict[str, List[Tuple[float, Optional[int], Optional[str]]]] = {}
+    for name, elapsedMs, status, error in samples:
+        grouped.setdefault(name, []).append((elapsedMs, status, error))
+
+    def summarise(rows: List[Tuple[float, Optional[int], Optional[str]]]) -> Dict[str, Any]:
+        latencies = sorted(ms for ms, _, _ in rows)
+        errors = sum(1 for _, status, error in rows if error or (status or 0) >= 500)
+        statuses: Dict[str, int] = {}
+        for _, status, error in rows:
+            label = str(status) if status is not None else 'exception'
+            statuses[label] = statuses.get(label, 0) + 1
+        return {
+            'requests': len(rows),
+            'throughput_rps': round(len(rows) / wallSeconds, 2) if wallSeconds else 0.0,
+            'error_rate': round(errors / len(rows), 4) if rows else 0.0,
+            'p50_ms': round(_percentile(latencies, 0.50), 3),
+            'p95_ms': round(_percentile(latencies, 0.95), 3),
+            'p99_ms': round(_percentile(latencies, 0.99), 3),
+            'max_ms': round(latencies[-1], 3) if latencies else 0.0,
+            'statuses': statuses,
+        }
+
+    firstErrors = [f"{name}: {error}" for name, _, _, error in samples if error][:5]
+    return {
+        'requests': len(samples),
+        'wall_s': round(wallSeconds, 3),
+        'concurrency': concurrency,
+        'rate': rate,
+        'overall': summarise([(ms, status, error) for _, ms, status, error in samples]),
+        'endpoints': {name: summarise(rows) for name, rows in sorted(grouped.items())},
+        'sample_errors': firstErrors,
+    }
+
+def _copyStores(sourceDir: str) -> str:
+    scratchDir = tempfile.mkdtemp(prefix='art-replay-')
+    for path in glob.glob(os.path.join(sourceDir, '*.json')):
+        shutil.copy2(path, scratchDir)
+    return scratchDir
+
+def printReport(report: Dict[str, Any]) -> None:
+    print(f"{report['requests']} requests in {report['wall_s']:.2f}s "
+          f"(concurrency {report['concurrency']}, rate {report['rate'] or 'unlimited'})")
+    header = f"  {'endpoint':<44} {'reqs':>6} {'rps':>9} {'err%':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header)
+    for name, stats in list(report['endpoints'].items()) + [('TOTAL', report['overall'])]:
+        print(f"  {name:<44} {stats['requests']:>6} {stats['throughput_rps']:>9.1f} "
+              f"{stats['error_rate'] * 100:>6.2f} {stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f} "
+              f"{stats['p99_ms']:>9.3f}")
+    for line in report['sample_errors']:
+        print(f"  error: {line}")
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('capture', nargs='?', default=DEFAULT_CAPTURE_FILE,
+                        help=f"Captured requests JSONL (default {DEFAULT_CAPTURE_FILE}).")
+    parser.add_argument('--url', help="Base URL of a running server. Defaults to the in-process test client.")
+    parser.add_argument('--data-dir', help="Test client only: replay against the stores in this directory.")
+    parser.add_argument('--in-place', action='store_true', help="Test client only: use the current stores directly.")
+    parser.add_argument('--concurrency', type=int, default=4, help="Requests in flight at once (default 4).")
+    parser.add_argument('--rate', type=float, help="Requests started per second. Default: as fast as possible.")
+    parser.add_argument('--loops', type=int, default=1, help="Times to replay the whole capture (default 1).")
+    parser.add_argument('--timeout', type=float, default=30.0, help="HTTP timeout in seconds (default 30).")
+    parser.add_argument('--output', help="Also write the report as JSON to this file.")
+    args = parser.parse_args(argv)
+
+    capturePath = os.path.abspath(args.capture)
+    outputPath = os.path.abspath(args.output) if args.output else None # Resolved before any chdir
+    entries = loadCapture(capturePath)
+    if not entries:
+        print(f"No requests to replay in {capturePath}.")
+        return 1
+
+    scratchDir = None
+    if args.url:
+        target = HttpTarget(args.url, args.timeout)
+    else:
+        if args.data_dir:
+            dataDir = args.data_dir
+        elif args.in_place:
+            dataDir = os.getcwd()
+        else:
+            dataDir = scratchDir = _copyStores(os.getcwd())
+        sys.path.insert(0, os.getcwd()) # app.py lives in the repository root
+        os.chdir(dataDir) # Model FILE_PATHs are relative to the working directory
+        target = TestClientTarget()
+
+    try:
+        report = replay(target, entries, max(1, args.concurrency), args.rate, max(1, args.loops))
+    finally:
+        if scratchDir:
+            shutil.rmtree(scratchDir, ignore_errors=True)
+    printReport(report)
+    if outputPath:
+        with open(outputPath, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {outputPath}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())